@@ -0,0 +1,236 @@
+"""
+聚合立方体模块
+
+功能：
+1. 物化 博主 × 日期 × 小时 × 星期 的求和/计数
+2. 新视频、新快照到达时增量更新
+3. 直接从立方体回答按日 / 按小时 / 按星期的趋势查询
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+
+def _grow(values: np.ndarray, size: int) -> np.ndarray:
+    """按需扩容（容量翻倍）"""
+    if len(values) >= size:
+        return values
+    grown = np.zeros((max(size, 2 * len(values)),) + values.shape[1:], dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class AggregateCube:
+    """
+    增量维护的聚合立方体
+    
+    每个单元格保存 likes / comments / shares 的总和与视频数量。
+    同一视频的新快照只把与上一次快照的差值累加到所在单元格，
+    因此重复导入同一批数据不会重复计数。
+    每个视频最近一次计入的维度与数值按 video_id 存在定长数组里，
+    一次更新只读写本批次涉及的视频，不随已导入的视频总数增长。
+    """
+    
+    DIMENSIONS = ['sec_uid', 'day', 'publish_hour', 'day_of_week']
+    MEASURES = ['likes', 'comments', 'shares']
+    
+    def __init__(self):
+        self.cells = pd.DataFrame(
+            columns=self.MEASURES + ['videos'],
+            index=pd.MultiIndex.from_arrays([[]] * len(self.DIMENSIONS), names=self.DIMENSIONS),
+            dtype=np.int64
+        )
+        # 每个视频最近一次计入立方体的维度与数值（用于快照差分），video_id -> 数组下标
+        self._slots = {}
+        self._sec_uid = np.empty(0, dtype=object)
+        self._day = np.empty(0, dtype='datetime64[ns]')
+        self._hour = np.empty(0, dtype=np.int64)
+        self._dow = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, len(self.MEASURES)), dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.cells)
+    
+    def _prepare(self, df: pd.DataFrame, sec_uid: Optional[str]) -> pd.DataFrame:
+        create_time = pd.to_datetime(df['create_time'], errors='coerce')
+        rows = pd.DataFrame({
+            'sec_uid': sec_uid if sec_uid is not None else df.get('sec_uid', ''),
+            'day': create_time.dt.normalize().astype('datetime64[ns]'),
+            'publish_hour': create_time.dt.hour,
+            'day_of_week': create_time.dt.dayofweek,
+        }, index=df.index)
+        
+        for measure in self.MEASURES:
+            values = df[measure] if measure in df.columns else 0
+            rows[measure] = pd.to_numeric(values, errors='coerce').fillna(0).astype(np.int64)
+        
+        rows.index = df['video_id'].astype(str).to_numpy()
+        rows = rows[rows['day'].notna()]
+        # 同一批次里重复出现的视频以最后一次为准
+        return rows[~rows.index.duplicated(keep='last')]
+    
+    def _state(self, slots: np.ndarray) -> pd.DataFrame:
+        """取出指定下标的视频上一次计入的维度与数值"""
+        state = pd.DataFrame({
+            'sec_uid': self._sec_uid[slots],
+            'day': self._day[slots],
+            'publish_hour': self._hour[slots],
+            'day_of_week': self._dow[slots],
+        })
+        state[self.MEASURES] = self._values[slots]
+        return state
+    
+    def _lookup(self, ids: np.ndarray) -> np.ndarray:
+        """视频ID对应的数组下标（未计入过的为 -1）"""
+        return np.fromiter((self._slots.get(video_id, -1) for video_id in ids), dtype=np.int64, count=len(ids))
+    
+    def _store(self, ids: np.ndarray, slots: np.ndarray, rows: pd.DataFrame):
+        """写入一批视频的最新维度与数值，新视频分配下标"""
+        slots = slots.copy()
+        fresh = np.flatnonzero(slots < 0)
+        if len(fresh):
+            start = len(self._slots)
+            slots[fresh] = np.arange(start, start + len(fresh))
+            self._slots.update(zip(ids[fresh], slots[fresh].tolist()))
+            size = start + len(fresh)
+            self._sec_uid = _grow(self._sec_uid, size)
+            self._day = _grow(self._day, size)
+            self._hour = _grow(self._hour, size)
+            self._dow = _grow(self._dow, size)
+            self._values = _grow(self._values, size)
+        
+        self._sec_uid[slots] = rows['sec_uid'].to_numpy(dtype=object)
+        self._day[slots] = rows['day'].to_numpy(dtype='datetime64[ns]')
+        self._hour[slots] = rows['publish_hour'].to_numpy(dtype=np.int64)
+        self._dow[slots] = rows['day_of_week'].to_numpy(dtype=np.int64)
+        self._values[slots] = rows[self.MEASURES].to_numpy(dtype=np.int64)
+    
+    def update(self, df: pd.DataFrame, sec_uid: Optional[str] = None) -> 'AggregateCube':
+        """
+        导入一批视频或快照
+        
+        Args:
+            df: 视频数据DataFrame（需包含 video_id 与 create_time）
+            sec_uid: 博主ID；为空时使用 df 的 sec_uid 列
+        
+        Returns:
+            self
+        """
+        if df.empty or 'video_id' not in df.columns or 'create_time' not in df.columns:
+            return self
+        
+        rows = self._prepare(df, sec_uid)
+        if rows.empty:
+            return self
+        
+        # 已知视频先撤销上一次快照的贡献，再计入新快照（维度变化时也能正确迁移）
+        ids = rows.index.to_numpy(dtype=object)
+        slots = self._lookup(ids)
+        retract = self._state(slots[slots >= 0])
+        retract[self.MEASURES] = -retract[self.MEASURES]
+        retract['videos'] = -1
+        
+        delta = pd.concat([rows.assign(videos=1), retract]) if len(retract) else rows.assign(videos=1)
+        grouped = delta.groupby(self.DIMENSIONS, sort=False)[self.MEASURES + ['videos']].sum()
+        
+        cells = self.cells.add(grouped, fill_value=0).astype(np.int64)
+        self.cells = cells[cells['videos'] != 0]
+        self._store(ids, slots, rows)
+        
+        return self
+    
+    def merge(self, other: 'AggregateCube') -> 'AggregateCube':
+        """
+        合并另一个立方体（不同分片的视频集合应互不重叠）
+        
+        Args:
+            other: 另一个立方体
+        
+        Returns:
+            self
+        """
+        self.cells = self.cells.add(other.cells, fill_value=0).astype(np.int64)
+        ids = np.array(list(other._slots), dtype=object)
+        state = other._state(np.array(list(other._slots.values()), dtype=np.int64))
+        self._store(ids, self._lookup(ids), state)
+        return self
+    
+    def rollup(self, by: List[str], sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        按维度上卷
+        
+        Args:
+            by: 维度列表（sec_uid / day / publish_hour / day_of_week）
+            sec_uid: 只看某位博主
+        
+        Returns:
+            各维度组合的求和与视频数量
+        """
+        cells = self.cells
+        if sec_uid is not None:
+            cells = cells[cells.index.get_level_values('sec_uid') == sec_uid]
+        
+        return cells.groupby(level=by).sum().reset_index()
+    
+    def daily(self, sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        按日期统计（与 DataProcessor.get_daily_stats 输出一致）
+        
+        Args:
+            sec_uid: 博主ID，为空时汇总全部博主
+        
+        Returns:
+            按日期统计的DataFrame
+        """
+        if self.cells.empty:
+            return pd.DataFrame()
+        
+        daily = self.rollup(['day'], sec_uid).sort_values('day')
+        daily['day'] = daily['day'].dt.date
+        daily = daily[['day', 'likes', 'comments', 'shares', 'videos']]
+        daily.columns = ['日期', '点赞总数', '评论总数', '分享总数', '视频数量']
+        
+        return daily.reset_index(drop=True)
+    
+    def hourly(self, sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        按小时统计（与 DataProcessor.get_hourly_stats 输出一致）
+        
+        Args:
+            sec_uid: 博主ID，为空时汇总全部博主
+        
+        Returns:
+            按小时统计的DataFrame
+        """
+        if self.cells.empty:
+            return pd.DataFrame()
+        
+        hourly = self.rollup(['publish_hour'], sec_uid).sort_values('publish_hour')
+        hourly = pd.DataFrame({
+            '发布小时': hourly['publish_hour'].to_numpy(),
+            '平均点赞': hourly['likes'].to_numpy() / hourly['videos'].to_numpy(),
+            '平均评论': hourly['comments'].to_numpy() / hourly['videos'].to_numpy(),
+            '视频数量': hourly['videos'].to_numpy()
+        })
+        
+        return hourly
+    
+    def weekday_hour(self, measure: str = 'likes', sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        星期 × 小时 的平均值矩阵
+        
+        Args:
+            measure: 指标
+            sec_uid: 博主ID
+        
+        Returns:
+            7 行（星期一~星期日）× 24 列（小时）的DataFrame，没有视频的格子为 NaN
+        """
+        rolled = self.rollup(['day_of_week', 'publish_hour'], sec_uid)
+        matrix = np.full((7, 24), np.nan)
+        if not rolled.empty:
+            means = rolled[measure] / rolled['videos']
+            matrix[rolled['day_of_week'].to_numpy(), rolled['publish_hour'].to_numpy()] = means.to_numpy()
+        
+        return pd.DataFrame(matrix, index=range(7), columns=range(24))
@@ -0,0 +1,457 @@
+"""
+分析结果缓存模块
+
+功能：
+1. 按视频数据的内容哈希标识一份分析输入
+2. 有界 LRU 缓存（条目数 + 近似内存上限）
+3. 每份输入缓存处理后的DataFrame、统计、聚合结果和导出字节，页面重跑时直接复用
+4. 进程级共享缓存：博主资料、视频列表与分析结果在所有会话间只读共享（TTL 过期，可落盘）
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+
+def content_hash(videos: List[Dict]) -> str:
+    """
+    视频数据的内容哈希
+    
+    Args:
+        videos: 原始视频数据列表
+    
+    Returns:
+        32 位十六进制摘要（内容相同则相同，与对象身份无关）
+    """
+    if orjson is not None:
+        payload = orjson.dumps(videos, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    else:
+        payload = json.dumps(videos, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# 超过该行数的表按抽样估算字符串 / 对象列的占用
+SIZE_SAMPLE_ROWS = 1000
+
+
+def _frame_size(frame: pd.DataFrame) -> int:
+    """
+    DataFrame 的近似内存占用（含字符串 / 对象列的内容）
+    
+    deep=False 只统计对象列的指针，会严重低估标题 / 描述 / 话题等列；
+    行数较多时只对抽样行做 deep 统计再按比例放大，避免逐个元素计算。
+    """
+    if len(frame) <= SIZE_SAMPLE_ROWS:
+        return int(frame.memory_usage(index=True, deep=True).sum())
+    
+    shallow = frame.memory_usage(index=True, deep=False)
+    objects = [column for column in frame.columns if frame[column].dtype == object or
+               pd.api.types.is_string_dtype(frame[column].dtype)]
+    if not objects:
+        return int(shallow.sum())
+    positions = np.linspace(0, len(frame) - 1, SIZE_SAMPLE_ROWS).astype(np.int64)
+    sample = frame[objects].iloc[positions].memory_usage(index=False, deep=True)
+    deep = sample * (len(frame) / SIZE_SAMPLE_ROWS)
+    return int(shallow.drop(objects).sum() + deep.sum())
+
+
+def estimate_size(value: Any) -> int:
+    """近似内存占用（字节），用于缓存的容量控制"""
+    if isinstance(value, pd.DataFrame):
+        return _frame_size(value)
+    if isinstance(value, pd.Series):
+        return _frame_size(value.to_frame())
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (dict, MappingProxyType)):
+        return sum(estimate_size(item) for item in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    有界 LRU 缓存
+    
+    超过条目数或近似内存上限时淘汰最久未使用的条目；
+    设置 ttl（秒）后，写入超过 ttl 的条目视为不存在。所有操作加锁，可跨线程共享。
+    """
+    
+    def __init__(self, max_entries: int = 16, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._items: 'OrderedDict[str, Any]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.nbytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items and not self._expired(key)
+    
+    def _expired(self, key: str) -> bool:
+        return key in self._expires and self._expires[key] <= time.monotonic()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._items:
+                return default
+            if self._expired(key):
+                self.pop(key)
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+    
+    def put(self, key: str, value: Any, size: Optional[int] = None, ttl: Optional[float] = None):
+        with self._lock:
+            if key in self._items:
+                self.pop(key)
+            size = estimate_size(value) if size is None else size
+            self._items[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            ttl = self.ttl if ttl is None else ttl
+            if ttl is not None:
+                self._expires[key] = time.monotonic() + ttl
+            self._evict(keep=key)
+    
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._items:
+                return default
+            self.nbytes -= self._sizes.pop(key)
+            self._expires.pop(key, None)
+            return self._items.pop(key)
+    
+    def resize(self, key: str, delta: int):
+        """条目内容增长后更新其占用（例如往已缓存的字典里追加结果）"""
+        with self._lock:
+            if key in self._sizes:
+                self._sizes[key] += delta
+                self.nbytes += delta
+                self._evict(keep=key)
+    
+    def _evict(self, keep: Optional[str] = None):
+        # 至少保留刚写入的条目，即使它本身超过上限
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_entries
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._items))
+            if oldest == keep:
+                break
+            self.pop(oldest)
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._expires.clear()
+            self.nbytes = 0
+
+
+class KeyedLocks:
+    """按键加锁：同一个键的计算 / 采集只执行一次，其余调用者等待结果"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+    
+    def __call__(self, key: str) -> '_KeyLock':
+        return _KeyLock(self, key)
+    
+    def _acquire(self, key: str):
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+        lock.acquire()
+    
+    def _release(self, key: str):
+        with self._lock:
+            self._locks[key].release()
+            self._waiters[key] -= 1
+            # 没有人在等待时删除，锁表的大小与并发中的键数相同
+            if not self._waiters[key]:
+                del self._locks[key], self._waiters[key]
+
+
+class _KeyLock:
+    def __init__(self, locks: KeyedLocks, key: str):
+        self._locks = locks
+        self._key = key
+    
+    def __enter__(self):
+        self._locks._acquire(self._key)
+        return self
+    
+    def __exit__(self, *exc):
+        self._locks._release(self._key)
+
+
+class AnalysisCache:
+    """
+    按内容哈希缓存一份视频数据的全部派生结果
+    
+    每个哈希对应一个结果字典（df / stats / 各聚合 / 导出字节），
+    同一份数据的第一次访问才计算，之后的重跑只做渲染。
+    同一项结果被多个线程同时请求时只计算一次。
+    """
+    
+    def __init__(self, max_entries: int = 8, max_bytes: int = 512 * 1024 * 1024, ttl: Optional[float] = None):
+        self._cache = LRUCache(max_entries, max_bytes, ttl)
+        self._locks = KeyedLocks()
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    @property
+    def nbytes(self) -> int:
+        return self._cache.nbytes
+    
+    def get(self, key: str, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        取出（或计算并缓存）一项结果
+        
+        Args:
+            key: 内容哈希
+            name: 结果名称（df / stats / csv 等）
+            compute: 未缓存时的计算函数
+        
+        Returns:
+            结果
+        """
+        results = self._cache.get(key)
+        if results is not None and name in results:
+            return results[name]
+        
+        with self._locks(f'{key}:{name}'):
+            with self._cache._lock:
+                results = self._cache.get(key)
+                if results is None:
+                    results = {}
+                    self._cache.put(key, results, size=0)
+            
+            if name not in results:
+                value = compute()
+                results[name] = value
+                self._cache.resize(key, estimate_size(value))
+            return results[name]
+    
+    def invalidate(self, key: Optional[str] = None):
+        """清除某份数据（或全部）的缓存"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key)
+
+
+def _freeze(value: Any) -> Any:
+    """共享给多个会话的值转为只读视图（列表 → 元组，字典 → 只读映射）"""
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    return value
+
+
+class LocalStore:
+    """
+    共享缓存的本地落盘（每个条目一个 JSON 文件）
+    
+    进程重启后仍可在 TTL 内复用已采集的博主资料和视频列表。
+    """
+    
+    def __init__(self, directory: str, ttl: Optional[float] = None):
+        self.directory = Path(directory)
+        self.ttl = ttl
+    
+    def _path(self, namespace: str, key: str) -> Path:
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return self.directory / namespace / f'{name}.json'
+    
+    def load(self, namespace: str, key: str) -> Any:
+        """读取条目（不存在、已过期或损坏时为 None）"""
+        path = self._path(namespace, key)
+        try:
+            data = path.read_bytes()
+            record = orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return None
+        if record.get('key') != key:
+            return None
+        if self.ttl is not None and time.time() - record.get('stored_at', 0) > self.ttl:
+            return None
+        return record.get('value')
+    
+    def save(self, namespace: str, key: str, value: Any):
+        """写入条目（先写临时文件再替换，读取方不会看到写了一半的文件）"""
+        path = self._path(namespace, key)
+        record = {'key': key, 'stored_at': time.time(), 'value': value}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if orjson is not None:
+                data = orjson.dumps(record, default=_to_json)
+            else:
+                data = json.dumps(record, ensure_ascii=False, default=_to_json).encode('utf-8')
+            temp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            temp.write_bytes(data)
+            os.replace(temp, path)
+        except (OSError, TypeError) as e:
+            print(f"⚠️ 缓存写入失败: {e}")
+
+
+class SharedCache:
+    """
+    进程级共享缓存
+    
+    博主资料、视频列表和分析结果按键在所有会话间共享，节点内存与博主数而不是会话数成正比。
+    返回值是共享的只读数据（资料为只读映射，视频列表为元组；其中的视频字典和 DataFrame 由调用方约定不修改）；
+    同一个键同时被多个会话请求时只采集一次。可选的本地目录在进程重启后继续提供未过期的条目。
+    
+    Cookie 等会话私有状态不放在这里：采集器仍然每个会话一个。
+    """
+    
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024, ttl: Optional[float] = 1800,
+                 max_bloggers: int = 1024, store_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: 视频列表与分析结果合计的近似内存上限
+            ttl: 条目的有效期（秒），None 表示不过期
+            max_bloggers: 每类条目最多保留的数量
+            store_dir: 本地落盘目录（None 表示只在内存中）
+        """
+        self.ttl = ttl
+        self.profiles = LRUCache(max_bloggers, ttl=ttl)
+        self.videos = LRUCache(max_bloggers, max_bytes // 2, ttl)
+        self.analysis = AnalysisCache(max_bloggers, max_bytes // 2, ttl)
+        self.store = LocalStore(store_dir, ttl) if store_dir else None
+        self._locks = KeyedLocks()
+    
+    @property
+    def nbytes(self) -> int:
+        return self.profiles.nbytes + self.videos.nbytes + self.analysis.nbytes
+    
+    def _get_or_fetch(self, namespace: str, cache: LRUCache, key: str, fetch: Callable[[], Any],
+                      prepare: Callable[[Any], Any]) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            return value
+        
+        with self._locks(f'{namespace}:{key}'):
+            # 等锁期间可能已由其他会话采集完成
+            value = cache.get(key)
+            if value is not None:
+                return value
+            
+            raw = self.store.load(namespace, key) if self.store is not None else None
+            if raw is None:
+                raw = fetch()
+                # 没有结果（未找到 / 采集失败）不缓存，下次重新采集
+                if not raw:
+                    return None
+                if self.store is not None:
+                    self.store.save(namespace, key, raw)
+            
+            value = prepare(raw)
+            cache.put(key, value)
+            return value
+    
+    def get_profile(self, key: str, fetch: Callable[[], Optional[Dict]]) -> Optional[MappingProxyType]:
+        """
+        取出（或采集并缓存）博主资料
+        
+        Args:
+            key: 缓存键（如 数据模式 + 搜索方式 + 关键词）
+            fetch: 未缓存时的采集函数
+        
+        Returns:
+            只读的博主资料，未找到时为 None
+        """
+        return self._get_or_fetch('profiles', self.profiles, key, fetch, _freeze)
+    
+    def get_videos(self, key: str, fetch: Callable[[], List[Dict]]) -> Tuple[tuple, Optional[str]]:
+        """
+        取出（或采集并缓存）视频列表
+        
+        Args:
+            key: 缓存键（如 数据模式 + sec_uid + 天数）
+            fetch: 未缓存时的采集函数
+        
+        Returns:
+            (只读的视频列表, 内容哈希)；没有视频时为 ((), None)。
+            内容哈希在采集时计算一次，可直接作为 analysis 的键
+        """
+        entry = self._get_or_fetch('videos', self.videos, key, fetch,
+                                   lambda raw: (_freeze(raw), content_hash(raw)))
+        return entry if entry is not None else ((), None)
+    
+    def peek_videos(self, key: str) -> Tuple[tuple, Optional[str]]:
+        """
+        只查缓存（内存与本地落盘），不采集；未缓存时为 ((), None)
+        
+        不取采集锁：其他会话正在同步采集同一个键时立即返回，而不是等待整个采集结束。
+        """
+        entry = self.videos.get(key)
+        if entry is None and self.store is not None:
+            raw = self.store.load('videos', key)
+            if raw:
+                entry = (_freeze(raw), content_hash(raw))
+                self.videos.put(key, entry)
+        return entry if entry is not None else ((), None)
+    
+    def put_videos(self, key: str, videos: List[Dict]) -> Tuple[tuple, str]:
+        """
+        写入采集完成的视频列表（例如后台采集结束时）
+        
+        Args:
+            key: 缓存键
+            videos: 完整的视频列表
+        
+        Returns:
+            (只读的视频列表, 内容哈希)
+        """
+        if self.store is not None:
+            self.store.save('videos', key, videos)
+        entry = (_freeze(videos), content_hash(videos))
+        self.videos.put(key, entry)
+        return entry
+    
+    def invalidate(self, key: Optional[str] = None):
+        """清除某个键（或全部）的资料、视频与分析结果（本地落盘的条目由 TTL 过期）"""
+        if key is None:
+            self.profiles.clear()
+            self.videos.clear()
+            self.analysis.invalidate()
+        else:
+            self.profiles.pop(key)
+            entry = self.videos.pop(key)
+            if entry is not None:
+                self.analysis.invalidate(entry[1])
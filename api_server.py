@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+HTTP 分析接口（无界面）
+
+功能：
+1. 基于标准库 http.server 的 JSON 接口：博主资料、视频列表、统计、每日 / 每小时汇总、Top-K
+2. 视频列表游标分页（游标绑定数据版本，数据更新后旧游标失效）
+3. ETag / If-None-Match：响应由 数据内容哈希 + 路径 + 参数 决定，未变化时直接返回 304
+4. orjson 序列化，序列化后的响应体按内容哈希缓存，高频轮询只做一次计算
+
+用法：
+    python api_server.py --port 8000
+    curl 'http://127.0.0.1:8000/api/blogger?q=papi酱'
+    curl 'http://127.0.0.1:8000/api/bloggers/<sec_uid>/videos?limit=50&sort=likes'
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from analysis_cache import SharedCache
+from crawlers import DouyinCrawler
+from data_processor import DataProcessor
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# /top 可用的排序指标（数值列）
+TOP_METRICS = ('likes', 'comments', 'shares', 'collects', 'play_count', 'total_interactions',
+               'like_rate', 'engagement_rate')
+
+
+class APIError(Exception):
+    """带 HTTP 状态码的接口错误"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _default(value: Any) -> Any:
+    """orjson / json 无法直接序列化的类型"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (tuple, set)):
+        return list(value)
+    if hasattr(value, 'items'):
+        return dict(value.items())
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """序列化为 JSON 字节（NaN 输出为 null）"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    text = json.dumps(value, default=_default, ensure_ascii=False)
+    return re.sub(r'\bNaN\b', 'null', text).encode('utf-8')
+
+
+def records(df: pd.DataFrame) -> list:
+    """DataFrame 转为记录列表（时间转为 ISO 字符串，缺失值为 None）"""
+    if df.empty:
+        return []
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+def _encode_cursor(payload: Dict) -> str:
+    return base64.urlsafe_b64encode(dumps(payload)).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> Dict:
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
+        raise APIError(400, "cursor 无效")
+    if not isinstance(payload, dict) or not isinstance(payload.get('o'), int):
+        raise APIError(400, "cursor 无效")
+    return payload
+
+
+class AnalyticsService:
+    """
+    接口的业务层（与 HTTP 无关）
+    
+    博主资料与视频列表经由进程级 SharedCache 获取：同一位博主的多次请求只采集一次，
+    TTL 过期后重新采集，内容变化时内容哈希（以及 ETag）随之变化。
+    """
+    
+    def __init__(self, crawler: Optional[DouyinCrawler] = None, processor: Optional[DataProcessor] = None,
+                 cache: Optional[SharedCache] = None, days: int = 30):
+        """
+        Args:
+            crawler: 采集器（已设置 Cookie / 模式）
+            processor: 数据处理器
+            cache: 共享缓存
+            days: 采集近N天的视频
+        """
+        self.crawler = crawler or DouyinCrawler()
+        self.processor = processor or DataProcessor()
+        self.cache = cache or SharedCache()
+        self.days = days
+    
+    def profile(self, query: str, search_type: str = "博主名称"):
+        """搜索博主资料（未找到时为 None）"""
+        return self.cache.get_profile(
+            f"{self.crawler.data_mode}:{search_type}:{query}",
+            lambda: self.crawler.search_blogger(query, search_type)
+        )
+    
+    def content_key(self, sec_uid: str) -> str:
+        """博主当前视频数据的内容哈希（没有视频时抛出 404）"""
+        _, key = self._videos(sec_uid)
+        return key
+    
+    def _videos(self, sec_uid: str) -> Tuple[tuple, str]:
+        videos, key = self.cache.get_videos(
+            f"{self.crawler.data_mode}:{sec_uid}:{self.days}",
+            lambda: self.crawler.get_blogger_videos(sec_uid, days=self.days)
+        )
+        if key is None:
+            raise APIError(404, f"没有视频数据: {sec_uid}")
+        return videos, key
+    
+    def result(self, sec_uid: str, name: str, compute: Callable[[pd.DataFrame], Any]) -> Any:
+        """在处理后的视频数据上计算（并按内容哈希缓存）一项结果"""
+        videos, key = self._videos(sec_uid)
+        analysis = self.cache.analysis
+        settings = self.processor.settings_key
+        df = analysis.get(key, f'df@{settings}', lambda: self.processor.process_videos(videos, sec_uid=sec_uid))
+        return analysis.get(key, f'{name}@{settings}', lambda: compute(df))
+    
+    def videos(self, sec_uid: str, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+               sort: str = 'likes', ascending: bool = False, query: str = '') -> Dict:
+        """
+        视频列表（游标分页）
+        
+        Args:
+            sec_uid: 博主ID
+            limit: 每页数量
+            cursor: 上一页返回的 next_cursor，为空时从第一页开始
+            sort: 排序列
+            ascending: 是否升序
+            query: 标题 / 描述 / 话题关键词
+        
+        Returns:
+            {'items', 'total', 'next_cursor'}；游标与数据版本及排序 / 筛选参数绑定
+        """
+        key = self.content_key(sec_uid)
+        view = hashlib.blake2b(f'{key}|{sort}|{ascending}|{query}'.encode('utf-8'), digest_size=8).hexdigest()
+        offset = 0
+        if cursor:
+            payload = _decode_cursor(cursor)
+            if payload.get('v') != view:
+                raise APIError(410, "数据已更新或分页参数已变化，请从第一页重新获取")
+            offset = max(payload['o'], 0)
+        
+        table = self.result(sec_uid, 'api_table', lambda df: self.processor.build_paged_table(df))
+        if sort not in table.df.columns:
+            raise APIError(400, f"不支持的排序列: {sort}")
+        rows = table.rows(sort, ascending, query)
+        page = rows[offset:offset + limit]
+        end = offset + len(page)
+        return {
+            'items': records(table.df.iloc[page]),
+            'total': len(rows),
+            'next_cursor': _encode_cursor({'v': view, 'o': end}) if end < len(rows) else None,
+        }
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """路由、ETag 与错误处理"""
+    
+    server_version = 'DouyinAnalyticsAPI/1.0'
+    
+    ROUTES = [
+        (re.compile(r'^/api/health$'), 'health'),
+        (re.compile(r'^/api/blogger$'), 'blogger'),
+        (re.compile(r'^/api/bloggers/(?P<sec_uid>[^/]+)/videos$'), 'videos'),
+        (re.compile(r'^/api/bloggers/(?P<sec_uid>[^/]+)/stats$'), 'stats'),
+        (re.compile(r'^/api/bloggers/(?P<sec_uid>[^/]+)/daily$'), 'daily'),
+        (re.compile(r'^/api/bloggers/(?P<sec_uid>[^/]+)/hourly$'), 'hourly'),
+        (re.compile(r'^/api/bloggers/(?P<sec_uid>[^/]+)/top$'), 'top'),
+    ]
+    
+    @property
+    def service(self) -> AnalyticsService:
+        return self.server.service
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            for pattern, name in self.ROUTES:
+                match = pattern.match(url.path)
+                if match:
+                    getattr(self, f'_{name}')(url.path, params, **match.groupdict())
+                    return
+            raise APIError(404, f"未知路径: {url.path}")
+        except APIError as e:
+            self._send(e.status, dumps({'error': e.message}))
+        except Exception as e:
+            print(f"❌ 接口错误 [{self.path}]: {e}")
+            self._send(500, dumps({'error': str(e)}))
+    
+    def _respond(self, version: str, path: str, params: Dict[str, str], body: Callable[[], bytes],
+                 cache_key: Optional[str] = None):
+        """
+        按 ETag 返回响应
+        
+        Args:
+            version: 数据版本（内容哈希）
+            path: 请求路径
+            params: 规范化后的已知查询参数（参与 ETag 与响应体缓存的名称，不传原始查询串，
+                否则缓存破坏参数会让同一份数据的结果字典无限增长）
+            body: 生成响应体的函数（304 时不调用）
+            cache_key: 缓存响应体使用的内容哈希（为空时不缓存）
+        """
+        signature = f"{path}?{'&'.join(f'{k}={v}' for k, v in sorted(params.items()))}"
+        etag = '"' + hashlib.blake2b(f'{version}|{signature}'.encode('utf-8'), digest_size=16).hexdigest() + '"'
+        
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self._send(304, b'', etag)
+            return
+        
+        if cache_key is not None:
+            payload = self.service.cache.analysis.get(
+                cache_key, f'api:{signature}@{self.service.processor.settings_key}', body)
+        else:
+            payload = body()
+        self._send(200, payload, etag)
+    
+    def _send(self, status: int, payload: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f'private, max-age={self.server.max_age}')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(payload)
+    
+    def _int(self, params: Dict[str, str], name: str, default: int, upper: int) -> int:
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise APIError(400, f"{name} 必须是整数")
+        return min(max(value, 1), upper)
+    
+    def _health(self, path: str, params: Dict[str, str]):
+        cache = self.service.cache
+        self._send(200, dumps({'status': 'ok', 'cache_bytes': cache.nbytes, 'mode': self.service.crawler.data_mode}))
+    
+    def _blogger(self, path: str, params: Dict[str, str]):
+        query = params.get('q', '').strip()
+        if not query:
+            raise APIError(400, "缺少参数 q")
+        profile = self.service.profile(query, params.get('type', "博主名称"))
+        if not profile:
+            raise APIError(404, f"未找到博主: {query}")
+        payload = dumps(profile)
+        self._respond(hashlib.blake2b(payload, digest_size=16).hexdigest(), path,
+                      {'q': query, 'type': params.get('type', "博主名称")}, lambda: payload)
+    
+    def _videos(self, path: str, params: Dict[str, str], sec_uid: str):
+        limit = self._int(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+        ascending = params.get('order', 'desc') == 'asc'
+        sort, query, cursor = params.get('sort', 'likes'), params.get('q', '').strip(), params.get('cursor') or None
+        key = self.service.content_key(sec_uid)
+        normalized = {'limit': str(limit), 'sort': sort, 'order': 'asc' if ascending else 'desc', 'q': query}
+        if cursor:
+            normalized['cursor'] = cursor
+        # 只缓存不带关键词的第一页：后续页与搜索结果由 PagedTable 的排序 / 筛选缓存支撑，不逐个缓存响应体
+        self._respond(key, path, normalized, lambda: dumps(self.service.videos(
+            sec_uid, limit, cursor, sort, ascending, query
+        )), cache_key=key if not cursor and not query else None)
+    
+    def _stats(self, path: str, params: Dict[str, str], sec_uid: str):
+        key = self.service.content_key(sec_uid)
+        self._respond(key, path, {}, lambda: dumps(
+            self.service.result(sec_uid, 'stats', self.service.processor.get_statistics)
+        ), cache_key=key)
+    
+    def _daily(self, path: str, params: Dict[str, str], sec_uid: str):
+        key = self.service.content_key(sec_uid)
+        self._respond(key, path, {}, lambda: dumps(records(
+            self.service.result(sec_uid, 'daily_stats', self.service.processor.get_daily_stats)
+        )), cache_key=key)
+    
+    def _hourly(self, path: str, params: Dict[str, str], sec_uid: str):
+        key = self.service.content_key(sec_uid)
+        self._respond(key, path, {}, lambda: dumps(records(
+            self.service.result(sec_uid, 'hourly_stats', self.service.processor.get_hourly_stats)
+        )), cache_key=key)
+    
+    def _top(self, path: str, params: Dict[str, str], sec_uid: str):
+        n = self._int(params, 'n', 10, MAX_LIMIT)
+        by = params.get('by', 'likes')
+        if by not in TOP_METRICS:
+            raise APIError(400, f"不支持的排序指标: {by}（可选: {', '.join(TOP_METRICS)}）")
+        key = self.service.content_key(sec_uid)
+        # 每个指标只算一次最大的 MAX_LIMIT 条，不同的 n 只做切片；ETag 与响应缓存只看规范化后的参数
+        self._respond(key, path, {'by': by, 'n': str(n)}, lambda: dumps(records(
+            self.service.result(sec_uid, f'top:{by}',
+                                lambda df: self.service.processor.get_top_videos(df, MAX_LIMIT, by)).head(n)
+        )), cache_key=key)
+    
+    def log_message(self, format: str, *args):
+        # 高频轮询时不逐条打印访问日志
+        pass
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8000, service: Optional[AnalyticsService] = None,
+                  max_age: int = 60) -> ThreadingHTTPServer:
+    """
+    创建接口服务器（每个请求一个线程）
+    
+    Args:
+        host: 监听地址
+        port: 端口（0 表示随机端口）
+        service: 业务层，默认演示数据
+        max_age: 客户端可直接复用响应的秒数（之后带 If-None-Match 重新验证）
+    
+    Returns:
+        服务器对象，调用 serve_forever() 开始服务
+    """
+    server = ThreadingHTTPServer((host, port), APIRequestHandler)
+    server.daemon_threads = True
+    server.service = service or AnalyticsService()
+    server.max_age = max_age
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抖音博主数据分析 HTTP 接口")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=8000, help="端口")
+    parser.add_argument('--days', type=int, default=30, help="采集近N天的视频")
+    parser.add_argument('--cookie', default=os.environ.get('DOUYIN_COOKIE'), help="抖音Cookie（设置后使用真实数据）")
+    parser.add_argument('--cache-dir', default=os.environ.get('DOUYIN_CACHE_DIR'), help="共享缓存的本地落盘目录")
+    parser.add_argument('--max-age', type=int, default=60, help="响应的 Cache-Control max-age（秒）")
+    args = parser.parse_args()
+    
+    crawler = DouyinCrawler()
+    if args.cookie:
+        crawler.set_cookie(args.cookie)
+        crawler.enable_real_mode()
+    service = AnalyticsService(crawler, DataProcessor(), SharedCache(store_dir=args.cache_dir), days=args.days)
+    
+    server = create_server(args.host, args.port, service, args.max_age)
+    print(f"🚀 接口已启动: http://{args.host}:{server.server_address[1]}/api/health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止服务")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
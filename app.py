@@ -14,10 +14,15 @@ import pandas as pd
 from datetime import datetime, timedelta
 import time
 import json
+import os
 from pathlib import Path
+from typing import List
 
 from crawlers import DouyinCrawler
 from data_processor import DataProcessor
+from near_duplicates import NearDuplicateIndex
+from analysis_cache import SharedCache, content_hash
+from fetch_worker import FetchWorker, DONE, CANCELLED, fetch_all
 
 # 页面配置
 st.set_page_config(
@@ -27,15 +32,46 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def get_shared_cache() -> SharedCache:
+    """进程级共享缓存：所有会话共用同一份博主资料、视频列表与分析结果"""
+    return SharedCache(store_dir=os.environ.get('DOUYIN_CACHE_DIR'))
+
+
+@st.cache_resource
+def get_duplicate_index() -> NearDuplicateIndex:
+    """进程级近重复索引：所有会话的视频进入同一个有界索引，内存不随会话数增长"""
+    return NearDuplicateIndex(max_videos=DUPLICATE_INDEX_MAX_VIDEOS)
+
+
+@st.cache_resource
+def get_fetch_worker() -> FetchWorker:
+    """进程级后台采集任务表：页面重跑或其他会话可接回进行中的采集"""
+    return FetchWorker()
+
+
+# 趋势图的点数预算（约等于图表宽度的像素数）
+TREND_MAX_POINTS = 800
+
+# 近重复索引最多保留的视频数（超过后淘汰最早导入的视频）
+DUPLICATE_INDEX_MAX_VIDEOS = 200000
+
 # 初始化会话状态
 if 'crawler' not in st.session_state:
     st.session_state.crawler = DouyinCrawler()
 if 'processor' not in st.session_state:
-    st.session_state.processor = DataProcessor()
+    st.session_state.processor = DataProcessor(duplicates=get_duplicate_index())
 if 'current_blogger' not in st.session_state:
     st.session_state.current_blogger = None
 if 'videos_data' not in st.session_state:
     st.session_state.videos_data = None
+if 'videos_key' not in st.session_state:
+    st.session_state.videos_key = None
+if 'fetch_key' not in st.session_state:
+    st.session_state.fetch_key = None
+if 'comparison' not in st.session_state:
+    st.session_state.comparison = None
 
 
 def main():
@@ -63,6 +99,14 @@ def main():
         
         st.markdown("---")
         
+        # 多博主对比
+        st.header("👥 多博主对比")
+        compare_input = st.text_area("每行一个博主（按上方的搜索方式查找）", placeholder="papi酱\n疯产姐妹", height=100)
+        compare_queries = [line.strip() for line in compare_input.splitlines() if line.strip()]
+        compare_btn = st.button("开始对比", use_container_width=True)
+        
+        st.markdown("---")
+        
         # Cookie设置
         st.header("🍪 Cookie设置")
         
@@ -105,6 +149,9 @@ def main():
         if st.button("清除缓存数据", use_container_width=True):
             st.session_state.current_blogger = None
             st.session_state.videos_data = None
+            st.session_state.videos_key = None
+            st.session_state.fetch_key = None
+            st.session_state.comparison = None
             st.success("缓存已清除！")
         
         # 关于
@@ -120,6 +167,13 @@ def main():
     # 主内容区
     if search_btn and search_query:
         search_and_display(search_query, search_type)
+    elif compare_btn and compare_queries:
+        compare_and_display(compare_queries, search_type)
+    elif st.session_state.fetch_key is not None:
+        # 后台采集进行中（或刚结束）
+        display_fetch_progress()
+    elif st.session_state.comparison is not None:
+        display_blogger_comparison()
     elif st.session_state.videos_data is not None:
         # 显示已缓存的数据
         display_analysis()
@@ -130,31 +184,175 @@ def main():
 
 def search_and_display(query: str, search_type: str):
     """搜索并显示结果"""
+    fetching = False
+    st.session_state.comparison = None
     with st.spinner(f"正在搜索博主: {query}..."):
         try:
-            # 搜索博主
-            blogger_info = st.session_state.crawler.search_blogger(query, search_type)
+            # 搜索博主（博主资料与视频列表在所有会话间共享，其他会话已采集过则直接复用）
+            shared = get_shared_cache()
+            crawler = st.session_state.crawler
+            blogger_info = shared.get_profile(
+                f"{crawler.data_mode}:{search_type}:{query}",
+                lambda: crawler.search_blogger(query, search_type)
+            )
             
             if blogger_info:
                 st.session_state.current_blogger = blogger_info
                 
-                # 获取视频数据
-                with st.spinner("正在获取视频数据..."):
-                    videos = st.session_state.crawler.get_blogger_videos(
-                        blogger_info['sec_uid'],
-                        days=30
-                    )
-                    st.session_state.videos_data = videos
+                # 获取视频数据：已缓存则直接显示，否则在后台逐页采集
+                sec_uid = blogger_info['sec_uid']
+                fetch_key = f"{crawler.data_mode}:{sec_uid}:30"
+                videos, videos_key = shared.peek_videos(fetch_key)
+                st.session_state.videos_data = videos if videos_key else None
+                st.session_state.videos_key = videos_key
                 
-                # 显示分析结果
-                display_analysis()
+                if videos_key:
+                    st.session_state.fetch_key = None
+                    display_analysis()
+                else:
+                    get_fetch_worker().start(
+                        fetch_key,
+                        lambda notify: crawler.iter_blogger_videos(sec_uid, days=30, notify=notify),
+                        on_complete=lambda videos: shared.put_videos(fetch_key, videos)
+                    )
+                    st.session_state.fetch_key = fetch_key
+                    fetching = True
             else:
                 st.error(f"未找到博主: {query}")
                 st.info("💡 提示：请检查输入是否正确，或尝试其他名称/抖音号")
-                
+        
         except Exception as e:
             st.error(f"搜索失败: {str(e)}")
             st.info("💡 建议：抖音有反爬机制，可能需要稍后再试")
+    
+    # 在 try 之外渲染：进度页通过 st.rerun() 轮询
+    if fetching:
+        display_fetch_progress()
+
+
+def display_fetch_progress():
+    """显示后台采集的进度与已到达的部分结果，采集完成后切换为完整结果"""
+    fetch_key = st.session_state.fetch_key
+    job = get_fetch_worker().get(fetch_key)
+    
+    # 后台线程不能调用 st.*，采集中的提示记录在任务上，这里在主线程展示
+    for notice in (job.progress()['notices'] if job is not None else []):
+        st.warning(notice)
+    
+    if job is None or job.state == DONE:
+        # 采集完成：完整结果已写入共享缓存（已被淘汰时退回任务中的结果）
+        videos, videos_key = get_shared_cache().peek_videos(fetch_key)
+        if not videos_key and job is not None:
+            videos = job.videos()
+            videos_key = content_hash(videos) if videos else None
+        st.session_state.videos_data = videos
+        st.session_state.videos_key = videos_key
+        st.session_state.fetch_key = None
+        display_analysis()
+        return
+    
+    progress = job.progress()
+    if job.running:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.info(f"⏳ 正在后台采集：已获取 {progress['pages']} 页 / {progress['videos']} 个视频"
+                    f"（{progress['elapsed']} 秒），下方为已到达的部分数据")
+        with col2:
+            if st.button("⏹ 停止采集", use_container_width=True):
+                job.cancel()
+    elif job.state == CANCELLED:
+        st.warning(f"⏹ 采集已停止，仅分析已获取的 {progress['videos']} 个视频")
+    else:
+        st.error(f"采集失败: {progress['error']}")
+    
+    # 采集中的部分结果每次重跑都不同，不进入共享缓存（直接计算）；停止 / 失败后的结果按内容哈希缓存
+    partial = job.running
+    st.session_state.videos_data = job.videos()
+    st.session_state.videos_key = None
+    if not job.running:
+        st.session_state.fetch_key = None
+    
+    if st.session_state.videos_data or not job.running:
+        display_analysis(partial=partial)
+    
+    if job.running:
+        time.sleep(0.5)
+        st.rerun()
+
+
+def compare_and_display(queries: List[str], search_type: str):
+    """并发采集多位博主并显示对比"""
+    shared = get_shared_cache()
+    crawler = st.session_state.crawler
+    
+    def fetch(query: str):
+        # 与单博主搜索使用同一份共享缓存，已采集过的博主直接复用
+        profile = shared.get_profile(
+            f"{crawler.data_mode}:{search_type}:{query}",
+            lambda: crawler.search_blogger(query, search_type)
+        )
+        if not profile:
+            return None
+        sec_uid = profile.get('sec_uid', query)
+        videos, videos_key = shared.get_videos(
+            f"{crawler.data_mode}:{sec_uid}:30",
+            lambda: crawler.get_blogger_videos(sec_uid, days=30)
+        )
+        return {'profile': profile, 'sec_uid': sec_uid, 'videos': videos, 'videos_key': videos_key}
+    
+    with st.spinner(f"正在并发采集 {len(queries)} 位博主..."):
+        results = fetch_all({query: (lambda query=query: fetch(query)) for query in dict.fromkeys(queries)})
+    
+    missing = [query for query, result in results.items() if result is None]
+    if missing:
+        st.warning(f"⚠️ 未找到博主: {', '.join(missing)}")
+    
+    # 同一博主被不同关键词命中时只保留一次
+    bloggers = list({result['sec_uid']: result for result in results.values() if result is not None}.values())
+    st.session_state.fetch_key = None
+    st.session_state.comparison = {
+        'bloggers': bloggers,
+        'key': content_hash([blogger['videos_key'] for blogger in bloggers]),
+    }
+    display_blogger_comparison()
+
+
+def display_blogger_comparison():
+    """显示多博主对比（单视频中位数、互动率分布、发布节奏）"""
+    comparison = st.session_state.comparison
+    bloggers = [blogger for blogger in comparison['bloggers'] if blogger['videos']]
+    
+    st.markdown("### 👥 多博主对比")
+    if not bloggers:
+        st.info("没有可对比的视频数据")
+        return
+    
+    # 昵称重复时加上抖音号区分
+    nicknames = [blogger['profile'].get('nickname', blogger['sec_uid']) for blogger in bloggers]
+    labels = {
+        blogger['sec_uid']: name if nicknames.count(name) == 1 else f"{name}（{blogger['profile'].get('unique_id', '')}）"
+        for blogger, name in zip(bloggers, nicknames)
+    }
+    
+    result = cached(comparison['key'], 'blogger_comparison', lambda: st.session_state.processor.compare_bloggers(
+        {blogger['sec_uid']: blogger['videos'] for blogger in bloggers}
+    ))
+    metrics = result['metrics'].rename(index=labels)
+    metrics.index.name = '博主'
+    
+    st.dataframe(metrics, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### ❤️ 单视频点赞中位数")
+        st.bar_chart(metrics['点赞中位数'], use_container_width=True)
+    with col2:
+        st.markdown("#### 📅 每周发布数")
+        st.bar_chart(metrics['每周发布数'], use_container_width=True)
+    
+    if not result['distribution'].empty:
+        st.markdown("#### 📊 互动率分布（各博主视频占比）")
+        st.line_chart(result['distribution'].rename(columns=labels), use_container_width=True)
 
 
 def display_welcome():
@@ -182,8 +380,22 @@ def display_welcome():
     """)
 
 
-def display_analysis():
-    """显示数据分析结果"""
+def cached(cache_key: str, name: str, compute):
+    """按视频数据的内容哈希缓存计算结果（没有 key 时直接计算）"""
+    if cache_key is None:
+        return compute()
+    # 结果依赖会话的处理器设置（近重复检测会增加列），设置不同的会话不共用同一份结果
+    name = f"{name}@{st.session_state.processor.settings_key}"
+    return get_shared_cache().analysis.get(cache_key, name, compute)
+
+
+def display_analysis(partial: bool = False):
+    """
+    显示数据分析结果
+    
+    Args:
+        partial: 是否为采集中的部分结果（不写入共享缓存）
+    """
     if st.session_state.current_blogger is None:
         return
     
@@ -211,8 +423,20 @@ def display_analysis():
     if videos:
         st.markdown("### 📊 视频数据概览")
         
-        df = st.session_state.processor.process_videos(videos)
-        stats = st.session_state.processor.get_statistics(df)
+        # 同一份数据的处理结果按内容哈希缓存（所有会话共享），组件交互引起的重跑只做渲染
+        if partial:
+            cache_key = None
+        else:
+            cache_key = st.session_state.videos_key or content_hash(videos)
+        processor = st.session_state.processor
+        sec_uid = blogger.get('sec_uid')
+        df = cached(cache_key, 'df', lambda: processor.process_videos(videos, sec_uid=sec_uid, with_duplicates=False))
+        # 近重复标注取决于索引中其他博主的视频，不放进按内容哈希共享的 df；
+        # 之后依赖标注的结果按标注摘要另起缓存键
+        df = processor.mark_duplicates(df, sec_uid)
+        if cache_key is not None and 'duplicate_group' in df.columns:
+            cache_key = f"{cache_key}:{processor.duplicates_key(df)}"
+        stats = cached(cache_key, 'stats', lambda: processor.get_statistics(df))
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -231,36 +455,45 @@ def display_analysis():
         tab1, tab2, tab3, tab4 = st.tabs(["📋 排行榜", "📈 趋势图", "📊 详细数据", "🔍 对比分析"])
         
         with tab1:
-            display_ranking(df)
+            display_ranking(df, cache_key)
         
         with tab2:
-            display_trends(df)
+            display_trends(df, cache_key)
         
         with tab3:
-            display_details(df)
+            display_details(df, cache_key)
         
         with tab4:
-            display_comparison(df)
+            display_comparison(df, cache_key)
     else:
         st.warning("未获取到视频数据")
 
 
-def display_ranking(df: pd.DataFrame):
+def display_ranking(df: pd.DataFrame, cache_key: str = None):
     """显示点赞排行榜"""
     st.markdown("#### 🎬 视频排行榜（按点赞数排序）")
     
-    # 按点赞数排序
-    sorted_df = df.sort_values('likes', ascending=False)
+    # 同一内容的重复上传 / 轻改标题的搬运只保留点赞最高的一条
+    processor = st.session_state.processor
+    collapse = 'duplicate_group' in df.columns and st.checkbox("合并疑似重复 / 搬运视频", value=True)
+    if collapse:
+        collapsed = cached(cache_key, 'collapsed', lambda: processor.collapse_duplicates(df, by='likes'))
+        if len(collapsed) < len(df):
+            st.caption(f"🔁 已合并 {len(df) - len(collapsed)} 条疑似重复视频")
+        df = collapsed
     
-    # 显示前20个视频
-    top_videos = sorted_df.head(20)
+    # 显示前20个视频（部分排序，无需对全部视频排序）
+    top_videos = cached(cache_key, f'top_videos:{collapse}',
+                        lambda: processor.forecast_likes(processor.get_top_videos(df, n=20, by='likes')))
     
     # 创建展示数据
-    display_data = top_videos[['title', 'likes', 'comments', 'shares', 'create_time']].copy()
+    display_data = top_videos[['title', 'likes', 'comments', 'shares', 'likes_7d', 'likes_30d', 'create_time']].copy()
     display_data['likes'] = display_data['likes'].apply(lambda x: format_number(x))
     display_data['comments'] = display_data['comments'].apply(lambda x: format_number(x))
     display_data['shares'] = display_data['shares'].apply(lambda x: format_number(x))
-    display_data.columns = ['标题', '点赞', '评论', '分享', '发布时间']
+    display_data['likes_7d'] = display_data['likes_7d'].apply(lambda x: format_number(x))
+    display_data['likes_30d'] = display_data['likes_30d'].apply(lambda x: format_number(x))
+    display_data.columns = ['标题', '点赞', '评论', '分享', '7天后点赞(预测)', '30天后点赞(预测)', '发布时间']
     
     st.dataframe(
         display_data,
@@ -285,39 +518,51 @@ def display_ranking(df: pd.DataFrame):
         )
 
 
-def display_trends(df: pd.DataFrame):
+def display_trends(df: pd.DataFrame, cache_key: str = None):
     """显示数据趋势图"""
     st.markdown("#### 📈 发布时间与互动数据趋势")
     
-    # 按日期分组统计
-    df['date'] = pd.to_datetime(df['create_time']).dt.date
-    daily_stats = df.groupby('date').agg({
-        'likes': 'sum',
-        'comments': 'sum',
-        'shares': 'sum'
-    }).reset_index()
+    # 按日期分组统计（一次分组同时得到互动总数和视频数量，不修改 df）
+    daily_stats = cached(cache_key, 'daily_stats', lambda: st.session_state.processor.get_daily_stats(df))
     
     if not daily_stats.empty:
+        # 完整序列只构建一次；图表按点数预算降采样（保留峰值），缩小日期范围即回到更高的分辨率
+        trend = cached(cache_key, 'trend_series', lambda: st.session_state.processor.build_trend_series(daily_stats))
+        start, end = trend.bounds
+        if len(trend) > TREND_MAX_POINTS:
+            # 换了博主后上次选择的范围可能越界，重新从完整范围开始
+            selected = st.session_state.get('trend_range')
+            if selected and (selected[0] < start or selected[1] > end):
+                del st.session_state['trend_range']
+            start, end = st.slider("日期范围", min_value=start, max_value=end, value=(start, end), key='trend_range')
+        
         # 互动趋势图
         st.line_chart(
-            daily_stats.set_index('date')[['likes', 'comments', 'shares']],
+            trend.view(start, end, TREND_MAX_POINTS, columns=['likes', 'comments', 'shares']),
             use_container_width=True
         )
         
-        # 每日视频发布数量
-        daily_count = df.groupby('date').size()
+        # 每日视频发布数量（min/max 降采样，发布高峰不会被平均掉）
         st.markdown("#### 📅 每日发布视频数量")
-        st.bar_chart(daily_count, use_container_width=True)
+        st.bar_chart(trend.view(start, end, TREND_MAX_POINTS, method='minmax', columns=['videos'])['videos'],
+                     use_container_width=True)
     else:
         st.info("时间数据不完整，无法生成趋势图")
+    
+    # 发布时间热力图：相对博主自身平均点赞的提升度最高的时段
+    recommended = cached(cache_key, 'posting_times',
+                         lambda: st.session_state.processor.get_posting_heatmap(df).recommend(n=5, min_videos=2))
+    if not recommended.empty:
+        st.markdown("#### 🕐 推荐发布时间")
+        st.dataframe(recommended, use_container_width=True, hide_index=True)
 
 
-def display_details(df: pd.DataFrame):
+def display_details(df: pd.DataFrame, cache_key: str = None):
     """显示详细数据表格"""
     st.markdown("#### 📋 完整视频数据")
     
     # 可下载数据
-    csv = df.to_csv(index=False)
+    csv = cached(cache_key, 'csv', lambda: df.to_csv(index=False).encode('utf-8'))
     st.download_button(
         "📥 下载CSV数据",
         csv,
@@ -326,50 +571,78 @@ def display_details(df: pd.DataFrame):
         use_container_width=True
     )
     
-    # 详细表格
-    st.dataframe(
-        df[['title', 'likes', 'comments', 'shares', 'create_time', 'video_url']],
-        use_container_width=True,
-        hide_index=True
-    )
+    # 服务端分页：排序 / 筛选 / 分页在服务端完成，只把当前页交给前端序列化
+    table = cached(cache_key, 'paged_table', lambda: st.session_state.processor.build_paged_table(
+        df, ['title', 'likes', 'comments', 'shares', 'create_time', 'video_url']
+    ))
+    sort_columns = {'点赞数': 'likes', '评论数': 'comments', '分享数': 'shares', '发布时间': 'create_time', '标题': 'title'}
+    
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        query = st.text_input("筛选", placeholder="标题 / 描述 / 话题关键词，多个用空格分隔", key='details_query')
+    with col2:
+        sort_label = st.selectbox("排序", list(sort_columns), key='details_sort')
+    with col3:
+        page_size = st.selectbox("每页", [20, 50, 100, 200], index=1, key='details_page_size')
+    with col4:
+        descending = st.checkbox("降序", value=True, key='details_descending')
+    
+    total = table.count(query)
+    pages = max(1, -(-total // page_size))
+    # 筛选条件变化后总页数可能变少，页码先收回范围内
+    if st.session_state.get('details_page', 1) > pages:
+        st.session_state.details_page = pages
+    page = st.number_input("页码", min_value=1, max_value=pages, value=1, step=1, key='details_page')
+    
+    rows, total = table.page(page, page_size, sort_columns[sort_label], not descending, query)
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.caption(f"第 {page}/{pages} 页，共 {total} 条")
 
 
-def display_comparison(df: pd.DataFrame):
+def summarize_by_median(df: pd.DataFrame) -> dict:
+    """按点赞中位数把视频分为高赞 / 低赞两组，返回各组的数量与平均值"""
+    high = df['likes'] >= df['likes'].median()
+    return {
+        name: {
+            'count': int(mask.sum()),
+            'likes': df.loc[mask, 'likes'].mean(),
+            'comments': df.loc[mask, 'comments'].mean(),
+        }
+        for name, mask in (('high', high), ('low', ~high))
+    }
+
+
+def display_comparison(df: pd.DataFrame, cache_key: str = None):
     """显示对比分析"""
     st.markdown("#### 🔍 互动数据对比")
     
-    # 互动比率
-    df['like_comment_ratio'] = df['likes'] / (df['comments'] + 1)
-    df['engagement_rate'] = (df['likes'] + df['comments'] + df['shares']) / 10000
-    
-    # 高赞视频 vs 低赞视频
-    median_likes = df['likes'].median()
-    high_likes = df[df['likes'] >= median_likes]
-    low_likes = df[df['likes'] < median_likes]
+    # 高赞视频 vs 低赞视频（渲染函数不修改 df：它是缓存中共享的同一份数据）
+    summary = cached(cache_key, 'likes_split', lambda: summarize_by_median(df))
+    high_likes, low_likes = summary['high'], summary['low']
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("##### ⭐ 高赞视频（≥中位数）")
-        if len(high_likes) > 0:
-            st.metric("数量", len(high_likes))
-            st.metric("平均点赞", format_number(high_likes['likes'].mean()))
-            st.metric("平均评论", format_number(high_likes['comments'].mean()))
+        if high_likes['count'] > 0:
+            st.metric("数量", high_likes['count'])
+            st.metric("平均点赞", format_number(high_likes['likes']))
+            st.metric("平均评论", format_number(high_likes['comments']))
         else:
             st.info("无数据")
     
     with col2:
         st.markdown("##### 📉 低赞视频（<中位数）")
-        if len(low_likes) > 0:
-            st.metric("数量", len(low_likes))
-            st.metric("平均点赞", format_number(low_likes['likes'].mean()))
-            st.metric("平均评论", format_number(low_likes['comments'].mean()))
+        if low_likes['count'] > 0:
+            st.metric("数量", low_likes['count'])
+            st.metric("平均点赞", format_number(low_likes['likes']))
+            st.metric("平均评论", format_number(low_likes['comments']))
         else:
             st.info("无数据")
     
     # 互动率分布
     st.markdown("##### 📊 互动率分布")
-    engagement_data = df[['likes', 'comments', 'shares']].sum()
+    engagement_data = cached(cache_key, 'interaction_totals', lambda: df[['likes', 'comments', 'shares']].sum())
     total = engagement_data.sum()
     
     if total > 0:
@@ -0,0 +1,348 @@
+"""
+执行后端模块
+
+功能：
+1. DuckDB / Polars 多线程列式引擎执行 DataProcessor 的核心运算
+2. 引擎未安装时自动回退到 pandas
+3. 输入输出均为 pandas DataFrame，与 pandas 实现的结果格式一致
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+NUMERIC_COLS = ['likes', 'comments', 'shares', 'collects', 'play_count', 'duration']
+
+# 派生指标及其依赖列（顺序与 DataProcessor._calculate_metrics 一致）
+METRIC_DEPENDENCIES = [
+    ('total_interactions', ('likes', 'comments', 'shares')),
+    ('like_rate', ('likes', 'play_count')),
+    ('engagement_rate', ('total_interactions', 'play_count')),
+    ('comment_ratio', ('comments', 'total_interactions')),
+    ('share_ratio', ('shares', 'total_interactions')),
+    ('like_comment_ratio', ('likes', 'comments')),
+]
+
+
+def _available_metrics(columns) -> list:
+    available = set(columns)
+    metrics = []
+    for name, needs in METRIC_DEPENDENCIES:
+        if all(col in available for col in needs):
+            metrics.append(name)
+            available.add(name)
+    return metrics
+
+
+def _prepare_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    取出需要引擎处理的列
+    
+    字符串形式的数字需要在 Python 侧解析一次，其余转换交给引擎。
+    """
+    columns = {}
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            values = df[col]
+            if values.dtype == object:
+                values = pd.to_numeric(values, errors='coerce')
+            columns[col] = values
+    if 'create_time' in df.columns:
+        columns['create_time'] = df['create_time'].astype(str) if df['create_time'].dtype == object else df['create_time']
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _finish_processed(df: pd.DataFrame, engine_out: pd.DataFrame) -> pd.DataFrame:
+    """把引擎的计算结果写回原始DataFrame"""
+    engine_out.index = df.index
+    for col in engine_out.columns:
+        df[col] = engine_out[col]
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(int)
+    if 'create_time' in df.columns:
+        df['publish_date'] = df['create_time'].dt.date
+    return df
+
+
+class DuckDBBackend:
+    """DuckDB 后端（多线程，直接扫描 pandas 内存）"""
+    
+    name = 'duckdb'
+    
+    def __init__(self, threads: Optional[int] = None):
+        import duckdb
+        
+        self.con = duckdb.connect()
+        self.con.execute(f"SET threads = {threads or os.cpu_count() or 1}")
+    
+    def _query(self, sql: str, **frames) -> pd.DataFrame:
+        for name, frame in frames.items():
+            self.con.register(name, frame)
+        try:
+            return self.con.execute(sql).df()
+        finally:
+            for name in frames:
+                self.con.unregister(name)
+    
+    def process_videos(self, df: pd.DataFrame) -> pd.DataFrame:
+        raw = _prepare_raw(df)
+        selects = [f"CAST(TRUNC(COALESCE(TRY_CAST({col} AS DOUBLE), 0)) AS BIGINT) AS {col}"
+                   for col in NUMERIC_COLS if col in raw.columns]
+        if 'create_time' in raw.columns:
+            selects.append("TRY_CAST(create_time AS TIMESTAMP) AS create_time")
+        
+        formulas = {
+            'total_interactions': "likes + comments + shares",
+            'like_rate': "ROUND(likes / play_count * 100, 2)",
+            'engagement_rate': "ROUND((likes + comments + shares) / play_count * 100, 2)",
+            'comment_ratio': "ROUND(comments / (likes + comments + shares) * 100, 2)",
+            'share_ratio': "ROUND(shares / (likes + comments + shares) * 100, 2)",
+            'like_comment_ratio': "ROUND(likes / (comments + 1), 0)",
+        }
+        derived = [f"{formulas[name]} AS {name}" for name in _available_metrics(raw.columns)]
+        if 'create_time' in raw.columns:
+            derived += ["hour(create_time) AS publish_hour", "isodow(create_time) - 1 AS day_of_week"]
+        
+        sql = f"""
+            WITH cleaned AS (SELECT {', '.join(selects)} FROM raw)
+            SELECT *{''.join(', ' + expr for expr in derived)} FROM cleaned
+        """
+        out = self._query(sql, raw=raw)
+        
+        # publish_date 插在 publish_hour 之前，保持与 pandas 实现相同的列顺序
+        df = _finish_processed(df, out.drop(columns=['publish_hour', 'day_of_week'], errors='ignore'))
+        for col in ('publish_hour', 'day_of_week'):
+            if col in out.columns:
+                df[col] = out[col].to_numpy()
+        return df
+    
+    def get_statistics(self, df: pd.DataFrame) -> Dict:
+        row = self._query("""
+            SELECT COUNT(*) AS total_videos,
+                   SUM(likes) AS total_likes, SUM(comments) AS total_comments, SUM(shares) AS total_shares,
+                   AVG(likes) AS avg_likes, AVG(comments) AS avg_comments, AVG(shares) AS avg_shares,
+                   MAX(likes) AS max_likes, MIN(likes) AS min_likes,
+                   MEDIAN(likes) AS median_likes, COALESCE(STDDEV_SAMP(likes), 0) AS std_likes
+            FROM v
+        """, v=df[['likes', 'comments', 'shares']]).iloc[0]
+        return {key: int(value) for key, value in row.items()}
+    
+    def get_daily_stats(self, df: pd.DataFrame) -> pd.DataFrame:
+        daily = self._query("""
+            SELECT CAST(create_time AS DATE) AS day, SUM(likes) AS likes, SUM(comments) AS comments,
+                   SUM(shares) AS shares, COUNT(video_id) AS videos
+            FROM v WHERE create_time IS NOT NULL GROUP BY day ORDER BY day
+        """, v=df[['create_time', 'likes', 'comments', 'shares', 'video_id']])
+        daily['day'] = pd.to_datetime(daily['day']).dt.date
+        # DuckDB 的 SUM 返回 HUGEINT（取回后为 float），转回输入列的类型，与 pandas 实现一致
+        for col in ('likes', 'comments', 'shares'):
+            daily[col] = daily[col].fillna(0).astype(df[col].dtype)
+        daily['videos'] = daily['videos'].astype(np.int64)
+        daily.columns = ['日期', '点赞总数', '评论总数', '分享总数', '视频数量']
+        return daily
+    
+    def get_hourly_stats(self, df: pd.DataFrame) -> pd.DataFrame:
+        hourly = self._query("""
+            SELECT publish_hour, AVG(likes) AS likes, AVG(comments) AS comments, COUNT(video_id) AS videos
+            FROM v WHERE publish_hour IS NOT NULL GROUP BY publish_hour ORDER BY publish_hour
+        """, v=df[['publish_hour', 'likes', 'comments', 'video_id']])
+        hourly.columns = ['发布小时', '平均点赞', '平均评论', '视频数量']
+        return hourly
+    
+    def compare_periods(self, df: pd.DataFrame, split_dt: pd.Timestamp) -> Dict:
+        row = self._query("""
+            SELECT COUNT(*) FILTER (WHERE create_time < $split) AS early_videos,
+                   AVG(likes) FILTER (WHERE create_time < $split) AS early_avg,
+                   SUM(likes) FILTER (WHERE create_time < $split) AS early_total,
+                   COUNT(*) FILTER (WHERE create_time >= $split) AS late_videos,
+                   AVG(likes) FILTER (WHERE create_time >= $split) AS late_avg,
+                   SUM(likes) FILTER (WHERE create_time >= $split) AS late_total
+            FROM v
+        """.replace('$split', f"TIMESTAMP '{split_dt}'"), v=df[['create_time', 'likes']]).iloc[0]
+        return _period_result(row)
+    
+    def get_top_videos(self, df: pd.DataFrame, n: int, by: str) -> pd.DataFrame:
+        keys = pd.DataFrame({'k': df[by].to_numpy(), 'pos': np.arange(len(df))})
+        positions = self._query(
+            f"SELECT pos FROM v WHERE k IS NOT NULL ORDER BY k DESC, pos LIMIT {int(n)}", v=keys
+        )['pos'].to_numpy()
+        return df.iloc[positions]
+
+
+class PolarsBackend:
+    """Polars 后端（多线程惰性执行）"""
+    
+    name = 'polars'
+    
+    def __init__(self):
+        import polars
+        
+        self.pl = polars
+    
+    def process_videos(self, df: pd.DataFrame) -> pd.DataFrame:
+        pl = self.pl
+        raw = pl.from_pandas(_prepare_raw(df))
+        
+        exprs = [pl.col(col).cast(pl.Float64).fill_null(0).fill_nan(0).cast(pl.Int64)
+                 for col in NUMERIC_COLS if col in raw.columns]
+        if 'create_time' in raw.columns and raw.schema['create_time'] == pl.Utf8:
+            exprs.append(pl.col('create_time').str.to_datetime(strict=False))
+        
+        interactions = pl.col('likes') + pl.col('comments') + pl.col('shares')
+        formulas = {
+            'total_interactions': interactions,
+            'like_rate': (pl.col('likes') / pl.col('play_count') * 100).round(2),
+            'engagement_rate': (interactions / pl.col('play_count') * 100).round(2),
+            'comment_ratio': (pl.col('comments') / interactions * 100).round(2),
+            'share_ratio': (pl.col('shares') / interactions * 100).round(2),
+            'like_comment_ratio': (pl.col('likes') / (pl.col('comments') + 1)).round(0),
+        }
+        derived = [formulas[name].alias(name) for name in _available_metrics(raw.columns)]
+        
+        lazy = raw.lazy().with_columns(exprs).with_columns(derived)
+        if 'create_time' in raw.columns:
+            lazy = lazy.with_columns(
+                pl.col('create_time').dt.hour().alias('publish_hour'),
+                (pl.col('create_time').dt.weekday() - 1).alias('day_of_week')
+            )
+        out = lazy.collect().to_pandas()
+        
+        df = _finish_processed(df, out.drop(columns=['publish_hour', 'day_of_week'], errors='ignore'))
+        for col in ('publish_hour', 'day_of_week'):
+            if col in out.columns:
+                df[col] = out[col].to_numpy()
+        return df
+    
+    def get_statistics(self, df: pd.DataFrame) -> Dict:
+        pl = self.pl
+        frame = pl.from_pandas(df[['likes', 'comments', 'shares']])
+        row = frame.select(
+            pl.len().alias('total_videos'),
+            pl.col('likes').sum().alias('total_likes'),
+            pl.col('comments').sum().alias('total_comments'),
+            pl.col('shares').sum().alias('total_shares'),
+            pl.col('likes').mean().alias('avg_likes'),
+            pl.col('comments').mean().alias('avg_comments'),
+            pl.col('shares').mean().alias('avg_shares'),
+            pl.col('likes').max().alias('max_likes'),
+            pl.col('likes').min().alias('min_likes'),
+            pl.col('likes').median().alias('median_likes'),
+            pl.col('likes').std().fill_null(0).alias('std_likes'),
+        ).row(0, named=True)
+        return {key: int(value) for key, value in row.items()}
+    
+    def get_daily_stats(self, df: pd.DataFrame) -> pd.DataFrame:
+        pl = self.pl
+        daily = (
+            pl.from_pandas(df[['create_time', 'likes', 'comments', 'shares', 'video_id']])
+            .lazy()
+            .drop_nulls('create_time')
+            .group_by(pl.col('create_time').dt.date().alias('day'))
+            .agg(pl.col('likes').sum(), pl.col('comments').sum(), pl.col('shares').sum(),
+                 pl.col('video_id').count().alias('videos'))
+            .sort('day')
+            .collect()
+            .to_pandas()
+        )
+        daily['day'] = pd.to_datetime(daily['day']).dt.date
+        # Polars 的 sum 会把小整数类型升为 Int64，count 返回 UInt32，转回与 pandas 实现一致的类型
+        for col in ('likes', 'comments', 'shares'):
+            daily[col] = daily[col].fillna(0).astype(df[col].dtype)
+        daily['videos'] = daily['videos'].astype(np.int64)
+        daily.columns = ['日期', '点赞总数', '评论总数', '分享总数', '视频数量']
+        return daily
+    
+    def get_hourly_stats(self, df: pd.DataFrame) -> pd.DataFrame:
+        pl = self.pl
+        hourly = (
+            pl.from_pandas(df[['publish_hour', 'likes', 'comments', 'video_id']])
+            .lazy()
+            .drop_nulls('publish_hour')
+            .group_by('publish_hour')
+            .agg(pl.col('likes').mean(), pl.col('comments').mean(), pl.col('video_id').count().alias('videos'))
+            .sort('publish_hour')
+            .collect()
+            .to_pandas()
+        )
+        hourly.columns = ['发布小时', '平均点赞', '平均评论', '视频数量']
+        return hourly
+    
+    def compare_periods(self, df: pd.DataFrame, split_dt: pd.Timestamp) -> Dict:
+        pl = self.pl
+        early = pl.col('create_time') < split_dt
+        late = pl.col('create_time') >= split_dt
+        row = pl.from_pandas(df[['create_time', 'likes']]).select(
+            early.sum().alias('early_videos'),
+            pl.col('likes').filter(early).mean().alias('early_avg'),
+            pl.col('likes').filter(early).sum().alias('early_total'),
+            late.sum().alias('late_videos'),
+            pl.col('likes').filter(late).mean().alias('late_avg'),
+            pl.col('likes').filter(late).sum().alias('late_total'),
+        ).row(0, named=True)
+        return _period_result(pd.Series(row))
+    
+    def get_top_videos(self, df: pd.DataFrame, n: int, by: str) -> pd.DataFrame:
+        pl = self.pl
+        # Polars 把 NaN 当作比任何数都大的值，先转为 null 再丢弃，与 pandas 的 nlargest 一致
+        keys = pl.DataFrame({'k': df[by].to_numpy(), 'pos': np.arange(len(df))}, nan_to_null=True)
+        positions = keys.drop_nulls('k').top_k(n, by=['k', 'pos'], reverse=[False, True])
+        positions = positions.sort(['k', 'pos'], descending=[True, False])['pos'].to_numpy()
+        return df.iloc[positions]
+
+
+def _period_result(row: pd.Series) -> Dict:
+    """把两段聚合结果整理成 compare_periods 的返回格式"""
+    early_videos, late_videos = int(row['early_videos']), int(row['late_videos'])
+    early_avg = row['early_avg'] if early_videos > 0 else 0
+    late_avg = row['late_avg'] if late_videos > 0 else np.nan
+    
+    return {
+        'early_period': {
+            'videos': early_videos,
+            'avg_likes': early_avg,
+            'total_likes': int(row['early_total']) if early_videos > 0 else 0
+        },
+        'late_period': {
+            'videos': late_videos,
+            'avg_likes': row['late_avg'] if late_videos > 0 else 0,
+            'total_likes': int(row['late_total']) if late_videos > 0 else 0
+        },
+        'growth_rate': (
+            (late_avg - early_avg) / early_avg * 100 if early_videos > 0 and early_avg > 0 else 0
+        )
+    }
+
+
+BACKENDS = {
+    'duckdb': DuckDBBackend,
+    'polars': PolarsBackend,
+}
+
+
+def get_backend(name: str = 'pandas'):
+    """
+    获取执行后端
+    
+    Args:
+        name: pandas / duckdb / polars / auto（auto 依次尝试 duckdb、polars）
+        
+    Returns:
+        后端实例；pandas 或引擎未安装时返回 None（使用 pandas 实现）
+    """
+    if name == 'pandas':
+        return None
+    
+    candidates = list(BACKENDS) if name == 'auto' else [name]
+    for candidate in candidates:
+        if candidate not in BACKENDS:
+            raise ValueError(f"未知的执行后端: {candidate}")
+        try:
+            return BACKENDS[candidate]()
+        except ImportError:
+            if name != 'auto':
+                print(f"⚠️ 未安装 {candidate}，回退到 pandas")
+    
+    return None
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+DataProcessor 性能基准
+
+功能：
+1. 在不同数据规模下测量各处理函数的耗时和峰值内存
+2. 结果保存为 JSON
+3. 与保存的基线对比（按多次运行的中位数），发现性能回退
+
+使用方法：
+    python benchmark.py                              # 默认规模 1k / 100k / 1M / 10M
+    python benchmark.py --sizes 1000 100000          # 指定规模
+    python benchmark.py --save-baseline              # 把本次结果保存为基线（与机器相关，不提交到仓库）
+    python benchmark.py --baseline benchmark_baseline.json --tolerance 0.2
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Callable
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessor
+from synthetic_data import SyntheticDataGenerator
+
+
+DEFAULT_SIZES = [1000, 100000, 1000000, 10000000]
+DEFAULT_OUTPUT = 'benchmark_results.json'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+
+def build_dataset(rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    生成原始视频列数据
+    
+    话题和描述列对被测函数没有影响，去掉以节省内存。
+    """
+    generator = SyntheticDataGenerator(seed=seed)
+    batches = list(generator.video_batches(rows, n_bloggers=max(1, rows // 1000)))
+    columns = {
+        key: np.concatenate([batch[key] for batch in batches])
+        for key in batches[0] if key not in ('tags', 'desc')
+    }
+    # 与采集到的数据一样，时间以字符串形式交给 process_videos 解析
+    columns['create_time'] = columns['create_time'].astype('datetime64[s]').astype(str)
+    return columns
+
+
+def make_cases(processor: DataProcessor, raw: Dict[str, np.ndarray], df: pd.DataFrame) -> Dict[str, Callable]:
+    """被测函数（每个函数只做一次完整调用）"""
+    split_date = str(df['create_time'].quantile(0.5).date())
+    base = df[list(raw)].copy()
+    base['create_time'] = pd.to_datetime(base['create_time'])
+    
+    return {
+        # process_videos 接受列字典（pd.DataFrame 可直接构造），避免构造千万个 dict
+        'process_videos': lambda: processor.process_videos(raw),
+        '_calculate_metrics': lambda: processor._calculate_metrics(base.copy()),
+        'get_statistics': lambda: processor.get_statistics(df),
+        'get_daily_stats': lambda: processor.get_daily_stats(df),
+        'get_hourly_stats': lambda: processor.get_hourly_stats(df),
+        'compare_periods': lambda: processor.compare_periods(df, split_date),
+        'get_top_videos': lambda: processor.get_top_videos(df, n=20),
+        'export_data_csv': lambda: processor.export_data(df, 'csv'),
+        'export_data_json': lambda: processor.export_data(df, 'json'),
+    }
+
+
+def measure(func: Callable, repeat: int) -> Dict:
+    """
+    测量耗时（取多次的中位数，单次抖动不会造成误报）和峰值内存
+    
+    峰值内存单独跑一次，tracemalloc 的开销不计入耗时。
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'repeat': len(timings),
+        'peak_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def run(sizes: List[int], repeat: int, only: List[str] = None, backend: str = 'pandas') -> Dict:
+    """
+    运行全部基准
+    
+    Args:
+        sizes: 数据规模列表
+        repeat: 每个函数的重复次数（数据量 ≥ 1M 时最多 3 次）
+        only: 只运行这些函数
+        backend: DataProcessor 执行后端
+        
+    Returns:
+        结果字典
+    """
+    processor = DataProcessor(backend=backend)
+    results = []
+    
+    for rows in sizes:
+        print(f"\n📦 生成 {rows:,} 行数据...")
+        raw = build_dataset(rows)
+        df = processor.process_videos(raw)
+        
+        for name, func in make_cases(processor, raw, df).items():
+            if only and name not in only:
+                continue
+            result = measure(func, repeat if rows < 1000000 else min(repeat, 3))
+            results.append({'benchmark': name, 'rows': rows, **result})
+            print(f"  {name:<20} {result['seconds']:>10.4f}s  {result['peak_mb']:>10.1f} MB")
+        
+        del raw, df
+        gc.collect()
+    
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'backend': backend,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float, min_seconds: float = 0.01) -> List[str]:
+    """
+    与基线对比
+    
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        tolerance: 允许的变慢比例（0.2 表示慢 20% 以内不算回退）
+        min_seconds: 基线耗时低于该值的项目计时噪声太大，只展示不判定
+        
+    Returns:
+        回退项描述列表
+    """
+    reference = {(item['benchmark'], item['rows']): item for item in baseline.get('results', [])}
+    regressions = []
+    
+    print(f"\n📊 与基线对比（{baseline.get('meta', {}).get('timestamp', '未知时间')}）")
+    for item in current['results']:
+        base = reference.get((item['benchmark'], item['rows']))
+        if base is None:
+            continue
+        
+        ratio = item['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+        memory_ratio = item['peak_mb'] / base['peak_mb'] if base['peak_mb'] > 0 else 1.0
+        mark = '❌' if ratio > 1 + tolerance or memory_ratio > 1 + tolerance else '✅'
+        if mark == '❌' and base['seconds'] < min_seconds and memory_ratio <= 1 + tolerance:
+            mark = '➖'
+        print(f"  {mark} {item['benchmark']:<20} {item['rows']:>10,}  耗时 ×{ratio:.2f}  内存 ×{memory_ratio:.2f}")
+        
+        if mark == '❌':
+            regressions.append(
+                f"{item['benchmark']} @ {item['rows']:,} 行: 耗时 ×{ratio:.2f}, 内存 ×{memory_ratio:.2f}"
+            )
+    
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataProcessor 性能基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="数据规模（行数）")
+    parser.add_argument('--repeat', type=int, default=5, help="每个函数的重复次数（取中位数）")
+    parser.add_argument('--only', nargs='+', help="只运行指定的函数")
+    parser.add_argument('--backend', default='pandas', help="执行后端（pandas / duckdb / polars / auto）")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="结果输出文件")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="允许的变慢比例")
+    parser.add_argument('--min-seconds', type=float, default=0.01, help="低于该耗时的项目不判定回退")
+    args = parser.parse_args()
+    
+    current = run(args.sizes, args.repeat, args.only, args.backend)
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 结果已保存: {args.output}")
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"✅ 基线已保存: {args.baseline}")
+        return
+    
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"💡 未找到基线 {args.baseline}，可使用 --save-baseline 生成")
+        return
+    
+    regressions = compare(current, baseline, args.tolerance, args.min_seconds)
+    if regressions:
+        print("\n❌ 发现性能回退：")
+        for line in regressions:
+            print(f"  • {line}")
+        sys.exit(1)
+    
+    print("\n✅ 未发现性能回退")
+
+
+if __name__ == "__main__":
+    main()
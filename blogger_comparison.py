@@ -0,0 +1,191 @@
+"""
+多博主对比模块
+
+功能：
+1. 多位博主的视频合并为一张表，一次排序后按博主分组计算全部对比指标
+2. 单视频中位数（点赞 / 评论 / 分享）、互动率分位数、发布节奏（每周发布数、发布间隔）
+3. 所有博主共用同一组分箱的互动率分布，可直接并排比较
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+
+NS_PER_HOUR = 3600 * 10 ** 9
+NS_PER_DAY = 24 * NS_PER_HOUR
+NAT = np.iinfo(np.int64).min
+
+
+def _group_quantile(values: np.ndarray, starts: np.ndarray, valid: np.ndarray, q: float) -> np.ndarray:
+    """
+    已按 (博主, 值) 排序的数组中，每组的分位数（线性插值，与 pandas 默认一致）
+    
+    Args:
+        values: 组内升序、NaN 排在组尾的值
+        starts: 每组的起始位置
+        valid: 每组非 NaN 值的个数
+        q: 分位点（0~1）
+    """
+    if len(values) == 0:
+        return np.full(len(starts), np.nan)
+    position = (np.maximum(valid, 1) - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(valid - 1, 0))
+    # 空组的起点可能在数组末尾之后，取值后再由 valid 置为 NaN
+    last = len(values) - 1
+    low, high = values[np.minimum(starts + lower, last)], values[np.minimum(starts + upper, last)]
+    result = low + (high - low) * (position - lower)
+    return np.where(valid > 0, result, np.nan)
+
+
+class BloggerComparator:
+    """
+    多博主对比
+    
+    合并表按 sec_uid 编号排序一次，之后每个指标都是一次组内排序（lexsort）
+    加上按组起点取值 / bincount，不按博主循环。
+    """
+    
+    def __init__(self, quantiles: Sequence[float] = (0.25, 0.5, 0.75), bins: int = 20):
+        """
+        Args:
+            quantiles: 互动率分位点
+            bins: 互动率分布的分箱数
+        """
+        self.quantiles = tuple(quantiles)
+        self.bins = bins
+    
+    def _groups(self, df: pd.DataFrame):
+        # 调用方已去掉 sec_uid 为空的行，编号从 0 连续
+        codes, bloggers = pd.factorize(df['sec_uid'])
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.int64)
+        counts = np.diff(np.r_[starts, len(codes)])
+        return order, codes, starts, counts, bloggers
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, column: str, order: np.ndarray) -> np.ndarray:
+        if column not in df.columns:
+            return np.full(len(order), np.nan)
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)[order]
+        # 播放量为 0 时互动率为 inf，不参与统计
+        return np.where(np.isfinite(values), values, np.nan)
+    
+    def _sorted_within(self, values: np.ndarray, codes: np.ndarray):
+        """组内升序（NaN 在组尾）后的值，以及每组非 NaN 的个数"""
+        ordered = values[np.lexsort((values, codes))]
+        valid = np.bincount(codes, weights=~np.isnan(values))
+        return ordered, valid.astype(np.int64)
+    
+    def metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        每位博主一行的对比指标
+        
+        Args:
+            df: process_videos 的输出，需包含 sec_uid 列
+        
+        Returns:
+            DataFrame（索引为 sec_uid；视频数 / 点赞中位数 / 评论中位数 / 分享中位数 /
+            互动率P25 / P50 / P75 / 平均互动率 / 每周发布数 / 发布间隔中位数(小时) / 最长间隔(天) / 活跃天数）
+        """
+        if df.empty or 'sec_uid' not in df.columns:
+            return pd.DataFrame()
+        
+        df = df[df['sec_uid'].notna()]
+        order, codes, starts, counts, bloggers = self._groups(df)
+        result = pd.DataFrame({'视频数': counts}, index=pd.Index(bloggers, name='sec_uid'))
+        
+        for column, label in (('likes', '点赞中位数'), ('comments', '评论中位数'), ('shares', '分享中位数')):
+            ordered, valid = self._sorted_within(self._column(df, column, order), codes)
+            result[label] = _group_quantile(ordered, starts, valid, 0.5)
+        
+        engagement = self._column(df, 'engagement_rate', order)
+        ordered, valid = self._sorted_within(engagement, codes)
+        for q in self.quantiles:
+            result[f'互动率P{int(round(q * 100))}'] = np.round(_group_quantile(ordered, starts, valid, q), 2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            totals = np.bincount(codes, weights=np.nan_to_num(engagement), minlength=len(bloggers))
+            result['平均互动率'] = np.round(np.where(valid > 0, totals / valid, np.nan), 2)
+        
+        for label, values in self._cadence(df, order, codes, starts, counts).items():
+            result[label] = values
+        return result
+    
+    def _cadence(self, df: pd.DataFrame, order: np.ndarray, codes: np.ndarray,
+                 starts: np.ndarray, counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """发布节奏：组内按发布时间排序后相邻视频的间隔"""
+        groups = len(starts)
+        if 'create_time' not in df.columns:
+            return {}
+        
+        times = pd.to_datetime(df['create_time'], errors='coerce').to_numpy(dtype='datetime64[ns]').astype(np.int64)[order]
+        # NaT（int64 最小值）排在组首，只在有效时间之间计算间隔
+        times = times[np.lexsort((times, codes))]
+        valid_times = times != NAT
+        known = np.bincount(codes, weights=valid_times, minlength=groups).astype(np.int64)
+        first_valid = starts + (counts - known)
+        
+        last = times[starts + counts - 1]
+        first = times[np.minimum(first_valid, starts + counts - 1)]
+        span_days = np.where(known > 0, (last - first) / NS_PER_DAY, np.nan)
+        
+        gaps = np.diff(times).astype(np.float64) / NS_PER_HOUR
+        same_group = (codes[1:] == codes[:-1]) & valid_times[1:] & valid_times[:-1]
+        gap_codes = codes[1:][same_group]
+        gaps = gaps[same_group]
+        ordered = gaps[np.lexsort((gaps, gap_codes))]
+        gap_counts = np.bincount(gap_codes, minlength=groups)
+        gap_starts = np.r_[0, np.cumsum(gap_counts)[:-1]]
+        longest = np.zeros(groups)
+        np.maximum.at(longest, gap_codes, gaps)
+        
+        days = np.where(valid_times, times // NS_PER_DAY, NAT)
+        day_keys = np.unique(codes[valid_times].astype(np.int64) << 32 | (days[valid_times] & 0xFFFFFFFF))
+        active = np.bincount((day_keys >> 32).astype(np.int64), minlength=groups)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            per_week = known / np.maximum(span_days, 1.0) * 7
+        return {
+            '每周发布数': np.round(np.where(known > 0, per_week, np.nan), 2),
+            '发布间隔中位数(小时)': np.round(_group_quantile(ordered, gap_starts, gap_counts, 0.5), 1)
+            if len(ordered) else np.full(groups, np.nan),
+            '最长间隔(天)': np.round(np.where(gap_counts > 0, longest / 24, np.nan), 1),
+            '活跃天数': active,
+        }
+    
+    def distribution(self, df: pd.DataFrame, metric: str = 'engagement_rate',
+                     edges: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        所有博主共用同一组分箱的分布（各博主视频占比）
+        
+        Args:
+            df: 含 sec_uid 的视频DataFrame
+            metric: 指标列
+            edges: 分箱边界，默认为全体视频 1%~99% 分位之间等分 bins 个箱（两端箱包含超出部分）
+        
+        Returns:
+            DataFrame（索引为箱的下边界，每位博主一列，值为该博主落在该箱的视频占比）
+        """
+        if df.empty or 'sec_uid' not in df.columns or metric not in df.columns:
+            return pd.DataFrame()
+        
+        df = df[df['sec_uid'].notna()]
+        order, codes, starts, counts, bloggers = self._groups(df)
+        values = self._column(df, metric, order)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return pd.DataFrame()
+        
+        if edges is None:
+            low, high = np.percentile(values[valid], [1, 99])
+            edges = np.linspace(low, high if high > low else low + 1, self.bins + 1)
+        bins = len(edges) - 1
+        position = np.clip(np.searchsorted(edges, values[valid], side='right') - 1, 0, bins - 1)
+        
+        groups = len(bloggers)
+        histogram = np.bincount(codes[valid] * bins + position, minlength=groups * bins).reshape(groups, bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shares = histogram / histogram.sum(axis=1, keepdims=True)
+        return pd.DataFrame(shares.T, index=pd.Index(np.round(edges[:-1], 2), name=metric), columns=bloggers)
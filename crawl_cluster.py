@@ -0,0 +1,447 @@
+"""
+多节点分片采集模块
+
+功能：
+1. 一致性哈希环：每个 sec_uid 固定分给一个节点，节点增减时只迁移约 1/N 的博主
+2. 共享任务队列（SQLite 文件，多进程 / 多机挂载同一文件即可；换成服务端数据库时接口不变）
+3. 租约：节点领取任务时写入租约到期时间，完成时校验租约持有者，过期租约可被其他节点接手
+4. 任务窃取：自己的任务做完后接手失联节点（心跳超时）的任务，保证不重复采集、不丢任务
+5. 每个博主的高水位（已见过的最新发布时间）随任务保存，换节点后仍能区分新视频
+
+用法：
+    queue = JobQueue('crawl.db')
+    queue.submit(sec_uids)
+    CrawlNode('node-1', queue).run()   # 每台机器 / 每个 Cookie 启动一个节点
+"""
+
+import argparse
+import bisect
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from analysis_cache import SharedCache
+from crawlers import DouyinCrawler
+
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _point(value: str) -> int:
+    """哈希环上的位置（跨进程稳定）"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    一致性哈希环
+    
+    每个节点在环上放 replicas 个虚拟点，键顺时针找到的第一个点所属节点即负责该键。
+    """
+    
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        """
+        Args:
+            nodes: 节点ID
+            replicas: 每个节点的虚拟点数（越多分布越均匀）
+        """
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def add(self, node: str):
+        """加入节点"""
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = _point(f'{node}#{replica}')
+            position = bisect.bisect(self._points, point)
+            self._points.insert(position, point)
+            self._owners.insert(position, node)
+    
+    def remove(self, node: str):
+        """移除节点"""
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        keep = [i for i, owner in enumerate(self._owners) if owner != node]
+        self._points = [self._points[i] for i in keep]
+        self._owners = [self._owners[i] for i in keep]
+    
+    def node_for(self, key: str) -> Optional[str]:
+        """负责该键的节点（环为空时为 None）"""
+        if not self._points:
+            return None
+        position = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[position]
+
+
+class JobQueue:
+    """
+    基于 SQLite 的共享采集队列
+    
+    jobs 表每个博主一行（sec_uid 为主键，重复提交不会产生重复任务），
+    领取 / 完成都在 BEGIN IMMEDIATE 事务中进行，多个进程同时领取也不会拿到同一个任务。
+    """
+    
+    def __init__(self, path: str, dead_after: float = 60, max_attempts: int = 3):
+        """
+        Args:
+            path: SQLite 文件路径
+            dead_after: 心跳超过该秒数的节点视为失联
+            max_attempts: 任务最多尝试次数，之后标记为失败
+        """
+        self.path = path
+        self.dead_after = dead_after
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        # executescript 自带提交，不放在事务里
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                sec_uid TEXT PRIMARY KEY,
+                days INTEGER NOT NULL,
+                node TEXT,
+                state TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                high_water TEXT,
+                videos INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_node ON jobs (state, node);
+            CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (state, lease_expires);
+            CREATE TABLE IF NOT EXISTS nodes (
+                node TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL
+            );
+        """)
+    
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # 每个线程一个连接；isolation_level=None 以便手动控制事务
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+    
+    def _transaction(self):
+        return _Transaction(self._db)
+    
+    def heartbeat(self, node: str, lease_seconds: Optional[float] = None):
+        """
+        节点心跳（同时续期该节点持有的租约）
+        
+        Args:
+            node: 节点ID
+            lease_seconds: 续期后的租约时长，为空时不续期
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute('INSERT INTO nodes (node, last_seen) VALUES (?, ?) '
+                       'ON CONFLICT(node) DO UPDATE SET last_seen = excluded.last_seen', (node, now))
+            if lease_seconds is not None:
+                db.execute('UPDATE jobs SET lease_expires = ? WHERE state = ? AND lease_owner = ?',
+                           (now + lease_seconds, LEASED, node))
+    
+    def leave(self, node: str):
+        """节点正常退出：注销并交还未完成的租约"""
+        with self._transaction() as db:
+            db.execute('DELETE FROM nodes WHERE node = ?', (node,))
+            db.execute('UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL '
+                       'WHERE state = ? AND lease_owner = ?', (PENDING, LEASED, node))
+    
+    def live_nodes(self) -> List[str]:
+        """心跳未超时的节点"""
+        rows = self._db.execute('SELECT node FROM nodes WHERE last_seen >= ? ORDER BY node',
+                                (time.time() - self.dead_after,)).fetchall()
+        return [node for node, in rows]
+    
+    def submit(self, sec_uids: Iterable[str], days: int = 30, ring: Optional[HashRing] = None) -> int:
+        """
+        提交采集任务（已完成 / 失败的任务重新排队，排队或进行中的任务不变）
+        
+        Args:
+            sec_uids: 博主ID
+            days: 采集近N天
+            ring: 分配节点使用的哈希环（默认按当前在线节点构建）
+        
+        Returns:
+            新排队的任务数
+        """
+        ring = ring or HashRing(self.live_nodes())
+        now = time.time()
+        rows = [(sec_uid, days, ring.node_for(sec_uid), PENDING, now) for sec_uid in dict.fromkeys(sec_uids)]
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("""
+                INSERT INTO jobs (sec_uid, days, node, state, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(sec_uid) DO UPDATE SET
+                    days = excluded.days, node = excluded.node, state = excluded.state,
+                    attempts = 0, error = NULL, updated_at = excluded.updated_at
+                WHERE jobs.state IN ('done', 'failed')
+            """, rows)
+            return db.total_changes - before
+    
+    def rebalance(self, ring: HashRing) -> int:
+        """
+        按哈希环重新分配排队中的任务（节点加入 / 退出后调用）
+        
+        Returns:
+            改变归属的任务数
+        """
+        with self._transaction() as db:
+            pending = db.execute('SELECT sec_uid, node FROM jobs WHERE state = ?', (PENDING,)).fetchall()
+            moved = [(ring.node_for(sec_uid), sec_uid) for sec_uid, node in pending if ring.node_for(sec_uid) != node]
+            db.executemany('UPDATE jobs SET node = ? WHERE sec_uid = ?', moved)
+        return len(moved)
+    
+    def claim(self, node: str, limit: int = 8, lease_seconds: float = 120, steal: bool = True) -> List[Dict]:
+        """
+        领取任务
+        
+        依次取：分给本节点的排队任务 → 租约已过期的任务 → 失联节点名下的排队任务（后两类即任务窃取）。
+        租约过期且已用完尝试次数的任务（节点每次都在采集中途失联 / 卡死）先标记为失败，不再重新租出。
+        
+        Args:
+            node: 节点ID
+            limit: 最多领取数
+            lease_seconds: 租约时长（到期前需完成或通过心跳续期）
+            steal: 自己的任务不足时是否接手其他节点的任务
+        
+        Returns:
+            [{'sec_uid', 'days', 'high_water', 'attempts'}]
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL,
+                    error = COALESCE(error, '租约多次过期'), updated_at = ?
+                WHERE state = ? AND lease_expires < ? AND attempts >= ?
+            """, (FAILED, now, LEASED, now, self.max_attempts))
+            rows = db.execute('SELECT sec_uid FROM jobs WHERE state = ? AND node = ? LIMIT ?',
+                              (PENDING, node, limit)).fetchall()
+            if steal and len(rows) < limit:
+                rows += db.execute('SELECT sec_uid FROM jobs WHERE state = ? AND lease_expires < ? LIMIT ?',
+                                   (LEASED, now, limit - len(rows))).fetchall()
+            if steal and len(rows) < limit:
+                rows += db.execute("""
+                    SELECT sec_uid FROM jobs WHERE state = ? AND (node IS NULL OR node NOT IN
+                        (SELECT node FROM nodes WHERE last_seen >= ?)) LIMIT ?
+                """, (PENDING, now - self.dead_after, limit - len(rows))).fetchall()
+            
+            sec_uids = [sec_uid for sec_uid, in rows]
+            db.executemany(
+                'UPDATE jobs SET state = ?, node = ?, lease_owner = ?, lease_expires = ?, '
+                'attempts = attempts + 1, updated_at = ? WHERE sec_uid = ?',
+                [(LEASED, node, node, now + lease_seconds, now, sec_uid) for sec_uid in sec_uids]
+            )
+            if not sec_uids:
+                return []
+            placeholders = ','.join('?' * len(sec_uids))
+            jobs = db.execute(f'SELECT sec_uid, days, high_water, attempts FROM jobs WHERE sec_uid IN ({placeholders})',
+                              sec_uids).fetchall()
+        return [{'sec_uid': sec_uid, 'days': days, 'high_water': high_water, 'attempts': attempts}
+                for sec_uid, days, high_water, attempts in jobs]
+    
+    def complete(self, node: str, sec_uid: str, videos: int, high_water: Optional[str] = None) -> bool:
+        """
+        标记完成（只有当前租约持有者可以完成）
+        
+        Returns:
+            是否成功；租约已被其他节点接手时为 False，结果应丢弃
+        """
+        with self._transaction() as db:
+            cursor = db.execute("""
+                UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, videos = ?,
+                    high_water = COALESCE(?, high_water), error = NULL, updated_at = ?
+                WHERE sec_uid = ? AND state = ? AND lease_owner = ?
+            """, (DONE, videos, high_water, time.time(), sec_uid, LEASED, node))
+            return cursor.rowcount == 1
+    
+    def fail(self, node: str, sec_uid: str, error: str) -> bool:
+        """标记失败：未超过最大尝试次数时重新排队（仍归本节点），否则标记为失败"""
+        with self._transaction() as db:
+            cursor = db.execute("""
+                UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ?
+                WHERE sec_uid = ? AND state = ? AND lease_owner = ?
+            """, (self.max_attempts, FAILED, PENDING, error, time.time(), sec_uid, LEASED, node))
+            return cursor.rowcount == 1
+    
+    def stats(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        rows = self._db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, **dict(rows)}
+    
+    def jobs(self) -> pd.DataFrame:
+        """全部任务（排查用）"""
+        return pd.read_sql_query('SELECT * FROM jobs ORDER BY sec_uid', self._db)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE 事务（一开始就取得写锁，并发领取时不会读到同一批任务）"""
+    
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+    
+    def __enter__(self) -> sqlite3.Connection:
+        self._db.execute('BEGIN IMMEDIATE')
+        return self._db
+    
+    def __exit__(self, exc_type, *exc):
+        self._db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+class CrawlNode:
+    """
+    采集节点
+    
+    循环：心跳 → 发现在线节点变化时重新分配 → 领取一批任务 → 采集 → 完成（校验租约）。
+    采集结果写入本节点的 SharedCache；因为同一博主总落在同一节点，缓存与高水位一直是热的。
+    """
+    
+    def __init__(self, node_id: str, queue: JobQueue, crawler: Optional[DouyinCrawler] = None,
+                 cache: Optional[SharedCache] = None, batch: int = 8, lease_seconds: float = 120,
+                 idle_sleep: float = 1.0, crawl: Optional[Callable[[str, int], List[Dict]]] = None,
+                 replicas: int = 64):
+        """
+        Args:
+            node_id: 节点ID（每个节点唯一）
+            queue: 共享任务队列
+            crawler: 采集器（每个节点使用自己的 Cookie）
+            cache: 本节点的共享缓存
+            batch: 每次领取的任务数
+            lease_seconds: 租约时长
+            idle_sleep: 没有任务时的等待秒数
+            crawl: 采集函数 (sec_uid, days) -> 视频列表，默认 crawler.get_blogger_videos
+            replicas: 哈希环每个节点的虚拟点数
+        """
+        self.node_id = node_id
+        self.queue = queue
+        self.crawler = crawler or DouyinCrawler()
+        self.cache = cache
+        self.batch = batch
+        self.lease_seconds = lease_seconds
+        self.idle_sleep = idle_sleep
+        self.crawl = crawl or self.crawler.get_blogger_videos
+        self.replicas = replicas
+        self.high_water: Dict[str, str] = {}
+        self.crawled = 0
+        self._members: Sequence[str] = ()
+    
+    def _sync_membership(self):
+        """在线节点变化时按新的哈希环重新分配排队任务"""
+        members = tuple(self.queue.live_nodes())
+        if members != self._members:
+            self._members = members
+            moved = self.queue.rebalance(HashRing(members, self.replicas))
+            if moved:
+                print(f"🔀 [{self.node_id}] 节点变化（{len(members)} 个在线），重新分配 {moved} 个任务")
+    
+    def run_once(self) -> int:
+        """
+        执行一轮：心跳、领取并完成一批任务
+        
+        Returns:
+            本轮完成的任务数
+        """
+        self.queue.heartbeat(self.node_id, self.lease_seconds)
+        self._sync_membership()
+        done = 0
+        for job in self.queue.claim(self.node_id, self.batch, self.lease_seconds):
+            sec_uid = job['sec_uid']
+            try:
+                videos = self.crawl(sec_uid, job['days'])
+            except Exception as e:
+                print(f"❌ [{self.node_id}] 采集失败 [{sec_uid}]: {e}")
+                self.queue.fail(self.node_id, sec_uid, str(e))
+                continue
+            
+            previous = self.high_water.get(sec_uid) or job['high_water']
+            high_water = max((str(video['create_time']) for video in videos if video.get('create_time')),
+                             default=previous)
+            if previous is not None and high_water is not None:
+                high_water = max(previous, high_water)
+            
+            if not self.queue.complete(self.node_id, sec_uid, len(videos), high_water):
+                # 租约已过期并被其他节点接手：以对方的结果为准
+                print(f"⚠️ [{self.node_id}] 租约已失效，丢弃结果 [{sec_uid}]")
+                continue
+            if high_water is not None:
+                self.high_water[sec_uid] = high_water
+            if self.cache is not None:
+                self.cache.put_videos(f"{self.crawler.data_mode}:{sec_uid}:{job['days']}", videos)
+            self.crawled += 1
+            done += 1
+            # 每完成一个任务续期一次，批内剩余任务的租约不会在采集过程中过期
+            self.queue.heartbeat(self.node_id, self.lease_seconds)
+        return done
+    
+    def run(self, stop: Optional[threading.Event] = None, exit_when_idle: bool = False):
+        """
+        持续运行
+        
+        Args:
+            stop: 停止信号
+            exit_when_idle: 队列中没有可领取的任务时退出（批量采集用）
+        """
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                if self.run_once() == 0:
+                    stats = self.queue.stats()
+                    if exit_when_idle and stats[PENDING] == 0 and stats[LEASED] == 0:
+                        break
+                    stop.wait(self.idle_sleep)
+        finally:
+            self.queue.leave(self.node_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分片采集节点")
+    parser.add_argument('--db', default='crawl_queue.db', help="共享队列的 SQLite 文件")
+    parser.add_argument('--node', required=True, help="节点ID")
+    parser.add_argument('--submit', nargs='*', default=[], help="提交要采集的博主 sec_uid")
+    parser.add_argument('--days', type=int, default=30, help="采集近N天的视频")
+    parser.add_argument('--cookie', default=None, help="本节点使用的抖音Cookie")
+    parser.add_argument('--cache-dir', default=None, help="本节点共享缓存的落盘目录")
+    parser.add_argument('--exit-when-idle', action='store_true', help="队列清空后退出")
+    args = parser.parse_args()
+    
+    queue = JobQueue(args.db)
+    crawler = DouyinCrawler()
+    if args.cookie:
+        crawler.set_cookie(args.cookie)
+        crawler.enable_real_mode()
+    
+    node = CrawlNode(args.node, queue, crawler, SharedCache(store_dir=args.cache_dir))
+    queue.heartbeat(args.node)
+    if args.submit:
+        print(f"📥 新排队 {queue.submit(args.submit, args.days)} 个任务")
+    try:
+        node.run(exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        print("\n已停止节点")
+    print(f"✅ [{args.node}] 完成 {node.crawled} 个任务，队列状态: {queue.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,15 @@ import httpx
 import json
 import re
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional
 import time
 import asyncio
+import zlib
+
+
+def _stable_hash(value: str) -> int:
+    """跨进程稳定的字符串哈希（内置 hash() 对字符串按进程加盐，结果不可复现）"""
+    return zlib.crc32(value.encode('utf-8'))
 
 
 class DouyinCrawler:
@@ -44,6 +50,11 @@ class DouyinCrawler:
         """启用模拟数据模式"""
         self._demo_mode = True
         
+    @property
+    def data_mode(self) -> str:
+        """当前实际使用的数据来源（real / demo），可用于区分缓存"""
+        return 'real' if not self._demo_mode and self.cookie else 'demo'
+        
     def search_blogger(self, query: str, search_type: str = "博主名称") -> Optional[Dict]:
         """
         搜索博主
@@ -78,37 +89,59 @@ class DouyinCrawler:
         
         return None
     
-    def get_blogger_videos(self, sec_uid: str, days: int = 30) -> List[Dict]:
+    def get_blogger_videos(self, sec_uid: str, days: int = 30,
+                           notify: Optional[Callable[[str], None]] = None) -> List[Dict]:
         """
         获取博主视频列表
         
         Args:
             sec_uid: 博主SEC UID
             days: 获取近N天的数据
+            notify: 接收提示信息的函数（后台线程中调用时由主线程负责展示），默认打印
             
         Returns:
             视频列表
         """
         # 如果启用了真实数据模式且有Cookie
         if not self._demo_mode and self.cookie:
-            real_videos = self._get_real_videos(sec_uid, days)
+            real_videos = self._get_real_videos(sec_uid, days, notify)
             if real_videos:
                 return real_videos
         
         # 使用模拟数据
         return self._get_demo_videos(days)
     
-    def _get_real_videos(self, sec_uid: str, days: int) -> List[Dict]:
+    def iter_blogger_videos(self, sec_uid: str, days: int = 30, page_size: int = 20,
+                            notify: Optional[Callable[[str], None]] = None) -> Iterator[List[Dict]]:
+        """
+        逐页获取博主视频列表（供后台采集逐页展示）
+        
+        Args:
+            sec_uid: 博主SEC UID
+            days: 获取近N天的数据
+            page_size: 每页视频数
+            notify: 接收提示信息的函数（在后台线程中调用，不能直接使用 st.*）
+            
+        Yields:
+            每一页的视频列表
+        """
+        # 现有的采集接口一次返回全部视频，这里按页切分；接入分页接口后在此逐页请求
+        videos = self.get_blogger_videos(sec_uid, days, notify)
+        for start in range(0, len(videos), page_size):
+            yield videos[start:start + page_size]
+    
+    def _get_real_videos(self, sec_uid: str, days: int,
+                         notify: Optional[Callable[[str], None]] = None) -> List[Dict]:
         """
         真实获取视频数据（使用Cookie）
         
         注意：由于Streamlit Cloud无法运行浏览器，
-        真实数据采集需要在本地环境使用浏览器自动化
+        真实数据采集需要在本地环境使用浏览器自动化；
+        该方法可能在后台线程中运行，提示信息交给 notify，不直接调用 st.*
         """
-        import streamlit as st
-        
-        st.warning("⚠️ 真实数据采集需要在本地环境运行")
-        st.info("💡 请使用本地脚本或在支持浏览器的环境中运行")
+        notify = notify or print
+        notify("⚠️ 真实数据采集需要在本地环境运行，已使用演示数据")
+        notify("💡 请使用本地脚本或在支持浏览器的环境中运行")
         
         return []
     
@@ -123,7 +156,7 @@ class DouyinCrawler:
             模拟的博主信息
         """
         # 根据输入生成一些变化
-        hash_val = hash(query)
+        hash_val = _stable_hash(query)
         
         return {
             "sec_uid": f"MS4wLjAB{hash_val % 1000000}",
@@ -151,8 +184,8 @@ class DouyinCrawler:
         videos = []
         base_date = datetime.now()
         
-        # 生成10-30个视频
-        num_videos = 15 + hash(str(base_date)) % 15
+        # 生成15-30个视频（同一天内数量固定）
+        num_videos = 15 + _stable_hash(base_date.strftime('%Y-%m-%d')) % 15
         
         for i in range(num_videos):
             # 随机日期（近days天内）
@@ -11,25 +11,64 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Union
+import hashlib
 import json
 
+from streaming_stats import StreamingStatistics
+from ranking import RankingEngine
+from aggregate_cube import AggregateCube
+from time_index import TimeIndex
+from query_plan import Query
+from backends import get_backend
+from multi_blogger import MultiBloggerAnalyzer
+from text_index import TextIndex
+from tag_trends import TagTrendEngine
+from near_duplicates import NearDuplicateIndex
+from velocity import VelocityTracker
+from forecast import GrowthForecaster
+from heatmap import HeatmapEngine, PostingHeatmap
+from paged_table import PagedTable
+from downsample import TrendSeries
+from blogger_comparison import BloggerComparator
+from snapshot_diff import SnapshotDiff, diff_snapshots
+
 
 class DataProcessor:
     """数据处理器"""
     
-    def __init__(self):
-        pass
+    def __init__(self, backend: str = 'pandas', detect_duplicates: bool = False,
+                 duplicates: Optional[NearDuplicateIndex] = None):
+        """
+        Args:
+            backend: 执行后端（pandas / duckdb / polars / auto），引擎未安装时回退到 pandas
+            detect_duplicates: 是否在 process_videos 时增量检测近重复视频（跨博主、跨批次）
+            duplicates: 使用已有的近重复索引（例如多个会话共用的进程级索引），传入时即开启检测
+        """
+        self.backend = get_backend(backend)
+        if duplicates is None and detect_duplicates:
+            duplicates = NearDuplicateIndex()
+        self.duplicates = duplicates
+    
+    @property
+    def settings_key(self) -> str:
+        """影响处理结果的设置（后端 / 近重复检测），按内容哈希共享缓存时需加入结果名称"""
+        backend = self.backend.name if self.backend is not None else 'pandas'
+        return f"{backend}:{'dedup' if self.duplicates is not None else 'plain'}"
     
-    def process_videos(self, videos: List[Dict]) -> pd.DataFrame:
+    def process_videos(self, videos: List[Dict], sec_uid: Optional[str] = None,
+                       with_duplicates: bool = True) -> pd.DataFrame:
         """
         处理视频数据列表
         
         Args:
             videos: 原始视频数据列表
+            sec_uid: 视频所属博主（用于近重复检测中区分博主）
+            with_duplicates: 是否同时标注近重复（为 False 时结果只取决于 videos，可按内容哈希共享，
+                再用 mark_duplicates 单独标注）
             
         Returns:
-            处理的DataFrame
+            处理的DataFrame（开启近重复检测时增加 duplicate_group / is_duplicate 列）
         """
         if not videos:
             return pd.DataFrame()
@@ -37,6 +76,10 @@ class DataProcessor:
         # 转换为DataFrame
         df = pd.DataFrame(videos)
         
+        if self.backend is not None:
+            df = self.backend.process_videos(df)
+            return self.mark_duplicates(df, sec_uid) if with_duplicates else df
+        
         # 数据清洗和类型转换
         # 确保数值列为数字类型
         numeric_cols = ['likes', 'comments', 'shares', 'collects', 'play_count', 'duration']
@@ -51,7 +94,59 @@ class DataProcessor:
         # 计算派生指标
         df = self._calculate_metrics(df)
         
-        return df
+        return self.mark_duplicates(df, sec_uid) if with_duplicates else df
+    
+    def mark_duplicates(self, df: pd.DataFrame, sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        把视频导入近重复索引并标注所属的重复组（未开启近重复检测时原样返回）
+        
+        标注取决于索引当前的内容（其他博主、其他批次导入的视频），
+        不应与只取决于视频数据本身的结果放在同一个缓存键下。
+        
+        Args:
+            df: 处理后的视频数据DataFrame
+            sec_uid: 视频所属博主
+            
+        Returns:
+            增加 duplicate_group / is_duplicate 列的DataFrame
+        """
+        if self.duplicates is None or df.empty:
+            return df
+        return self.duplicates.add(df, sec_uid).mark(df)
+    
+    @staticmethod
+    def duplicates_key(df: pd.DataFrame) -> str:
+        """
+        近重复标注的摘要（标注相同则相同），用于区分依赖标注的缓存结果
+        
+        Args:
+            df: mark_duplicates 的输出
+            
+        Returns:
+            16 位十六进制摘要；没有标注列时为空字符串
+        """
+        if 'duplicate_group' not in df.columns:
+            return ''
+        hashed = pd.util.hash_pandas_object(df['duplicate_group'], index=False).to_numpy()
+        return hashlib.blake2b(hashed.tobytes(), digest_size=8).hexdigest()
+    
+    def collapse_duplicates(self, df: pd.DataFrame, by: str = 'likes') -> pd.DataFrame:
+        """
+        每个近重复组只保留指标最高的一条
+        
+        Args:
+            df: 带 duplicate_group 列的视频数据DataFrame
+            by: 保留依据的指标
+            
+        Returns:
+            去重后的DataFrame，增加 duplicate_count 列（组内在 df 中的视频数）
+        """
+        if df.empty or 'duplicate_group' not in df.columns:
+            return df
+        
+        counts = df['duplicate_group'].map(df['duplicate_group'].value_counts())
+        ranked = df.assign(duplicate_count=counts).sort_values(by, ascending=False, kind='stable')
+        return ranked.drop_duplicates('duplicate_group').sort_index()
     
     def _calculate_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
         """计算派生指标"""
@@ -113,6 +208,9 @@ class DataProcessor:
                 'std_likes': 0
             }
         
+        if self.backend is not None:
+            return self.backend.get_statistics(df)
+        
         stats = {
             'total_videos': len(df),
             'total_likes': int(df['likes'].sum()),
@@ -129,6 +227,83 @@ class DataProcessor:
         
         return stats
     
+    def get_streaming_statistics(self, batches: Iterable) -> StreamingStatistics:
+        """
+        流式统计（适用于无法一次载入内存的数据）
+        
+        Args:
+            batches: 批次迭代器（DataFrame / 记录列表 / 列字典）
+            
+        Returns:
+            流式统计累加器，调用 result() 得到与 get_statistics 相同的字典，
+            也可与其他进程的累加器 merge
+        """
+        return StreamingStatistics().consume(batches)
+    
+    def query(self, df: pd.DataFrame) -> Query:
+        """
+        创建惰性查询
+        
+        例如 processor.query(df).last_days(30).sort('likes').head(10).collect()
+        等价于 filter_by_date → sort_by_likes → head，但只在最后复制一次数据。
+        
+        Args:
+            df: 视频数据DataFrame
+            
+        Returns:
+            惰性查询构建器
+        """
+        return Query(df)
+    
+    def analyze_bloggers(self, data: Union[pd.DataFrame, Dict[str, List[Dict]]],
+                         workers: Optional[int] = None, k: int = 10) -> Dict:
+        """
+        多博主并行分析
+        
+        Args:
+            data: 含 sec_uid 列的视频DataFrame，或 {sec_uid: 原始视频列表}
+            workers: 进程数（默认CPU核数）
+            k: 每位博主每个指标的 Top-K 数量
+            
+        Returns:
+            每位博主的统计、每日汇总、Top-K 以及全体汇总
+        """
+        if isinstance(data, dict):
+            videos = [
+                {**video, 'sec_uid': sec_uid}
+                for sec_uid, blogger_videos in data.items()
+                for video in blogger_videos
+            ]
+            data = self.process_videos(videos, with_duplicates=False)
+        
+        return MultiBloggerAnalyzer(workers=workers, k=k).analyze(data)
+    
+    def compare_bloggers(self, data: Union[pd.DataFrame, Dict[str, List[Dict]]],
+                         comparator: Optional[BloggerComparator] = None) -> Dict:
+        """
+        多博主对比（合并成一张表后一次性计算对齐的指标）
+        
+        Args:
+            data: 含 sec_uid 列的视频DataFrame，或 {sec_uid: 原始视频列表}
+            comparator: 对比器（分位点 / 分箱数），默认 BloggerComparator()
+            
+        Returns:
+            {'metrics': 每位博主一行的对比指标, 'distribution': 共用分箱的互动率分布}
+        """
+        if isinstance(data, dict):
+            videos = [
+                {**video, 'sec_uid': sec_uid}
+                for sec_uid, blogger_videos in data.items()
+                for video in blogger_videos
+            ]
+            data = self.process_videos(videos, with_duplicates=False)
+        
+        comparator = comparator or BloggerComparator()
+        return {
+            'metrics': comparator.metrics(data),
+            'distribution': comparator.distribution(data),
+        }
+    
     def sort_by_likes(self, df: pd.DataFrame, ascending: bool = False) -> pd.DataFrame:
         """
         按点赞数排序
@@ -157,6 +332,11 @@ class DataProcessor:
             return df
         
         cutoff_date = datetime.now() - timedelta(days=days)
+        
+        # 已按时间排序时二分切片，避免整列比较
+        if df['create_time'].is_monotonic_increasing and not df['create_time'].isna().any():
+            return df.iloc[df['create_time'].searchsorted(cutoff_date):]
+        
         mask = df['create_time'] >= cutoff_date
         
         return df[mask]
@@ -176,8 +356,40 @@ class DataProcessor:
         if df.empty or by not in df.columns:
             return df.head(n) if n > 0 else df
         
+        if self.backend is not None:
+            return self.backend.get_top_videos(df, n, by)
+        
         return df.nlargest(n, by)
     
+    def build_rankings(self, batches: Iterable[pd.DataFrame], k: int = 100) -> RankingEngine:
+        """
+        流式构建排行榜（全局 + 按博主）
+        
+        Args:
+            batches: process_videos 输出的DataFrame迭代器
+            k: 每个榜单保留的数量
+            
+        Returns:
+            排行榜引擎，可继续 update 或与其他分片 merge
+        """
+        return RankingEngine(k=k).consume(batches)
+    
+    def build_tag_trends(self, batches: Iterable[pd.DataFrame],
+                         engine: Optional[TagTrendEngine] = None) -> TagTrendEngine:
+        """
+        增量构建话题共现与趋势
+        
+        Args:
+            batches: 视频数据DataFrame迭代器（需包含 tags 列）
+            engine: 已有的引擎，为空时新建
+            
+        Returns:
+            话题趋势引擎，支持 related / top_pairs / rising / engagement_lift
+        """
+        if engine is None:
+            engine = TagTrendEngine()
+        return engine.consume(batches)
+    
     def get_daily_stats(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         按日期统计
@@ -191,6 +403,9 @@ class DataProcessor:
         if df.empty or 'publish_date' not in df.columns:
             return pd.DataFrame()
         
+        if self.backend is not None:
+            return self.backend.get_daily_stats(df)
+        
         daily = df.groupby('publish_date').agg({
             'likes': 'sum',
             'comments': 'sum',
@@ -202,6 +417,21 @@ class DataProcessor:
         
         return daily
     
+    def build_trend_series(self, daily: pd.DataFrame) -> TrendSeries:
+        """
+        由每日统计构建趋势图序列（保存完整序列，按可见范围降采样）
+        
+        Args:
+            daily: get_daily_stats 的结果
+            
+        Returns:
+            以日期为索引、列为 likes / comments / shares / videos 的趋势序列
+        """
+        frame = daily.set_index('日期')[['点赞总数', '评论总数', '分享总数', '视频数量']]
+        frame = frame.set_axis(['likes', 'comments', 'shares', 'videos'], axis=1)
+        frame.index.name = 'date'
+        return TrendSeries(frame)
+    
     def get_hourly_stats(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         按小时统计
@@ -215,6 +445,9 @@ class DataProcessor:
         if df.empty or 'publish_hour' not in df.columns:
             return pd.DataFrame()
         
+        if self.backend is not None:
+            return self.backend.get_hourly_stats(df)
+        
         hourly = df.groupby('publish_hour').agg({
             'likes': 'mean',
             'comments': 'mean',
@@ -225,6 +458,121 @@ class DataProcessor:
         
         return hourly
     
+    def build_heatmaps(self, df: pd.DataFrame, sec_uid: Optional[str] = None,
+                       engine: Optional[HeatmapEngine] = None, metric: str = 'likes') -> HeatmapEngine:
+        """
+        构建（或刷新）各博主的发布时间热力图缓存
+        
+        Args:
+            df: 视频数据DataFrame（可包含多位博主）
+            sec_uid: 博主ID；为空时使用 df 的 sec_uid 列
+            engine: 已有的引擎，为空时新建
+            metric: 指标
+            
+        Returns:
+            热力图引擎，group / recommend 可组合任意博主
+        """
+        if engine is None:
+            engine = HeatmapEngine(metric)
+        return engine.update(df, sec_uid)
+    
+    def get_posting_heatmap(self, df: pd.DataFrame, metric: str = 'likes') -> PostingHeatmap:
+        """
+        星期 × 小时 的发布时间热力图（df 中全部博主合并）
+        
+        Args:
+            df: 视频数据DataFrame
+            metric: 指标
+            
+        Returns:
+            热力图（mean / median / lift / recommend）
+        """
+        return HeatmapEngine(metric).update(df).group()
+    
+    def build_cube(self, df: pd.DataFrame, sec_uid: Optional[str] = None,
+                   cube: Optional[AggregateCube] = None) -> AggregateCube:
+        """
+        构建（或增量更新）聚合立方体
+        
+        Args:
+            df: 视频数据DataFrame（新视频或新快照）
+            sec_uid: 博主ID
+            cube: 已有的立方体，为空时新建
+            
+        Returns:
+            聚合立方体，可直接查询 daily() / hourly() 而无需扫描原始数据
+        """
+        if cube is None:
+            cube = AggregateCube()
+        return cube.update(df, sec_uid)
+    
+    def track_velocity(self, df: pd.DataFrame, tracker: Optional[VelocityTracker] = None,
+                       at: Optional[datetime] = None) -> VelocityTracker:
+        """
+        写入一次刷新的快照，增量更新增速与爆款分数
+        
+        Args:
+            df: 本次刷新的视频数据DataFrame
+            tracker: 已有的跟踪器，为空时新建
+            at: 快照时间（默认当前时间）
+            
+        Returns:
+            增速跟踪器，scores() / alerts() 查询最新结果
+        """
+        if tracker is None:
+            tracker = VelocityTracker()
+        tracker.update(df, at)
+        return tracker
+    
+    def diff_snapshots(self, old: Union[pd.DataFrame, List[Dict]], new: Union[pd.DataFrame, List[Dict]],
+                       metrics: Optional[List[str]] = None) -> SnapshotDiff:
+        """
+        对比同一博主的两次采集（新增 / 删除 / 计数变化）
+        
+        Args:
+            old: 上一次采集的视频列表或DataFrame
+            new: 本次采集的视频列表或DataFrame
+            metrics: 比较增量的指标列，默认 likes / comments / shares / collects / play_count
+            
+        Returns:
+            SnapshotDiff（added / removed / changed / summary()）
+        """
+        return diff_snapshots(old, new, metrics)
+    
+    def forecast_likes(self, df: pd.DataFrame, tracker: Optional[VelocityTracker] = None,
+                       now: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        预测未来 7 天 / 30 天后的点赞数
+        
+        Args:
+            df: 视频数据DataFrame
+            tracker: 快照跟踪器；提供时用其中的点赞历史拟合，否则只用 df 这一次快照
+            now: 当前时间（默认现在）
+            
+        Returns:
+            增加 likes_7d / likes_30d / growth_model 列的DataFrame
+        """
+        if df.empty or 'likes' not in df.columns or 'create_time' not in df.columns:
+            return df
+        
+        now = pd.Timestamp(now or datetime.now())
+        current_age = ((now - pd.to_datetime(df['create_time'], errors='coerce')).dt.total_seconds() / 3600).to_numpy()
+        current_age = np.maximum(np.nan_to_num(current_age, nan=0.0), 0.0)
+        likes = df['likes'].to_numpy(dtype=np.float64)
+        
+        if tracker is not None:
+            ages, history = tracker.snapshot_history(df['video_id'].astype(str).tolist())
+            # 没有历史的视频用本次快照
+            missing = np.isnan(history).all(axis=1)
+            ages = np.column_stack([ages, np.where(missing, current_age, np.nan)])
+            history = np.column_stack([history, np.where(missing, likes, np.nan)])
+        else:
+            ages, history = current_age[:, None], likes[:, None]
+        
+        forecast = GrowthForecaster().forecast(ages, history, current_age)
+        forecast.index = df.index
+        return df.assign(**{column: forecast[column] for column in forecast.columns})
+    
     def compare_periods(self, df: pd.DataFrame, split_date: str = None) -> Dict:
         """
         对比两个时间段的数据
@@ -245,6 +593,9 @@ class DataProcessor:
         try:
             split_dt = pd.to_datetime(split_date)
             
+            if self.backend is not None:
+                return self.backend.compare_periods(df, split_dt)
+            
             early = df[df['create_time'] < split_dt]
             late = df[df['create_time'] >= split_dt]
             
@@ -267,6 +618,87 @@ class DataProcessor:
         except Exception:
             return {}
     
+    def build_time_index(self, df: pd.DataFrame) -> TimeIndex:
+        """
+        构建按发布时间排序的索引
+        
+        Args:
+            df: 视频数据DataFrame
+            
+        Returns:
+            时间索引，支持 slice / last_days / compare_periods
+        """
+        return TimeIndex(df)
+    
+    def build_text_index(self, df: pd.DataFrame, index: Optional[TextIndex] = None) -> TextIndex:
+        """
+        构建（或追加）标题/描述/话题的全文索引
+        
+        Args:
+            df: 视频数据DataFrame
+            index: 已有的索引，传入时把 df 追加到末尾（行号接续）
+            
+        Returns:
+            全文索引，search 返回的行号即 df（或各批依次拼接后）的位置
+        """
+        index = index or TextIndex()
+        index.add(df)
+        return index
+    
+    def search_videos(self, df: pd.DataFrame, keyword: str, days: Optional[int] = None,
+                      index: Optional[TextIndex] = None) -> pd.DataFrame:
+        """
+        按关键词搜索视频
+        
+        Args:
+            df: 视频数据DataFrame
+            keyword: 关键词（多个关键词用空格分隔，需同时出现）
+            days: 只看近N天发布的视频
+            index: 基于 df 构建的索引（不传时临时构建）
+            
+        Returns:
+            命中的视频DataFrame
+        """
+        if df.empty:
+            return df
+        
+        index = index or self.build_text_index(df)
+        rows = index.search_all(keyword.split(), days=days)
+        return df.iloc[rows]
+    
+    def build_paged_table(self, df: pd.DataFrame, columns: Optional[List[str]] = None,
+                          index: Optional[TextIndex] = None) -> PagedTable:
+        """
+        构建服务端分页表格（排序 / 关键词筛选 / 分页在服务端完成）
+        
+        Args:
+            df: 视频数据DataFrame
+            columns: 展示的列
+            index: 基于 df 构建的全文索引（不传时在第一次筛选时构建）
+            
+        Returns:
+            分页表格，page() 只返回当前页的行
+        """
+        return PagedTable(df, columns, text_index=index)
+    
+    def compare_multi_periods(self, df: Union[pd.DataFrame, TimeIndex], freq: Union[str, List] = 'W') -> pd.DataFrame:
+        """
+        对比多个时间段的数据
+        
+        Args:
+            df: 视频数据DataFrame 或已构建的 TimeIndex
+            freq: 时间段频率（'D' / 'W' / 'MS' 等）或自定义边界日期列表
+            
+        Returns:
+            每个时间段一行的对比DataFrame
+        """
+        if isinstance(df, pd.DataFrame):
+            if df.empty or 'create_time' not in df.columns:
+                return pd.DataFrame()
+            df = TimeIndex(df)
+        
+        return df.compare_periods(freq)
+    
     def generate_summary(self, df: pd.DataFrame) -> str:
         """
         生成数据摘要文本
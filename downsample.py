@@ -0,0 +1,197 @@
+"""
+趋势图降采样模块
+
+功能：
+1. LTTB（Largest-Triangle-Three-Buckets）降采样：按点数预算选点，保留峰值与形状
+2. 分桶 min/max 降采样：每个桶保留最小值和最大值（适合柱状图 / 计数）
+3. 保存完整序列，按可见范围重新降采样：缩小日期范围即得到更高的分辨率
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+
+# 默认点数预算：约等于图表的横向像素数，超过后浏览器渲染不再更清晰
+DEFAULT_MAX_POINTS = 800
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    LTTB 降采样
+    
+    首尾点固定保留；中间的点均分为 max_points - 2 个桶，每个桶选出与
+    「上一个选中点」和「下一个桶的平均点」构成三角形面积最大的点。
+    
+    Args:
+        x: 横坐标（升序）
+        y: 纵坐标
+        max_points: 输出点数
+    
+    Returns:
+        选中的下标（升序）
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    # 中间 n-2 个点分成 max_points-2 个桶，桶宽 > 1，边界严格递增
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    sum_x, sum_y = np.r_[0.0, np.cumsum(x)], np.r_[0.0, np.cumsum(y)]
+    
+    # 每个桶之后的「下一个桶平均点」（最后一个桶之后为终点）
+    lo, hi = edges[1:-1], edges[2:]
+    next_x = np.r_[(sum_x[hi] - sum_x[lo]) / (hi - lo), x[-1]]
+    next_y = np.r_[(sum_y[hi] - sum_y[lo]) / (hi - lo), y[-1]]
+    
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[a] - next_x[bucket]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (next_y[bucket] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def minmax(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    分桶 min/max 降采样
+    
+    Args:
+        y: 纵坐标
+        max_points: 输出点数上限（每个桶两个点，另加首尾）
+    
+    Returns:
+        选中的下标（升序、去重）
+    """
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    
+    buckets = max(max_points // 2 - 1, 1)
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    ends = np.r_[starts[1:], n] - 1
+    bucket = np.repeat(np.arange(buckets), ends - starts + 1)
+    # 桶内按值排序：每个桶的第一个是最小值，最后一个是最大值
+    order = np.lexsort((np.nan_to_num(np.asarray(y, dtype=np.float64)), bucket))
+    return np.unique(np.r_[0, order[starts], order[ends], n - 1])
+
+
+def downsample(frame: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS, method: str = 'lttb',
+               columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    降采样一组共享横坐标的序列
+    
+    每一列各自选点（并加上各列的最大 / 最小值）后取并集，任何一列的峰值都不会被丢掉；
+    保留下来的行是原始数据（不做插值或平均）。点数预算由各列平分（每列还要留出最大 / 最小值两个点），
+    因此并集的行数不超过 max_points。
+    
+    Args:
+        frame: 以横坐标（时间或数值）为索引、已按索引升序的DataFrame
+        max_points: 输出行数上限（所有列合计）
+        method: lttb / minmax
+        columns: 参与选点的列（默认全部数值列）
+    
+    Returns:
+        原始行的子集
+    """
+    if len(frame) <= max_points:
+        return frame
+    
+    x = _positions(frame.index)
+    columns = list(columns) if columns is not None else list(frame.select_dtypes('number').columns)
+    budget = max((max_points - 2 * len(columns)) // max(len(columns), 1), 3)
+    selected = [
+        lttb(x, frame[column].to_numpy(dtype=np.float64), budget) if method == 'lttb'
+        else minmax(frame[column].to_numpy(dtype=np.float64), budget)
+        for column in columns
+    ]
+    # 每列的全局最大 / 最小值一定保留（LTTB 在噪声较大时不保证选中）
+    selected += [[np.nanargmax(values), np.nanargmin(values)]
+                 for values in (frame[column].to_numpy(dtype=np.float64) for column in columns)
+                 if not np.isnan(values).all()]
+    rows = np.unique(np.concatenate(selected)) if selected else np.arange(len(frame))
+    return frame.iloc[rows]
+
+
+def _positions(index: pd.Index) -> np.ndarray:
+    """索引转为数值横坐标（时间为纳秒，其他无法转换的按序号）"""
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=np.float64)
+    try:
+        return pd.to_datetime(index).to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(index), dtype=np.float64)
+
+
+class TrendSeries:
+    """
+    保存完整序列的趋势图数据
+    
+    view 只取可见范围内的原始点，再按点数预算降采样；
+    缩小范围时预算不变、覆盖的点变少，于是自动回到更高的分辨率（范围足够小时即为原始数据）。
+    对象经共享缓存在多个会话（线程）间共用，视图缓存的读写在锁内进行。
+    """
+    
+    def __init__(self, frame: pd.DataFrame, max_views: int = 16):
+        """
+        Args:
+            frame: 以时间（或数值）为索引的DataFrame，未排序时自动按索引排序
+            max_views: 缓存的视图数
+        """
+        self.frame = frame if frame.index.is_monotonic_increasing else frame.sort_index(kind='stable')
+        self.max_views = max_views
+        self._x = _positions(self.frame.index)
+        self._views: 'OrderedDict[Tuple, pd.DataFrame]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    @property
+    def bounds(self) -> Tuple:
+        """完整序列的首尾索引值"""
+        return self.frame.index[0], self.frame.index[-1]
+    
+    def view(self, start=None, end=None, max_points: int = DEFAULT_MAX_POINTS, method: str = 'lttb',
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        取出一段范围的降采样视图
+        
+        Args:
+            start: 起始索引值（含），为空表示从头开始
+            end: 结束索引值（含），为空表示到末尾
+            max_points: 点数预算（所有列合计）
+            method: lttb / minmax
+            columns: 返回（并参与选点）的列，默认全部
+        
+        Returns:
+            DataFrame（原始行的子集）
+        """
+        columns = tuple(columns) if columns is not None else tuple(self.frame.columns)
+        key = (start, end, max_points, method, columns)
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+        
+        lo = 0 if start is None else int(np.searchsorted(self._x, _positions(pd.Index([start]))[0], side='left'))
+        hi = len(self._x) if end is None else int(np.searchsorted(self._x, _positions(pd.Index([end]))[0], side='right'))
+        result = downsample(self.frame.iloc[lo:hi][list(columns)], max_points, method)
+        
+        with self._lock:
+            self._views[key] = result
+            self._views.move_to_end(key)
+            if len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return result
@@ -0,0 +1,213 @@
+"""
+后台采集模块
+
+功能：
+1. 在后台线程中逐页采集视频，页面不必等全部采集完成
+2. 随时取出已到达的部分结果与进度（页数 / 视频数 / 耗时）
+3. 按键登记采集任务：页面重跑或其他会话搜索同一博主时直接接回正在进行的任务
+4. 支持取消（在两页之间停止）
+5. 多个采集任务并发执行（多博主对比）
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+
+class FetchJob:
+    """
+    一个后台采集任务
+    
+    pages 是逐页产出视频列表的可迭代对象（例如 DouyinCrawler.iter_blogger_videos），
+    在后台线程中消费；每到达一页就追加到结果中。
+    后台线程没有 Streamlit 上下文，采集过程中的提示经 notify 记录在任务上，由页面在主线程展示。
+    """
+    
+    def __init__(self, key: str, pages: Callable[[Callable[[str], None]], Iterable[List[Dict]]],
+                 on_complete: Optional[Callable[[List[Dict]], None]] = None):
+        """
+        Args:
+            key: 任务键（如 数据模式 + sec_uid + 天数）
+            pages: 以 notify 为参数、返回分页迭代器的函数（在后台线程中调用）
+            on_complete: 全部采集完成后以完整视频列表调用（取消或失败时不调用）
+        """
+        self.key = key
+        self.state = RUNNING
+        self.error: Optional[str] = None
+        self.notices: List[str] = []
+        self.pages = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        
+        self._pages = pages
+        self._on_complete = on_complete
+        self._videos: List[Dict] = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'fetch-{key}', daemon=True)
+    
+    def start(self) -> 'FetchJob':
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        try:
+            for page in self._pages(self.notify):
+                if self._cancel.is_set():
+                    break
+                with self._lock:
+                    self._videos.extend(page)
+                    self.pages += 1
+            
+            if self._cancel.is_set():
+                self.state = CANCELLED
+            else:
+                if self._on_complete is not None:
+                    self._on_complete(self.videos())
+                self.state = DONE
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+            print(f"❌ 采集失败 [{self.key}]: {e}")
+        finally:
+            self.finished_at = time.time()
+    
+    def notify(self, message: str):
+        """记录一条提示（后台线程中调用）"""
+        with self._lock:
+            if message not in self.notices:
+                self.notices.append(message)
+    
+    @property
+    def running(self) -> bool:
+        return self.state == RUNNING
+    
+    @property
+    def elapsed(self) -> float:
+        """已耗时（秒）"""
+        return (self.finished_at or time.time()) - self.started_at
+    
+    def videos(self) -> List[Dict]:
+        """已到达的视频（新列表；其中的视频字典与任务共享，不应修改）"""
+        with self._lock:
+            return list(self._videos)
+    
+    def progress(self) -> Dict:
+        """
+        当前进度
+        
+        Returns:
+            {'state', 'pages', 'videos', 'elapsed', 'error', 'notices'}
+        """
+        with self._lock:
+            count = len(self._videos)
+            notices = list(self.notices)
+        return {
+            'state': self.state,
+            'pages': self.pages,
+            'videos': count,
+            'elapsed': round(self.elapsed, 1),
+            'error': self.error,
+            'notices': notices,
+        }
+    
+    def cancel(self):
+        """请求取消（当前页完成后停止，已采集的部分保留）"""
+        self._cancel.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务结束，返回是否已结束"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+
+class FetchWorker:
+    """
+    后台采集任务登记表（进程内共享）
+    
+    同一个键同时只有一个进行中的任务，start 对进行中的任务直接返回原任务，
+    因此页面重跑、刷新或其他会话都能接回同一次采集。已结束的任务保留 keep_seconds 秒供取结果。
+    """
+    
+    def __init__(self, keep_seconds: float = 600):
+        self.keep_seconds = keep_seconds
+        self._jobs: Dict[str, FetchJob] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._jobs)
+    
+    def start(self, key: str, pages: Callable[[Callable[[str], None]], Iterable[List[Dict]]],
+              on_complete: Optional[Callable[[List[Dict]], None]] = None) -> FetchJob:
+        """
+        启动（或接回）采集任务
+        
+        Args:
+            key: 任务键
+            pages: 以 notify 为参数、返回分页迭代器的函数
+            on_complete: 全部采集完成后的回调（例如写入共享缓存）
+        
+        Returns:
+            进行中的任务（已有时为原任务）
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.running:
+                return job
+            job = self._jobs[key] = FetchJob(key, pages, on_complete)
+        return job.start()
+    
+    def get(self, key: Optional[str]) -> Optional[FetchJob]:
+        """按键取回任务（不存在或已清理时为 None）"""
+        if key is None:
+            return None
+        with self._lock:
+            return self._jobs.get(key)
+    
+    def cancel(self, key: str):
+        """取消任务"""
+        job = self.get(key)
+        if job is not None:
+            job.cancel()
+    
+    def _prune(self):
+        now = time.time()
+        expired = [key for key, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.keep_seconds]
+        for key in expired:
+            del self._jobs[key]
+
+
+def fetch_all(tasks: Dict[str, Callable[[], Any]], workers: int = 8) -> Dict[str, Any]:
+    """
+    并发执行多个采集任务（网络等待为主，线程即可并行）
+    
+    Args:
+        tasks: {任务键: 无参采集函数}
+        workers: 最大并发数
+    
+    Returns:
+        {任务键: 结果}，顺序与 tasks 相同；失败的任务结果为 None
+    """
+    if not tasks:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = {key: pool.submit(task) for key, task in tasks.items()}
+    
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            print(f"❌ 采集失败 [{key}]: {e}")
+            results[key] = None
+    return results
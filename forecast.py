@@ -0,0 +1,123 @@
+"""
+点赞增长预测模块
+
+功能：
+1. 对每个视频的点赞历史拟合对数增长曲线 L = a + b·ln(1+t)
+2. 拟合饱和曲线 L = K·(1 - e^(-t/τ))（τ 网格搜索，K 有闭式解）
+3. 所有视频一次性批量最小二乘，按残差选择模型，预测未来 7 天 / 30 天的点赞数
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+
+HOURS_PER_DAY = 24.0
+# 饱和曲线的时间常数候选（小时）：1 小时 ~ 约 3 个月
+DEFAULT_TAUS = np.geomspace(1.0, 2000.0, 24)
+
+
+class GrowthForecaster:
+    """
+    批量增长曲线拟合
+    
+    输入为 (视频数, 快照数) 的 发布至今小时数 与 点赞数 矩阵（NaN 表示缺失），
+    每个视频额外加入 (0, 0) 锚点（发布时点赞为 0），因此只有一次快照也能拟合。
+    饱和曲线至少需要两次快照，且残差更小时才采用。
+    """
+    
+    def __init__(self, horizons: Sequence[int] = (7, 30), taus: Optional[np.ndarray] = None):
+        """
+        Args:
+            horizons: 预测的天数
+            taus: 饱和曲线时间常数候选（小时）
+        """
+        self.horizons = tuple(horizons)
+        self.taus = DEFAULT_TAUS if taus is None else np.asarray(taus, dtype=np.float64)
+    
+    def fit(self, ages: np.ndarray, likes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        拟合全部视频
+        
+        Args:
+            ages: 发布至今小时数矩阵 (视频数, 快照数)
+            likes: 点赞数矩阵 (视频数, 快照数)
+        
+        Returns:
+            参数字典（model: 0=对数增长 1=饱和；a / b / K / tau；sse_log / sse_saturation）
+        """
+        ages = np.atleast_2d(np.asarray(ages, dtype=np.float64))
+        likes = np.atleast_2d(np.asarray(likes, dtype=np.float64))
+        
+        # 加入 (0, 0) 锚点，缺失位置权重为 0
+        t = np.column_stack([np.zeros(len(ages)), ages])
+        y = np.column_stack([np.zeros(len(likes)), likes])
+        w = (~np.isnan(t) & ~np.isnan(y) & (t >= 0)).astype(np.float64)
+        t, y = np.where(w > 0, t, 0.0), np.where(w > 0, y, 0.0)
+        n = w.sum(axis=1)
+        
+        # 对数增长：加权线性最小二乘的正规方程（逐行求和，全部向量化）
+        x = np.log1p(t)
+        sx, sy = (w * x).sum(axis=1), (w * y).sum(axis=1)
+        sxx, sxy = (w * x * x).sum(axis=1), (w * x * y).sum(axis=1)
+        syy = (w * y * y).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        b = np.where(np.isfinite(b), np.maximum(b, 0.0), 0.0)
+        a = np.where(n > 0, (sy - b * sx) / np.maximum(n, 1), 0.0)
+        sse_log = (w * (y - a[:, None] - b[:, None] * x) ** 2).sum(axis=1)
+        
+        # 饱和曲线：固定 τ 时 K = Σwyf / Σwf²，SSE = Σwy² - K·Σwyf
+        best_sse = np.full(len(t), np.inf)
+        best_k = np.zeros(len(t))
+        best_tau = np.full(len(t), np.nan)
+        for tau in self.taus:
+            f = 1.0 - np.exp(-t / tau)
+            syf, sff = (w * y * f).sum(axis=1), (w * f * f).sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k = np.where(sff > 0, syf / sff, 0.0)
+            sse = syy - k * syf
+            better = sse < best_sse
+            best_sse = np.where(better, sse, best_sse)
+            best_k = np.where(better, k, best_k)
+            best_tau = np.where(better, tau, best_tau)
+        
+        # 锚点 + 至少两次快照才可能区分两种曲线
+        saturation = (n >= 3) & (best_sse < sse_log) & (best_k > 0)
+        return {
+            'model': saturation.astype(np.int64),
+            'a': a, 'b': b,
+            'K': best_k, 'tau': best_tau,
+            'sse_log': sse_log, 'sse_saturation': best_sse,
+        }
+    
+    def predict(self, params: Dict[str, np.ndarray], ages: np.ndarray) -> np.ndarray:
+        """按拟合参数计算给定年龄（小时）时的点赞数"""
+        ages = np.asarray(ages, dtype=np.float64)
+        log_growth = params['a'] + params['b'] * np.log1p(ages)
+        with np.errstate(invalid='ignore'):
+            saturation = params['K'] * (1.0 - np.exp(-ages / params['tau']))
+        return np.where(params['model'] == 1, saturation, log_growth)
+    
+    def forecast(self, ages: np.ndarray, likes: np.ndarray, current_age: np.ndarray) -> pd.DataFrame:
+        """
+        预测未来若干天后的点赞数
+        
+        Args:
+            ages: 发布至今小时数矩阵 (视频数, 快照数)
+            likes: 点赞数矩阵 (视频数, 快照数)
+            current_age: 当前的发布至今小时数 (视频数,)
+        
+        Returns:
+            DataFrame（likes_{N}d 各预测列 / growth_model），预测值不低于已观测到的最大点赞数
+        """
+        params = self.fit(ages, likes)
+        observed = np.nanmax(np.column_stack([np.zeros(len(params['a'])), np.atleast_2d(likes)]), axis=1)
+        
+        result = pd.DataFrame(index=range(len(observed)))
+        for days in self.horizons:
+            predicted = self.predict(params, np.asarray(current_age, dtype=np.float64) + days * HOURS_PER_DAY)
+            predicted = np.where(np.isfinite(predicted), np.maximum(predicted, observed), observed)
+            result[f'likes_{days}d'] = np.round(predicted).astype(np.int64)
+        result['growth_model'] = np.where(params['model'] == 1, 'saturation', 'log')
+        return result
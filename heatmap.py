@@ -0,0 +1,246 @@
+"""
+发布时间热力图模块
+
+功能：
+1. 星期 × 小时（7×24）的视频数、平均值、中位数与相对博主自身水平的提升度
+2. 一次 bincount 同时计算任意多位博主的热力图
+3. 按博主缓存，可任意组合合并，为整个名单推荐发布时间
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+
+CELLS = 7 * 24
+# 中位数用对数直方图近似：log1p(值) 在 [0, LOG_MAX] 内等分为 BINS 个桶
+BINS = 128
+LOG_MAX = np.log1p(1e10)
+WEEKDAY_NAMES = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+
+class PostingHeatmap:
+    """
+    单个（或合并后的一组）博主的发布时间热力图
+    
+    所有字段都是可加的：视频数、指标总和、相对博主均值的归一化总和、对数直方图，
+    因此多位博主的热力图直接相加即可合并。
+    提升度 = 格子内各视频 (指标 / 所属博主平均值) 的平均，
+    组合多位博主时不会被头部博主的量级主导。
+    """
+    
+    def __init__(self, metric: str = 'likes'):
+        self.metric = metric
+        self.counts = np.zeros(CELLS, dtype=np.int64)
+        self.sums = np.zeros(CELLS, dtype=np.float64)
+        self.relative_sums = np.zeros(CELLS, dtype=np.float64)
+        self.histogram = np.zeros((CELLS, BINS), dtype=np.int32)
+    
+    @property
+    def videos(self) -> int:
+        return int(self.counts.sum())
+    
+    def merge(self, other: 'PostingHeatmap') -> 'PostingHeatmap':
+        """
+        合并另一张热力图
+        
+        Args:
+            other: 另一张热力图（同一指标）
+        
+        Returns:
+            self
+        """
+        self.counts += other.counts
+        self.sums += other.sums
+        self.relative_sums += other.relative_sums
+        self.histogram += other.histogram
+        return self
+    
+    def copy(self) -> 'PostingHeatmap':
+        return PostingHeatmap(self.metric).merge(self)
+    
+    def mean(self) -> np.ndarray:
+        """7×24 平均值（没有视频的格子为 NaN）"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.sums / self.counts).reshape(7, 24)
+    
+    def lift(self) -> np.ndarray:
+        """7×24 提升度（1.0 表示与博主自身平均水平持平）"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.relative_sums / self.counts).reshape(7, 24)
+    
+    def median(self) -> np.ndarray:
+        """7×24 中位数（由对数直方图插值得到的近似值）"""
+        cumulative = np.cumsum(self.histogram, axis=1)
+        half = self.counts / 2.0
+        bins = np.minimum((cumulative < half[:, None]).sum(axis=1), BINS - 1)
+        
+        rows = np.arange(CELLS)
+        before = np.where(bins > 0, cumulative[rows, np.maximum(bins - 1, 0)], 0)
+        inside = self.histogram[rows, bins]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.clip((half - before) / inside, 0.0, 1.0)
+        width = LOG_MAX / BINS
+        median = np.expm1((bins + np.nan_to_num(fraction)) * width)
+        return np.where(self.counts > 0, median, np.nan).reshape(7, 24)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        长表形式（每个格子一行）
+        
+        Returns:
+            DataFrame（星期 / 发布小时 / 视频数量 / 平均值 / 中位数 / 提升度）
+        """
+        return pd.DataFrame({
+            '星期': np.repeat(np.arange(7), 24),
+            '发布小时': np.tile(np.arange(24), 7),
+            '视频数量': self.counts,
+            '平均值': np.round(self.mean().ravel(), 2),
+            '中位数': np.round(self.median().ravel(), 2),
+            '提升度': np.round(self.lift().ravel(), 3),
+        })
+    
+    def matrix(self, value: str = 'lift') -> pd.DataFrame:
+        """
+        7 行（星期一~星期日）× 24 列（小时）的矩阵
+        
+        Args:
+            value: lift / mean / median / count
+        """
+        values = {
+            'lift': self.lift,
+            'mean': self.mean,
+            'median': self.median,
+            'count': lambda: self.counts.reshape(7, 24),
+        }[value]()
+        return pd.DataFrame(values, index=WEEKDAY_NAMES, columns=range(24))
+    
+    def recommend(self, n: int = 5, min_videos: int = 3) -> pd.DataFrame:
+        """
+        推荐发布时间（提升度最高的格子）
+        
+        Args:
+            n: 返回数量
+            min_videos: 格子内至少的视频数（样本太少的格子不可信）
+        
+        Returns:
+            DataFrame（星期 / 发布小时 / 视频数量 / 平均值 / 中位数 / 提升度）
+        """
+        frame = self.to_frame()
+        frame = frame[frame['视频数量'] >= min_videos]
+        frame = frame.sort_values(['提升度', '视频数量'], ascending=False, kind='stable').head(n)
+        frame['星期'] = [WEEKDAY_NAMES[day] for day in frame['星期']]
+        return frame.reset_index(drop=True)
+
+
+class HeatmapEngine:
+    """
+    多博主热力图引擎
+    
+    update 对一批视频按 (博主, 星期, 小时) 一次 bincount 得到每位博主的热力图并缓存；
+    group 把任意一组博主的缓存相加，不需要重新扫描视频。
+    """
+    
+    def __init__(self, metric: str = 'likes', chunk_bloggers: int = 256):
+        self.metric = metric
+        self.chunk_bloggers = chunk_bloggers
+        self.heatmaps: Dict[str, PostingHeatmap] = {}
+    
+    def __len__(self) -> int:
+        return len(self.heatmaps)
+    
+    def update(self, df: pd.DataFrame, sec_uid: Optional[str] = None) -> 'HeatmapEngine':
+        """
+        （重新）计算 df 中各博主的热力图
+        
+        Args:
+            df: 视频数据DataFrame（需包含指标列，以及 day_of_week / publish_hour 或 create_time）
+            sec_uid: 博主ID；为空时使用 df 的 sec_uid 列
+        
+        Returns:
+            self
+        """
+        if df.empty or self.metric not in df.columns:
+            return self
+        
+        if 'day_of_week' in df.columns and 'publish_hour' in df.columns:
+            day, hour = df['day_of_week'], df['publish_hour']
+        else:
+            create_time = pd.to_datetime(df['create_time'], errors='coerce')
+            day, hour = create_time.dt.dayofweek, create_time.dt.hour
+        day = pd.to_numeric(day, errors='coerce').to_numpy(dtype=np.float64)
+        hour = pd.to_numeric(hour, errors='coerce').to_numpy(dtype=np.float64)
+        values = pd.to_numeric(df[self.metric], errors='coerce').to_numpy(dtype=np.float64)
+        
+        if sec_uid is not None or 'sec_uid' not in df.columns:
+            codes, bloggers = np.zeros(len(df), dtype=np.int64), pd.Index([sec_uid or ''])
+        else:
+            codes, bloggers = pd.factorize(df['sec_uid'])
+        
+        valid = ~np.isnan(day) & ~np.isnan(hour) & ~np.isnan(values) & (codes >= 0)
+        codes, values = codes[valid], np.maximum(values[valid], 0.0)
+        cell = day[valid].astype(np.int64) * 24 + hour[valid].astype(np.int64)
+        groups = len(bloggers)
+        
+        # 博主自身的平均水平（提升度的基准）
+        blogger_counts = np.bincount(codes, minlength=groups)
+        blogger_sums = np.bincount(codes, weights=values, minlength=groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            baseline = blogger_sums / blogger_counts
+        relative = np.where(baseline[codes] > 0, values / baseline[codes], 0.0)
+        
+        # 按博主分块计算，直方图的中间数组大小与博主数无关
+        order = np.argsort(codes, kind='stable')
+        codes, cell, values, relative = codes[order], cell[order], values[order], relative[order]
+        bins = np.minimum((np.log1p(values) / LOG_MAX * BINS).astype(np.int64), BINS - 1)
+        
+        for lo in range(0, groups, self.chunk_bloggers):
+            hi = min(lo + self.chunk_bloggers, groups)
+            start, stop = np.searchsorted(codes, [lo, hi])
+            key = (codes[start:stop] - lo) * CELLS + cell[start:stop]
+            size = (hi - lo) * CELLS
+            
+            counts = np.bincount(key, minlength=size).reshape(-1, CELLS)
+            sums = np.bincount(key, weights=values[start:stop], minlength=size).reshape(-1, CELLS)
+            relative_sums = np.bincount(key, weights=relative[start:stop], minlength=size).reshape(-1, CELLS)
+            histogram = np.bincount(key * BINS + bins[start:stop], minlength=size * BINS).reshape(-1, CELLS, BINS)
+            
+            for offset, blogger in enumerate(bloggers[lo:hi]):
+                heatmap = PostingHeatmap(self.metric)
+                heatmap.counts = counts[offset]
+                heatmap.sums = sums[offset]
+                heatmap.relative_sums = relative_sums[offset]
+                heatmap.histogram = histogram[offset].astype(np.int32)
+                self.heatmaps[str(blogger)] = heatmap
+        
+        return self
+    
+    def get(self, sec_uid: str) -> Optional[PostingHeatmap]:
+        """单个博主的热力图（未缓存时为 None）"""
+        return self.heatmaps.get(sec_uid)
+    
+    def group(self, sec_uids: Optional[Iterable[str]] = None) -> PostingHeatmap:
+        """
+        合并一组博主的热力图
+        
+        Args:
+            sec_uids: 博主ID列表，为空时合并全部已缓存的博主
+        
+        Returns:
+            合并后的热力图
+        """
+        merged = PostingHeatmap(self.metric)
+        for sec_uid in (self.heatmaps if sec_uids is None else sec_uids):
+            heatmap = self.heatmaps.get(sec_uid)
+            if heatmap is not None:
+                merged.merge(heatmap)
+        return merged
+    
+    def merge(self, other: 'HeatmapEngine') -> 'HeatmapEngine':
+        """合并另一个引擎的缓存（同一博主以 other 为准）"""
+        self.heatmaps.update(other.heatmaps)
+        return self
+    
+    def recommend(self, sec_uids: Optional[Iterable[str]] = None, n: int = 5, min_videos: int = 3) -> pd.DataFrame:
+        """为一组博主推荐发布时间"""
+        return self.group(sec_uids).recommend(n, min_videos)
@@ -0,0 +1,259 @@
+"""
+多博主分片分析模块
+
+功能：
+1. 按 sec_uid 分区，把列数据放入共享内存
+2. 进程池中按分片并行计算每位博主的统计、每日汇总和 Top-K
+3. 合并各分片的部分结果（含全体博主的汇总统计）
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Optional, Tuple
+
+from streaming_stats import StreamingStatistics
+
+
+METRICS = ('likes', 'comments', 'shares', 'engagement_rate')
+NAT = np.iinfo(np.int64).min
+NS_PER_DAY = 86400 * 10 ** 9
+
+# 行数少于该值时直接在当前进程计算，避免进程池开销
+MIN_PARALLEL_ROWS = 200000
+
+
+def _attach(spec: Dict[str, Tuple[str, str, int]]) -> Tuple[Dict[str, np.ndarray], List]:
+    """
+    在工作进程中按名称挂载共享内存列
+    
+    进程池的子进程与主进程共用同一个资源跟踪器，共享内存统一由主进程 unlink。
+    """
+    arrays, handles = {}, []
+    for column, (name, dtype, length) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        arrays[column] = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+        handles.append(shm)
+    return arrays, handles
+
+
+def _analyze_shard(columns: Dict[str, np.ndarray], lo: int, hi: int, k: int) -> Dict:
+    """
+    计算一个分片（连续的若干位博主）的部分结果
+    
+    Args:
+        columns: 已按博主编号排序的列
+        lo: 分片起始行
+        hi: 分片结束行（不含）
+        k: 每位博主每个指标保留的 Top-K 数量
+        
+    Returns:
+        部分结果字典（只含小数组，可廉价地传回主进程）
+    """
+    codes = columns['code'][lo:hi]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, len(codes)])
+    group = np.repeat(np.arange(len(starts)), counts)
+    
+    likes = columns['likes'][lo:hi]
+    result = {'code': codes[starts], 'videos': counts}
+    
+    for metric in ('likes', 'comments', 'shares'):
+        result[f'total_{metric}'] = np.add.reduceat(columns[metric][lo:hi], starts)
+    
+    result['max_likes'] = np.maximum.reduceat(likes, starts)
+    result['min_likes'] = np.minimum.reduceat(likes, starts)
+    
+    mean = result['total_likes'] / counts
+    deviation = (likes - mean[group]) ** 2
+    result['std_likes'] = np.sqrt(np.add.reduceat(deviation, starts) / np.maximum(counts - 1, 1))
+    
+    # 组内排序后取中间位置（偶数个时取两个中间值的平均，与 pandas 一致）
+    sorted_likes = likes[np.lexsort((likes, group))]
+    result['median_likes'] = (sorted_likes[starts + (counts - 1) // 2] + sorted_likes[starts + counts // 2]) / 2
+    
+    # 每日汇总：(博主, 日期) 组合键
+    create_time = columns['create_time'][lo:hi]
+    valid = create_time != NAT
+    days = create_time[valid] // NS_PER_DAY
+    if len(days):
+        keys = group[valid].astype(np.int64) * (days.max() - days.min() + 1) + (days - days.min())
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        daily = {
+            'code': codes[starts][unique_keys // (days.max() - days.min() + 1)],
+            'day': unique_keys % (days.max() - days.min() + 1) + days.min(),
+            'videos': np.bincount(inverse),
+        }
+        for metric in ('likes', 'comments', 'shares'):
+            daily[metric] = np.bincount(inverse, weights=columns[metric][lo:hi][valid]).astype(np.int64)
+        result['daily'] = daily
+    
+    # 每位博主各指标的 Top-K（返回排序后数组中的行号）
+    rank_in_group = np.arange(len(codes)) - starts[group]
+    result['top'] = {}
+    for metric in METRICS:
+        values = columns[metric][lo:hi].astype(np.float64)
+        order = np.lexsort((np.arange(len(codes)), -np.nan_to_num(values, nan=-np.inf), group))
+        keep = order[rank_in_group < k]
+        result['top'][metric] = (lo + keep, values[keep])
+    
+    # 全体博主的汇总统计（可合并累加器）
+    result['overall'] = StreamingStatistics().update({
+        metric: columns[metric][lo:hi] for metric in ('likes', 'comments', 'shares')
+    })
+    
+    return result
+
+
+def _shard_worker(spec: Dict, lo: int, hi: int, k: int) -> Dict:
+    columns, handles = _attach(spec)
+    try:
+        return _analyze_shard(columns, lo, hi, k)
+    finally:
+        del columns
+        for shm in handles:
+            shm.close()
+
+
+class MultiBloggerAnalyzer:
+    """
+    多博主并行分析器
+    
+    所有博主的视频合并为一个DataFrame后按 sec_uid 排序分区，
+    数值列写入共享内存，工作进程直接读取而不复制数据。
+    """
+    
+    def __init__(self, workers: Optional[int] = None, k: int = 10, shards_per_worker: int = 4):
+        self.workers = workers or os.cpu_count() or 1
+        self.k = k
+        self.shards_per_worker = shards_per_worker
+    
+    def _columns(self, df: pd.DataFrame, order: np.ndarray, codes: np.ndarray) -> Dict[str, np.ndarray]:
+        columns = {'code': codes[order].astype(np.int64)}
+        for metric in ('likes', 'comments', 'shares'):
+            columns[metric] = df[metric].to_numpy(dtype=np.int64)[order]
+        if 'engagement_rate' in df.columns:
+            columns['engagement_rate'] = df['engagement_rate'].to_numpy(dtype=np.float64)[order]
+        else:
+            columns['engagement_rate'] = np.zeros(len(df))
+        create_time = pd.to_datetime(df['create_time'], errors='coerce')
+        columns['create_time'] = create_time.to_numpy(dtype='datetime64[ns]').view(np.int64)[order]
+        return columns
+    
+    def _shard_bounds(self, codes: np.ndarray, shards: int) -> List[Tuple[int, int]]:
+        """按行数均分，但分片边界只落在博主边界上"""
+        boundaries = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        targets = np.linspace(0, len(codes), shards + 1)[1:-1]
+        cuts = np.unique(boundaries[np.clip(np.searchsorted(boundaries, targets), 0, len(boundaries) - 1)])
+        edges = [0] + [int(cut) for cut in cuts if 0 < cut < len(codes)] + [len(codes)]
+        return list(zip(edges[:-1], edges[1:]))
+    
+    def _run(self, columns: Dict[str, np.ndarray], bounds: List[Tuple[int, int]]) -> List[Dict]:
+        if self.workers <= 1 or len(columns['code']) < MIN_PARALLEL_ROWS:
+            return [_analyze_shard(columns, lo, hi, self.k) for lo, hi in bounds]
+        
+        blocks, spec = [], {}
+        try:
+            for column, values in columns.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks.append(shm)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+                spec[column] = (shm.name, values.dtype.str, len(values))
+            
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(_shard_worker, spec, lo, hi, self.k) for lo, hi in bounds]
+                return [future.result() for future in futures]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+    
+    def analyze(self, df: pd.DataFrame) -> Dict:
+        """
+        并行分析多位博主
+        
+        Args:
+            df: process_videos 的输出，需包含 sec_uid 列（sec_uid 缺失的行跳过）
+            
+        Returns:
+            {
+                'stats': 每位博主一行的统计（字段同 get_statistics），
+                'daily': 博主 × 日期 的汇总,
+                'top_videos': {指标: 每位博主 Top-K 视频},
+                'global_top': {指标: 全体 Top-K 视频},
+                'overall': 全体博主汇总统计
+            }
+        """
+        if df.empty or 'sec_uid' not in df.columns:
+            return {}
+        
+        # 没有博主ID的视频无法归属（factorize 记为 -1，会被当成最后一位博主），不参与分析
+        missing = df['sec_uid'].isna()
+        if missing.any():
+            print(f"⚠️ {int(missing.sum())} 条视频缺少 sec_uid，已跳过")
+            df = df[~missing]
+            if df.empty:
+                return {}
+        
+        codes, bloggers = pd.factorize(df['sec_uid'])
+        order = np.argsort(codes, kind='stable')
+        columns = self._columns(df, order, codes)
+        bounds = self._shard_bounds(columns['code'], self.workers * self.shards_per_worker)
+        
+        parts = self._run(columns, bounds)
+        return self._merge(df, order, bloggers, parts)
+    
+    def _merge(self, df: pd.DataFrame, order: np.ndarray, bloggers: pd.Index, parts: List[Dict]) -> Dict:
+        def gather(key):
+            return np.concatenate([part[key] for part in parts])
+        
+        codes = gather('code')
+        stats = pd.DataFrame({
+            'total_videos': gather('videos'),
+            'total_likes': gather('total_likes'),
+            'total_comments': gather('total_comments'),
+            'total_shares': gather('total_shares'),
+        }, index=pd.Index(bloggers[codes], name='sec_uid'))
+        for metric in ('likes', 'comments', 'shares'):
+            stats[f'avg_{metric}'] = (stats[f'total_{metric}'] / stats['total_videos']).astype(np.int64)
+        stats['max_likes'] = gather('max_likes')
+        stats['min_likes'] = gather('min_likes')
+        stats['median_likes'] = gather('median_likes').astype(np.int64)
+        stats['std_likes'] = np.where(stats['total_videos'] > 1, gather('std_likes'), 0).astype(np.int64)
+        
+        dailies = [part['daily'] for part in parts if 'daily' in part]
+        if dailies:
+            daily = pd.DataFrame({
+                'sec_uid': bloggers[np.concatenate([d['code'] for d in dailies])],
+                '日期': pd.to_datetime(np.concatenate([d['day'] for d in dailies]), unit='D').date,
+                '点赞总数': np.concatenate([d['likes'] for d in dailies]),
+                '评论总数': np.concatenate([d['comments'] for d in dailies]),
+                '分享总数': np.concatenate([d['shares'] for d in dailies]),
+                '视频数量': np.concatenate([d['videos'] for d in dailies]),
+            })
+        else:
+            daily = pd.DataFrame()
+        
+        top_videos, global_top = {}, {}
+        for metric in METRICS:
+            positions = np.concatenate([part['top'][metric][0] for part in parts])
+            values = np.concatenate([part['top'][metric][1] for part in parts])
+            top_videos[metric] = df.iloc[order[positions]]
+            
+            # 全体 Top-K 一定出现在各博主的 Top-K 中
+            best = np.lexsort((order[positions], -np.nan_to_num(values, nan=-np.inf)))[:self.k]
+            global_top[metric] = df.iloc[order[positions[best]]]
+        
+        overall = StreamingStatistics()
+        for part in parts:
+            overall.merge(part['overall'])
+        
+        return {
+            'stats': stats,
+            'daily': daily,
+            'top_videos': top_videos,
+            'global_top': global_top,
+            'overall': overall.result(),
+        }
@@ -0,0 +1,378 @@
+"""
+近重复视频检测模块
+
+功能：
+1. 对 title / desc 的字符 shingle 计算 MinHash 签名
+2. LSH 分桶找出候选对，签名相似度校验后并查集聚类（只比较同桶视频，不做全量两两比较）
+3. 随新批次增量更新，识别跨博主的搬运 / 重复上传
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+
+UINT32_MAX = np.uint64(0xFFFFFFFF)
+CODE_BITS = 21
+# 新写入的桶表条目先放在较小的有序段里，超过主表的该比例（或下限）时再并入主表
+RECENT_RATIO = 0.25
+RECENT_MIN = 65536
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 终混函数，把 shingle 编码打散为均匀的 64 位值"""
+    with np.errstate(over='ignore'):
+        values = values.astype(np.uint64)
+        values ^= values >> np.uint64(30)
+        values *= np.uint64(0xBF58476D1CE4E5B9)
+        values ^= values >> np.uint64(27)
+        values *= np.uint64(0x94D049BB133111EB)
+        values ^= values >> np.uint64(31)
+    return values
+
+
+def _merge_sorted(keys: np.ndarray, values: np.ndarray, more_keys: np.ndarray,
+                  more_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """合并两段按键有序的 (键, 值) 数组"""
+    keys = np.concatenate([keys, more_keys])
+    values = np.concatenate([values, more_values])
+    order = np.argsort(keys, kind='stable')
+    return keys[order], values[order]
+
+
+class NearDuplicateIndex:
+    """
+    增量 MinHash-LSH 近重复索引
+    
+    签名分成 bands 段，任意一段完全相同即成为候选。每个桶对每个重复组只保留一个代表：
+    新视频与桶内各组的代表比较，已与某个代表同组的视频不再写入该桶，
+    因此热门模板标题形成的大桶也只有少数几个条目，每批的代价不随已导入视频数增长。
+    这是对标准 LSH 的近似：与组代表不相似、只与组内其他视频相似的新视频不会并入该组。
+    候选对的签名相似度（估计的 Jaccard 相似度）达到 threshold 才合并为同一组，
+    每组以最早导入的视频为原始视频。分组用按大小合并的并查集，查找时才做路径折半。
+    
+    所有操作加锁，可在多个会话间共享；设置 max_videos 后超过上限时只保留最近导入的视频重建。
+    """
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle: int = 3,
+                 threshold: float = 0.6, max_chars: int = 128, seed: int = 0,
+                 max_videos: Optional[int] = None):
+        """
+        Args:
+            num_perm: MinHash 签名长度
+            bands: LSH 分段数（需整除 num_perm）
+            shingle: 字符 shingle 长度
+            threshold: 合并为同一组的最低估计相似度
+            max_chars: 每个视频参与计算的最多字符数
+            seed: 哈希函数的随机种子
+            max_videos: 最多保留的视频数（None 表示不限），超过时淘汰最早导入的四分之一
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle = shingle
+        self.threshold = threshold
+        self.max_chars = max_chars
+        self.max_videos = max_videos
+        
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._band_weights = rng.integers(1, 2 ** 63, size=(bands, num_perm // bands), dtype=np.uint64) | np.uint64(1)
+        self._band_salts = rng.integers(0, 2 ** 63, size=bands, dtype=np.uint64)
+        
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._reset_groups()
+        
+        self.video_ids: List[str] = []
+        self.sec_uids: List[Optional[str]] = []
+        self._positions = {}
+        self._lock = threading.RLock()
+    
+    def _reset_groups(self):
+        self._parent = np.zeros(0, dtype=np.int64)
+        self._size = np.zeros(0, dtype=np.int64)
+        self._first = np.zeros(0, dtype=np.int64)
+        # 桶表：(桶键, 组代表) 按桶键排序，分为主表和最近写入的较小一段
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._members = np.empty(0, dtype=np.int64)
+        self._recent_keys = np.empty(0, dtype=np.uint64)
+        self._recent_members = np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.video_ids)
+    
+    def _documents(self, df: pd.DataFrame) -> pd.Series:
+        title = df['title'].fillna('').astype(str) if 'title' in df.columns else pd.Series('', index=df.index)
+        if 'desc' in df.columns:
+            desc = df['desc'].fillna('').astype(str)
+            # 描述与标题相同（常见）时不重复计入
+            title = title.where(desc == title, title + ' ' + desc)
+        # 只保留文字和数字：标点、空格、表情的改动不影响判重
+        # （先转为 object，使用 Python 正则：pyarrow 字符串的 \W 不识别中文）
+        text = title.astype(object).str.lower().str.replace(r'[\W_]+', '', regex=True)
+        return text.str.slice(0, self.max_chars)
+    
+    def signatures(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        计算 MinHash 签名
+        
+        Args:
+            df: 视频数据DataFrame（title / desc）
+        
+        Returns:
+            (视频数, num_perm) 的 uint32 签名；没有任何 shingle 的视频整行为 0xFFFFFFFF
+        """
+        documents = self._documents(df).to_numpy(dtype=str)
+        signatures = np.full((len(documents), self.num_perm), 0xFFFFFFFF, dtype=np.uint32)
+        if len(documents) == 0:
+            return signatures
+        
+        width = documents.dtype.itemsize // 4
+        if width < self.shingle:
+            return signatures
+        
+        chars = documents.view(np.uint32).reshape(len(documents), width).astype(np.int64)
+        span = width - self.shingle + 1
+        codes = chars[:, :span].copy()
+        valid = chars[:, self.shingle - 1:] != 0
+        for offset in range(1, self.shingle):
+            codes = (codes << CODE_BITS) | chars[:, offset:offset + span]
+        
+        # 按行展开后各文档的 shingle 连续存放，可用 reduceat 按文档取最小值
+        counts = valid.sum(axis=1)
+        docs = np.flatnonzero(counts)
+        if len(docs) == 0:
+            return signatures
+        mixed = _mix(codes[valid])
+        starts = np.r_[0, np.cumsum(counts[docs])[:-1]]
+        
+        with np.errstate(over='ignore'):
+            for perm in range(self.num_perm):
+                hashed = (mixed * self._a[perm] + self._b[perm]) >> np.uint64(32)
+                signatures[docs, perm] = np.minimum.reduceat(hashed, starts)
+        
+        return signatures
+    
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """每个签名的 bands 个桶键，形状 (视频数, bands)"""
+        rows = self.num_perm // self.bands
+        grouped = signatures.astype(np.uint64).reshape(len(signatures), self.bands, rows)
+        with np.errstate(over='ignore'):
+            keys = (grouped * self._band_weights).sum(axis=2, dtype=np.uint64)
+        return _mix(keys ^ self._band_salts)
+    
+    def _find(self, docs: np.ndarray) -> np.ndarray:
+        """向量化查找所在组的根，沿途做路径折半（只改动经过的节点）"""
+        parent = self._parent
+        nodes = docs
+        while True:
+            up = parent[nodes]
+            if np.array_equal(up, nodes):
+                return nodes
+            grand = parent[up]
+            parent[nodes] = grand
+            nodes = grand
+    
+    def _find_one(self, doc: int) -> int:
+        parent = self._parent
+        while parent[doc] != doc:
+            parent[doc] = parent[parent[doc]]
+            doc = parent[doc]
+        return int(doc)
+    
+    def _union(self, a: np.ndarray, b: np.ndarray):
+        """按组大小合并，小组挂到大组下；组内最早导入的视频记在根上"""
+        parent, size, first = self._parent, self._size, self._first
+        for x, y in zip(a.tolist(), b.tolist()):
+            rx, ry = self._find_one(x), self._find_one(y)
+            if rx == ry:
+                continue
+            if size[rx] < size[ry]:
+                rx, ry = ry, rx
+            parent[ry] = rx
+            size[rx] += size[ry]
+            first[rx] = min(first[rx], first[ry])
+    
+    def _origins(self, docs: np.ndarray) -> np.ndarray:
+        """各视频所在组的原始（最早导入）视频"""
+        return self._first[self._find(docs)]
+    
+    @staticmethod
+    def _expand(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """把 [start, start + count) 区间依次展开为下标数组"""
+        total = int(counts.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(starts, counts) + offsets
+    
+    def add(self, df: pd.DataFrame, sec_uid: Optional[str] = None) -> 'NearDuplicateIndex':
+        """
+        导入一批视频（已导入过的视频跳过）
+        
+        Args:
+            df: 视频数据DataFrame（需包含 video_id；title / desc 至少一个）
+            sec_uid: 博主ID；为空时使用 df 的 sec_uid 列
+        
+        Returns:
+            self
+        """
+        if df.empty or 'video_id' not in df.columns:
+            return self
+        
+        with self._lock:
+            video_ids = df['video_id'].astype(str)
+            fresh = ~video_ids.duplicated() & video_ids.map(self._positions).isna()
+            df, video_ids = df[fresh.to_numpy()], video_ids[fresh].tolist()
+            if not video_ids:
+                return self
+            
+            start = len(self.video_ids)
+            docs = np.arange(start, start + len(video_ids), dtype=np.int64)
+            owners = [sec_uid] * len(video_ids) if sec_uid is not None or 'sec_uid' not in df.columns \
+                else df['sec_uid'].tolist()
+            
+            self.video_ids.extend(video_ids)
+            self.sec_uids.extend(owners)
+            self._positions.update(zip(video_ids, docs.tolist()))
+            
+            signatures = self.signatures(df)
+            self._signatures = np.concatenate([self._signatures, signatures])
+            self._link(signatures, docs)
+            
+            if self.max_videos is not None and len(self.video_ids) > self.max_videos:
+                self._evict(self.max_videos - self.max_videos // 4)
+        
+        return self
+    
+    def _link(self, signatures: np.ndarray, docs: np.ndarray):
+        """把一批新视频接入并查集与桶表"""
+        self._parent = np.concatenate([self._parent, docs])
+        self._size = np.concatenate([self._size, np.ones(len(docs), dtype=np.int64)])
+        self._first = np.concatenate([self._first, docs])
+        
+        # 没有任何 shingle 的视频（空标题等）不参与分桶
+        indexed = (signatures != 0xFFFFFFFF).any(axis=1)
+        keys = self._band_keys(signatures[indexed]).ravel()
+        key_docs = np.repeat(docs[indexed], self.bands)
+        
+        order = np.argsort(keys, kind='stable')
+        keys, key_docs = keys[order], key_docs[order]
+        
+        # 1) 与已有桶中各组的代表比较
+        pair_rows, pairs_b = [], []
+        for table_keys, members in ((self._keys, self._members), (self._recent_keys, self._recent_members)):
+            left = np.searchsorted(table_keys, keys, side='left')
+            counts = np.searchsorted(table_keys, keys, side='right') - left
+            pair_rows.append(np.repeat(np.arange(len(keys)), counts))
+            pairs_b.append(members[self._expand(left, counts)])
+        
+        # 2) 本批内同桶的视频与其中第一个视频比较
+        first = np.r_[True, keys[1:] != keys[:-1]] if len(keys) else np.empty(0, dtype=bool)
+        group_first = np.flatnonzero(first)[np.cumsum(first) - 1]
+        later = np.flatnonzero(~first)
+        pair_rows.append(later)
+        pairs_b.append(key_docs[group_first[later]])
+        
+        rows = np.concatenate(pair_rows)
+        a, b = key_docs[rows], np.concatenate(pairs_b)
+        covered = np.zeros(len(keys), dtype=bool)
+        if len(a):
+            # 候选对去重后按签名相似度校验
+            total = len(self._parent)
+            codes = np.unique(np.maximum(a, b) * total + np.minimum(a, b))
+            high, low = codes // total, codes % total
+            similar = self._similarity(high, low) >= self.threshold
+            self._union(high[similar], low[similar])
+            # 已与桶内某个代表同组的视频不再写入该桶
+            covered[rows[self._find(a) == self._find(b)]] = True
+        
+        self._recent_keys, self._recent_members = _merge_sorted(
+            self._recent_keys, self._recent_members, keys[~covered], key_docs[~covered])
+        if len(self._recent_keys) > max(RECENT_MIN, int(len(self._keys) * RECENT_RATIO)):
+            self._keys, self._members = _merge_sorted(
+                self._keys, self._members, self._recent_keys, self._recent_members)
+            self._recent_keys = np.empty(0, dtype=np.uint64)
+            self._recent_members = np.empty(0, dtype=np.int64)
+    
+    def _evict(self, keep: int):
+        """只保留最近导入的 keep 个视频，重建分组与桶表"""
+        start = len(self.video_ids) - keep
+        self.video_ids = self.video_ids[start:]
+        self.sec_uids = self.sec_uids[start:]
+        self._positions = {video_id: doc for doc, video_id in enumerate(self.video_ids)}
+        self._signatures = self._signatures[start:]
+        self._reset_groups()
+        self._link(self._signatures, np.arange(keep, dtype=np.int64))
+    
+    def _similarity(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return (self._signatures[a] == self._signatures[b]).mean(axis=1)
+    
+    def similarity(self, video_a: str, video_b: str) -> float:
+        """两个已导入视频的估计 Jaccard 相似度"""
+        with self._lock:
+            a, b = self._positions[str(video_a)], self._positions[str(video_b)]
+            return float(self._similarity(np.array([a]), np.array([b]))[0])
+    
+    def mark(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        为视频标注所属的重复组
+        
+        Args:
+            df: 视频数据DataFrame（其中的视频需已导入）
+        
+        Returns:
+            增加 duplicate_group（组内原始视频的 video_id）与 is_duplicate（非原始视频）两列的 DataFrame
+        """
+        df = df.copy()
+        if df.empty or 'video_id' not in df.columns:
+            return df
+        
+        with self._lock:
+            docs = df['video_id'].astype(str).map(self._positions).to_numpy(dtype=np.float64)
+            known = ~np.isnan(docs)
+            roots = np.full(len(df), -1, dtype=np.int64)
+            roots[known] = self._origins(docs[known].astype(np.int64))
+            groups = np.asarray(self.video_ids, dtype=object)[np.maximum(roots, 0)] if known.any() else None
+        
+        df['duplicate_group'] = np.where(known, groups, df['video_id'].astype(str))
+        df['is_duplicate'] = known & (roots != np.where(known, docs, -1).astype(np.int64))
+        return df
+    
+    def clusters(self, min_size: int = 2, cross_blogger: bool = False) -> pd.DataFrame:
+        """
+        列出重复组
+        
+        Args:
+            min_size: 组内至少的视频数
+            cross_blogger: 只保留包含多位博主的组（搬运）
+        
+        Returns:
+            DataFrame（video_id / sec_uid / duplicate_group / group_size / is_duplicate），按组排列
+        """
+        columns = ['video_id', 'sec_uid', 'duplicate_group', 'group_size', 'is_duplicate']
+        with self._lock:
+            if not self.video_ids:
+                return pd.DataFrame(columns=columns)
+            video_ids, sec_uids = list(self.video_ids), list(self.sec_uids)
+            roots = self._origins(np.arange(len(video_ids)))
+        
+        sizes = np.bincount(roots, minlength=len(roots))
+        keep = sizes[roots] >= min_size
+        result = pd.DataFrame({
+            'video_id': video_ids,
+            'sec_uid': sec_uids,
+            'duplicate_group': np.asarray(video_ids, dtype=object)[roots],
+            'group_size': sizes[roots],
+            'is_duplicate': roots != np.arange(len(roots)),
+            'root': roots,
+        })[keep]
+        
+        if cross_blogger:
+            bloggers = result.groupby('root')['sec_uid'].transform('nunique')
+            result = result[bloggers > 1]
+        
+        return result.sort_values(['root', 'is_duplicate'], kind='stable')[columns].reset_index(drop=True)
@@ -0,0 +1,136 @@
+"""
+服务端分页表格模块
+
+功能：
+1. 排序、关键词筛选与分页都在服务端完成，前端只接收当前页的行
+2. 每个排序列的行顺序只计算一次，之后切换排序 / 翻页只做切片
+3. 关键词筛选基于全文索引（title / desc / tags），命中结果按关键词缓存
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from text_index import TextIndex
+
+
+class PagedTable:
+    """
+    服务端分页表格
+    
+    顺序 = 按排序列缓存的行号排列（缺失值排在最后，相同值保持原顺序），
+    筛选 = 全文索引命中行的布尔掩码；每页的行号为 顺序[掩码[顺序]] 的一段切片，
+    只有这一段的行被取出并交给 st.dataframe 序列化。
+    同一张表经共享缓存被多个会话（线程）同时使用，排序 / 筛选缓存的读写都在锁内进行。
+    """
+    
+    def __init__(self, df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                 text_index: Optional[TextIndex] = None, max_filters: int = 16):
+        """
+        Args:
+            df: 视频数据DataFrame
+            columns: 展示的列（默认全部列；不存在的列忽略）
+            text_index: 基于 df 构建的全文索引（不传时在第一次筛选时构建）
+            max_filters: 缓存的筛选结果数
+        """
+        self.df = df
+        self.columns = [column for column in (columns or df.columns) if column in df.columns]
+        self.max_filters = max_filters
+        self._column_positions = df.columns.get_indexer(self.columns)
+        self._index = text_index
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._filters: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.df)
+    
+    def order(self, sort_by: Optional[str] = None, ascending: bool = False) -> np.ndarray:
+        """
+        排序后的行号（按列缓存）
+        
+        Args:
+            sort_by: 排序列，为空时保持原顺序
+            ascending: 是否升序
+        
+        Returns:
+            行号数组
+        """
+        if sort_by is None or sort_by not in self.df.columns:
+            return np.arange(len(self.df))
+        
+        key = (sort_by, ascending)
+        with self._lock:
+            if key not in self._orders:
+                values = self.df[sort_by].reset_index(drop=True)
+                self._orders[key] = values.sort_values(
+                    ascending=ascending, kind='stable', na_position='last'
+                ).index.to_numpy()
+            return self._orders[key]
+    
+    def matches(self, query: str = '') -> Optional[np.ndarray]:
+        """
+        关键词命中的行（布尔掩码，多个关键词用空格分隔、需同时出现）
+        
+        Returns:
+            掩码；没有关键词时为 None（不筛选）
+        """
+        keywords = query.split()
+        if not keywords:
+            return None
+        
+        key = ' '.join(keywords).lower()
+        with self._lock:
+            if key in self._filters:
+                self._filters.move_to_end(key)
+                return self._filters[key]
+            
+            if self._index is None:
+                self._index = self._build_index()
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[self._index.search_all(keywords)] = True
+            
+            self._filters[key] = mask
+            if len(self._filters) > self.max_filters:
+                self._filters.popitem(last=False)
+            return mask
+    
+    def _build_index(self) -> TextIndex:
+        index = TextIndex()
+        index.add(self.df, start_row=0)
+        return index
+    
+    def rows(self, sort_by: Optional[str] = None, ascending: bool = False, query: str = '') -> np.ndarray:
+        """筛选并排序后的全部行号"""
+        order = self.order(sort_by, ascending)
+        mask = self.matches(query)
+        return order if mask is None else order[mask[order]]
+    
+    def count(self, query: str = '') -> int:
+        """筛选后的行数"""
+        mask = self.matches(query)
+        return len(self.df) if mask is None else int(mask.sum())
+    
+    def page(self, page: int = 1, page_size: int = 50, sort_by: Optional[str] = None,
+             ascending: bool = False, query: str = '') -> Tuple[pd.DataFrame, int]:
+        """
+        取出一页
+        
+        Args:
+            page: 页码（从 1 开始，超出范围时取最后一页）
+            page_size: 每页行数
+            sort_by: 排序列
+            ascending: 是否升序
+            query: 筛选关键词
+        
+        Returns:
+            (当前页的 DataFrame（只含展示列）, 筛选后的总行数)
+        """
+        rows = self.rows(sort_by, ascending, query)
+        pages = max(1, -(-len(rows) // page_size))
+        start = (min(max(page, 1), pages) - 1) * page_size
+        visible = rows[start:start + page_size]
+        return self.df.iloc[visible, self._column_positions].reset_index(drop=True), len(rows)
@@ -0,0 +1,284 @@
+"""
+惰性查询模块
+
+功能：
+1. 记录筛选 / 投影 / 排序 / Top-K / 聚合步骤，不立即执行
+2. 优化执行计划（筛选下推、排序+截取合并为 Top-K、裁剪无用列）
+3. 基于行号执行，整条流水线只在最后复制一次数据
+"""
+
+import operator
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+
+COMPARATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+class Step:
+    """执行计划中的一个步骤"""
+    
+    def __init__(self, op: str, **params):
+        self.op = op
+        self.params = params
+    
+    def columns(self) -> List[str]:
+        """该步骤读取的列"""
+        if self.op == 'filter':
+            return [self.params['column']]
+        if self.op in ('sort', 'top'):
+            return [self.params['by']]
+        if self.op == 'aggregate':
+            return list(self.params['by']) + list(self.params['aggs'])
+        if self.op == 'select':
+            return list(self.params['columns'])
+        return []
+    
+    def __repr__(self) -> str:
+        params = ', '.join(f'{key}={value!r}' for key, value in self.params.items())
+        return f'{self.op}({params})'
+
+
+class Query:
+    """
+    惰性查询构建器
+    
+    用法：
+        processor.query(df).last_days(30).sort('likes').head(10).collect()
+        
+    collect() 之前只记录步骤；执行时先优化计划，再一次性取出结果行。
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.steps: List[Step] = []
+    
+    def _add(self, op: str, **params) -> 'Query':
+        if self.steps and self.steps[-1].op == 'aggregate':
+            raise ValueError(f"aggregate 是终止步骤，之后不能再追加 {op}")
+        query = Query(self.df)
+        query.steps = self.steps + [Step(op, **params)]
+        return query
+    
+    # ---- 构建步骤 ----
+    
+    def where(self, column: str, op: str, value) -> 'Query':
+        """
+        按条件筛选
+        
+        Args:
+            column: 列名
+            op: 比较符（== / != / > / >= / < / <= / in / contains）
+            value: 比较值
+            
+        Returns:
+            新的查询
+        """
+        if op not in COMPARATORS and op not in ('in', 'contains'):
+            raise ValueError(f"不支持的比较符: {op}")
+        return self._add('filter', column=column, cmp=op, value=value)
+    
+    def between(self, start=None, end=None, column: str = 'create_time') -> 'Query':
+        """筛选 [start, end) 时间范围"""
+        query = self
+        if start is not None:
+            query = query.where(column, '>=', pd.Timestamp(start))
+        if end is not None:
+            query = query.where(column, '<', pd.Timestamp(end))
+        return query
+    
+    def last_days(self, days: int = 30) -> 'Query':
+        """筛选近N天（与 DataProcessor.filter_by_date 一致）"""
+        return self.between(start=datetime.now() - timedelta(days=days))
+    
+    def select(self, *columns: str) -> 'Query':
+        """投影到指定列"""
+        return self._add('select', columns=list(columns))
+    
+    def sort(self, by: str = 'likes', ascending: bool = False) -> 'Query':
+        """排序"""
+        return self._add('sort', by=by, ascending=ascending)
+    
+    def head(self, n: int = 10) -> 'Query':
+        """取前N行"""
+        return self._add('head', n=n)
+    
+    def top(self, n: int = 10, by: str = 'likes') -> 'Query':
+        """取指标最大的N行（与 get_top_videos 一致）"""
+        return self._add('top', n=n, by=by, ascending=False)
+    
+    def aggregate(self, by, **aggs: str) -> 'Query':
+        """
+        分组聚合（终止步骤）
+        
+        Args:
+            by: 分组列（字符串或列表）
+            **aggs: 列名=聚合函数，例如 likes='sum'
+            
+        Returns:
+            新的查询
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        return self._add('aggregate', by=by, aggs=aggs)
+    
+    # ---- 优化 ----
+    
+    def optimize(self) -> List[Step]:
+        """
+        生成优化后的执行计划
+        
+        Returns:
+            步骤列表
+        """
+        steps = list(self.steps)
+        
+        # 1. 筛选下推：越过 sort / select 移到前面（不能越过 head / top）
+        changed = True
+        while changed:
+            changed = False
+            for i in range(1, len(steps)):
+                if steps[i].op == 'filter' and steps[i - 1].op in ('sort', 'select'):
+                    steps[i - 1], steps[i] = steps[i], steps[i - 1]
+                    changed = True
+        
+        # 2. sort + head 合并为 top
+        fused = []
+        for step in steps:
+            if step.op == 'head' and fused and fused[-1].op == 'sort':
+                sort = fused.pop()
+                fused.append(Step('top', n=step.params['n'], by=sort.params['by'],
+                                  ascending=sort.params['ascending']))
+            else:
+                fused.append(step)
+        steps = fused
+        
+        # 3. 连续两次按同一列排序只保留后一个（排序稳定：按不同列时前一次排序决定后一次的并列顺序，不能去掉）
+        steps = [
+            step for i, step in enumerate(steps)
+            if not (step.op == 'sort' and i + 1 < len(steps) and steps[i + 1].op == 'sort'
+                    and steps[i + 1].params['by'] == step.params['by'])
+        ]
+        
+        return steps
+    
+    def required_columns(self, steps: Optional[List[Step]] = None) -> Optional[List[str]]:
+        """
+        执行计划需要读取的列
+        
+        Returns:
+            列名列表；没有投影或聚合时返回 None（需要全部列）
+        """
+        steps = steps if steps is not None else self.optimize()
+        terminal = [step for step in steps if step.op in ('select', 'aggregate')]
+        if not terminal:
+            return None
+        
+        needed = []
+        for step in steps:
+            for column in step.columns():
+                if column not in needed:
+                    needed.append(column)
+        return needed
+    
+    def explain(self) -> str:
+        """返回优化后的执行计划文本"""
+        steps = self.optimize()
+        lines = [f'{i + 1}. {step!r}' for i, step in enumerate(steps)]
+        columns = self.required_columns(steps)
+        lines.append(f'columns: {columns if columns is not None else "*"}')
+        return '\n'.join(lines)
+    
+    # ---- 执行 ----
+    
+    def _filter(self, positions: Optional[np.ndarray], step: Step) -> np.ndarray:
+        series = self.df[step.params['column']]
+        cmp, value = step.params['cmp'], step.params['value']
+        
+        # 有序列上的范围条件直接二分
+        if positions is None and cmp in ('>=', '>', '<', '<=') and series.is_monotonic_increasing:
+            side = 'left' if cmp in ('>=', '<') else 'right'
+            cut = int(series.searchsorted(value, side=side))
+            return np.arange(cut, len(series)) if cmp in ('>=', '>') else np.arange(0, cut)
+        
+        values = series.to_numpy() if positions is None else series.to_numpy()[positions]
+        if cmp == 'in':
+            mask = pd.Series(values).isin(list(value)).to_numpy()
+        elif cmp == 'contains':
+            mask = pd.Series(values).astype(str).str.contains(value, regex=False).to_numpy()
+        else:
+            mask = np.asarray(COMPARATORS[cmp](values, value), dtype=bool)
+        
+        if positions is None:
+            return np.flatnonzero(mask)
+        return positions[mask]
+    
+    def _order(self, positions: np.ndarray, step: Step) -> np.ndarray:
+        values = self.df[step.params['by']].to_numpy()[positions]
+        ascending = step.params['ascending']
+        
+        if step.op == 'top' and step.params['n'] < len(values) and values.dtype.kind in 'iuf':
+            n = step.params['n']
+            keys = values.astype(np.float64) if ascending else -values.astype(np.float64)
+            # 缺失值排在最后（与排序路径的 na_position='last' 一致），否则门槛为 NaN 时结果为空
+            keys = np.where(np.isnan(keys), np.inf, keys)
+            candidates = np.argpartition(keys, n - 1)[:n]
+            threshold = keys[candidates].max()
+            # 与门槛相同的值按原始顺序取，结果与 nlargest 一致
+            candidates = np.flatnonzero(keys <= threshold)
+            ranked = candidates[np.lexsort((candidates, keys[candidates]))][:n]
+            return positions[ranked]
+        
+        order = pd.Series(values).sort_values(ascending=ascending, kind='stable').index.to_numpy()
+        if step.op == 'top':
+            order = order[:step.params['n']]
+        
+        return positions[order]
+    
+    def collect(self) -> pd.DataFrame:
+        """
+        执行查询
+        
+        Returns:
+            结果DataFrame
+        """
+        steps = self.optimize()
+        df = self.df
+        if df.empty:
+            return df
+        
+        positions: Optional[np.ndarray] = None
+        columns = list(df.columns)
+        
+        for step in steps:
+            if step.op == 'filter':
+                positions = self._filter(positions, step)
+            elif step.op == 'select':
+                columns = [col for col in step.params['columns'] if col in df.columns]
+            else:
+                if positions is None:
+                    positions = np.arange(len(df))
+                if step.op in ('sort', 'top'):
+                    if step.params['by'] in df.columns:
+                        positions = self._order(positions, step)
+                    elif step.op == 'top':
+                        positions = positions[:step.params['n']]
+                elif step.op == 'head':
+                    positions = positions[:step.params['n']]
+                elif step.op == 'aggregate':
+                    needed = [col for col in self.required_columns(steps) if col in df.columns]
+                    subset = df.iloc[positions, [df.columns.get_loc(col) for col in needed]]
+                    return subset.groupby(step.params['by']).agg(step.params['aggs']).reset_index()
+        
+        column_positions = [df.columns.get_loc(col) for col in columns]
+        if positions is None:
+            return df.iloc[:, column_positions]
+        return df.iloc[positions, column_positions]
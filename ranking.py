@@ -0,0 +1,215 @@
+"""
+排行榜模块
+
+功能：
+1. 单指标有界堆 Top-K
+2. 按博主 / 全局维护多指标排行榜
+3. 分片结果合并
+"""
+
+import heapq
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Iterable
+
+
+# 排行榜保留的展示字段
+RECORD_FIELDS = [
+    'video_id', 'sec_uid', 'title', 'likes', 'comments', 'shares',
+    'engagement_rate', 'create_time', 'video_url'
+]
+
+
+class TopKTracker:
+    """
+    单指标 Top-K 跟踪器
+    
+    使用大小为 k 的小顶堆，堆顶即当前入榜门槛；每条记录 O(log k)。
+    同一视频再次出现时（例如刷新后的快照）以最新值为准。
+    """
+    
+    def __init__(self, metric: str, k: int = 100):
+        self.metric = metric
+        self.k = k
+        self._heap: List[tuple] = []
+        self._records: Dict[str, Dict] = {}
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    @property
+    def threshold(self) -> Optional[float]:
+        """入榜门槛（榜未满时为 None）"""
+        if len(self._heap) < self.k:
+            return None
+        return self._heap[0][0]
+    
+    def push(self, video_id: str, value: float, record: Dict):
+        """
+        推入一条记录
+        
+        Args:
+            video_id: 视频ID
+            value: 指标值
+            record: 展示字段
+        """
+        if video_id in self._records:
+            # 已在榜内：更新数值后重新建堆（k 很小，代价可忽略）
+            self._records[video_id] = record
+            self._heap = [(v, vid) if vid != video_id else (value, vid) for v, vid in self._heap]
+            heapq.heapify(self._heap)
+            return
+        
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (value, video_id))
+        elif (value, video_id) > self._heap[0]:
+            _, evicted = heapq.heapreplace(self._heap, (value, video_id))
+            del self._records[evicted]
+        else:
+            return
+        
+        self._records[video_id] = record
+    
+    def update(self, df: pd.DataFrame):
+        """
+        推入一批记录
+        
+        先更新本批次中已在榜内的视频（数值可能下降），再用 argpartition 取出本批次的前 k 名逐条入堆。
+        
+        Args:
+            df: 视频数据DataFrame（需包含 video_id 与指标列）
+        """
+        if df.empty or self.metric not in df.columns:
+            return
+        
+        values = pd.to_numeric(df[self.metric], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        if len(values) > self.k:
+            candidates = np.argpartition(-values, self.k - 1)[:self.k]
+        else:
+            candidates = np.arange(len(values))
+        
+        columns = [col for col in RECORD_FIELDS if col in df.columns]
+        on_board = np.empty(0, dtype=np.int64)
+        if self._records:
+            on_board = np.flatnonzero(df['video_id'].astype(str).isin(self._records.keys()).to_numpy())
+            candidates = np.setdiff1d(candidates, on_board)
+        
+        # 已在榜内的视频以本批次的值为准（按行顺序，同一视频以最后一次为准）
+        self._push_rows(df, values, on_board, columns, threshold=None)
+        self._push_rows(df, values, np.sort(candidates), columns, threshold=self.threshold)
+    
+    def _push_rows(self, df: pd.DataFrame, values: np.ndarray, positions: np.ndarray,
+                   columns: List[str], threshold: Optional[float]):
+        if len(positions) == 0:
+            return
+        rows = df.iloc[positions]
+        ids = rows['video_id'].astype(str).to_numpy()
+        for position, record in enumerate(rows[columns].to_dict('records')):
+            value = values[positions[position]]
+            if threshold is not None and value < threshold and ids[position] not in self._records:
+                continue
+            self.push(ids[position], float(value), record)
+    
+    def merge(self, other: 'TopKTracker'):
+        """合并另一个分片的跟踪器"""
+        for value, video_id in other._heap:
+            self.push(video_id, value, other._records[video_id])
+    
+    def top(self, n: Optional[int] = None) -> List[Dict]:
+        """
+        获取排行
+        
+        Args:
+            n: 数量（默认全部）
+            
+        Returns:
+            按指标降序的记录列表
+        """
+        ranked = heapq.nlargest(n or self.k, self._heap)
+        return [self._records[video_id] for _, video_id in ranked]
+
+
+class RankingEngine:
+    """
+    流式排行榜引擎
+    
+    同时维护全局榜和每位博主的榜，指标包括点赞、评论、分享和互动率。
+    视频分批流入即可，刷新排行榜无需对全部视频排序。
+    """
+    
+    METRICS = ('likes', 'comments', 'shares', 'engagement_rate')
+    
+    def __init__(self, k: int = 100, metrics: Iterable[str] = METRICS):
+        self.k = k
+        self.metrics = tuple(metrics)
+        self.global_boards = self._new_boards()
+        self.blogger_boards: Dict[str, Dict[str, TopKTracker]] = {}
+    
+    def _new_boards(self) -> Dict[str, TopKTracker]:
+        return {metric: TopKTracker(metric, self.k) for metric in self.metrics}
+    
+    def update(self, df: pd.DataFrame, sec_uid: Optional[str] = None) -> 'RankingEngine':
+        """
+        消费一批视频
+        
+        Args:
+            df: 视频数据DataFrame（process_videos 的输出）
+            sec_uid: 博主ID；为空时按 df 的 sec_uid 列分组
+            
+        Returns:
+            self
+        """
+        if df.empty:
+            return self
+        
+        if sec_uid is not None:
+            df = df.assign(sec_uid=sec_uid)
+        
+        for board in self.global_boards.values():
+            board.update(df)
+        
+        if 'sec_uid' in df.columns:
+            for blogger, group in df.groupby('sec_uid', sort=False):
+                boards = self.blogger_boards.setdefault(blogger, self._new_boards())
+                for board in boards.values():
+                    board.update(group)
+        
+        return self
+    
+    def consume(self, batches: Iterable[pd.DataFrame]) -> 'RankingEngine':
+        """依次消费多个批次"""
+        for batch in batches:
+            self.update(batch)
+        return self
+    
+    def merge(self, other: 'RankingEngine') -> 'RankingEngine':
+        """合并另一个分片的排行榜"""
+        for metric, board in other.global_boards.items():
+            if metric in self.global_boards:
+                self.global_boards[metric].merge(board)
+        
+        for blogger, boards in other.blogger_boards.items():
+            mine = self.blogger_boards.setdefault(blogger, self._new_boards())
+            for metric, board in boards.items():
+                if metric in mine:
+                    mine[metric].merge(board)
+        
+        return self
+    
+    def top(self, metric: str = 'likes', n: int = 20, sec_uid: Optional[str] = None) -> pd.DataFrame:
+        """
+        获取排行榜
+        
+        Args:
+            metric: 排序指标
+            n: 数量（不超过 k）
+            sec_uid: 博主ID，为空时返回全局榜
+            
+        Returns:
+            按指标降序的DataFrame
+        """
+        boards = self.global_boards if sec_uid is None else self.blogger_boards.get(sec_uid)
+        if not boards or metric not in boards:
+            return pd.DataFrame()
+        
+        return pd.DataFrame(boards[metric].top(n))
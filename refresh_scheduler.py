@@ -0,0 +1,418 @@
+"""
+关注列表自动刷新模块
+
+功能：
+1. 长期运行的 asyncio 调度器，按优先级挑选下一个要刷新的博主或视频
+2. 刷新间隔由 发布新近度、近期增速、用户关注度 决定：新视频 / 刚发过视频的博主刷新频繁，旧的很少刷新
+3. 每个 Cookie 独立的请求预算（令牌桶），多个 Cookie 各自以自己的速率并行刷新
+4. 刷新结果写入 VelocityTracker（增速）与 SharedCache（页面 / 接口直接读到新数据）
+
+用法：
+    scheduler = RefreshScheduler([CookieBudget(cookie, rate_per_minute=20)])
+    scheduler.watch(sec_uid, interest=2.0)
+    asyncio.run(scheduler.run())
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from analysis_cache import SharedCache
+from crawlers import DouyinCrawler
+from velocity import VelocityTracker
+
+
+BLOGGER = 'blogger'
+VIDEO = 'video'
+SECONDS_PER_HOUR = 3600.0
+
+
+class CookieBudget:
+    """
+    一个 Cookie 的请求预算（令牌桶）
+    
+    每分钟补充 rate_per_minute 个令牌，最多积攒 burst 个；每次请求消耗一个。
+    """
+    
+    def __init__(self, cookie: Optional[str] = None, rate_per_minute: float = 20, burst: int = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            cookie: 抖音Cookie（为空时使用演示数据）
+            rate_per_minute: 每分钟请求数
+            burst: 允许的突发请求数
+            clock: 时钟（测试时可替换）
+        """
+        self.crawler = DouyinCrawler()
+        if cookie:
+            self.crawler.set_cookie(cookie)
+            self.crawler.enable_real_mode()
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.spent = 0
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+    
+    @property
+    def name(self) -> str:
+        """日志中显示的名称（不暴露 Cookie 内容）"""
+        cookie = self.crawler.cookie
+        return f"cookie-{cookie[-6:]}" if cookie else 'demo'
+    
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def ready(self, stop: Optional[asyncio.Event] = None) -> bool:
+        """
+        等待至少有一个令牌（不消耗）
+        
+        Args:
+            stop: 停止信号，设置后立即返回
+        
+        Returns:
+            是否有可用令牌（因 stop 返回时为 False）
+        """
+        self._refill()
+        while self._tokens < 1:
+            wait = (1 - self._tokens) / self.rate
+            if stop is None:
+                await asyncio.sleep(wait)
+            else:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=wait)
+                    return False
+                except asyncio.TimeoutError:
+                    pass
+            self._refill()
+        return True
+    
+    def take(self):
+        """消耗一个令牌（调用前先 ready）"""
+        self._refill()
+        self._tokens -= 1
+        self.spent += 1
+    
+    async def acquire(self, stop: Optional[asyncio.Event] = None) -> bool:
+        """取得一个令牌（预算不足时等待），stop 被设置时返回 False"""
+        if not await self.ready(stop):
+            return False
+        self.take()
+        return True
+
+
+class RefreshTask:
+    """调度表中的一项（一位博主或一个视频）"""
+    
+    def __init__(self, kind: str, key: str, interest: float = 1.0, owner: Optional[str] = None):
+        self.kind = kind
+        self.key = key
+        self.owner = owner
+        self.interest = interest
+        self.last_post: Optional[float] = None
+        self.velocity = 0.0
+        self.last_refreshed: Optional[float] = None
+        self.last_viewed: Optional[float] = None
+        self.failures = 0
+        self.refreshes = 0
+        self.due = 0.0
+
+
+class RefreshScheduler:
+    """
+    优先级刷新调度器
+    
+    目标间隔 = clamp(距最近一次发布的时长 × age_ratio, min_interval, max_interval)
+              / (1 + log10(1 + 每小时点赞增速)) / 有效关注度，
+    即刷新间隔与内容年龄成正比：发布 1 小时的视频约每 15 分钟刷新一次，发布一周的每两天一次。
+    所有任务按到期时间放在一个堆里，每个 Cookie 一个协程：先取得令牌，再取出最早到期的任务，
+    因此固定预算总是花在最「过期」的内容上；预算不足时所有任务按比例推迟而不是饿死某一项。
+    """
+    
+    def __init__(self, budgets: Optional[Sequence[CookieBudget]] = None, cache: Optional[SharedCache] = None,
+                 tracker: Optional[VelocityTracker] = None, days: int = 30,
+                 min_interval: float = 600, max_interval: float = 7 * 86400, age_ratio: float = 0.25,
+                 track_video_hours: float = 72, interest_half_life: float = 86400,
+                 on_refresh: Optional[Callable[[RefreshTask, Any], None]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            budgets: 各 Cookie 的请求预算（默认一个演示数据预算）
+            cache: 共享缓存（刷新后的视频列表写入其中）
+            tracker: 增速跟踪器（默认新建）
+            days: 博主刷新时采集近N天的视频
+            min_interval: 最短刷新间隔（秒）
+            max_interval: 最长刷新间隔（秒）
+            age_ratio: 刷新间隔与内容年龄之比
+            track_video_hours: 发布不超过该时长的视频单独刷新，超过后只随博主列表刷新
+            interest_half_life: 用户查看带来的关注度加成的半衰期（秒）
+            on_refresh: 每次刷新成功后以 (任务, 数据) 调用
+            clock: 时钟（测试时可替换）
+        """
+        self.budgets = list(budgets) if budgets else [CookieBudget()]
+        self.cache = cache
+        self.tracker = tracker or VelocityTracker()
+        self.days = days
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_ratio = age_ratio
+        self.track_video_hours = track_video_hours
+        self.interest_half_life = interest_half_life
+        self.on_refresh = on_refresh
+        self._clock = clock
+        
+        self._tasks: Dict[Tuple[str, str], RefreshTask] = {}
+        self._heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._counter = itertools.count()
+        self._changed: Optional[asyncio.Event] = None
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
+    
+    def watch(self, sec_uid: str, interest: float = 1.0):
+        """
+        关注一位博主（已关注时只更新关注度）
+        
+        Args:
+            sec_uid: 博主ID
+            interest: 关注度（越高刷新越频繁，1 为默认）
+        """
+        task = self._tasks.get((BLOGGER, sec_uid))
+        if task is None:
+            task = self._tasks[(BLOGGER, sec_uid)] = RefreshTask(BLOGGER, sec_uid, interest)
+            self._schedule(task, self._clock())
+        else:
+            task.interest = interest
+            self._reschedule(task)
+    
+    def unwatch(self, sec_uid: str):
+        """取消关注（连同其单独刷新的视频）"""
+        for task_key in [task_key for task_key, task in self._tasks.items()
+                         if task_key == (BLOGGER, sec_uid) or task.owner == sec_uid]:
+            del self._tasks[task_key]
+    
+    def mark_viewed(self, key: str, kind: str = BLOGGER):
+        """用户查看了某位博主 / 某个视频：临时提高关注度，并按新的间隔重新排期"""
+        task = self._tasks.get((kind, key))
+        if task is not None:
+            task.last_viewed = self._clock()
+            self._reschedule(task)
+    
+    def effective_interest(self, task: RefreshTask, now: Optional[float] = None) -> float:
+        """关注度 ×（1 + 最近一次查看的加成，按半衰期衰减）"""
+        now = self._clock() if now is None else now
+        boost = 0.0
+        if task.last_viewed is not None:
+            boost = 0.5 ** ((now - task.last_viewed) / self.interest_half_life)
+        return max(task.interest, 1e-3) * (1 + boost)
+    
+    def interval(self, task: RefreshTask, now: Optional[float] = None) -> float:
+        """
+        任务的目标刷新间隔（秒）
+        
+        Args:
+            task: 调度项
+            now: 当前时间（默认时钟）
+        
+        Returns:
+            间隔秒数；连续失败时按 2 的幂退避
+        """
+        now = self._clock() if now is None else now
+        age = now - task.last_post if task.last_post is not None else self.max_interval / self.age_ratio
+        base = min(max(age * self.age_ratio, self.min_interval), self.max_interval)
+        speed = 1 + math.log10(1 + max(task.velocity, 0.0))
+        interval = base / speed / self.effective_interest(task, now)
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return min(interval * 2 ** task.failures, self.max_interval)
+    
+    def _next_due(self, task: RefreshTask) -> float:
+        if task.last_refreshed is None:
+            return self._clock()
+        return task.last_refreshed + self.interval(task)
+    
+    def _reschedule(self, task: RefreshTask):
+        # 正在刷新的任务（到期时间为 inf）在刷新结束后按新参数排期
+        if math.isfinite(task.due):
+            self._schedule(task, self._next_due(task))
+    
+    def _schedule(self, task: RefreshTask, due: float):
+        # 堆中的旧条目不删除，出堆时与任务当前的到期时间比对后丢弃
+        task.due = due
+        heapq.heappush(self._heap, (due, next(self._counter), (task.kind, task.key)))
+        if self._changed is not None:
+            self._changed.set()
+    
+    def _pop_due(self, now: float) -> Tuple[Optional[RefreshTask], Optional[float]]:
+        """取出一个已到期的任务；没有时返回最早的到期时间"""
+        while self._heap:
+            due, _, task_key = self._heap[0]
+            task = self._tasks.get(task_key)
+            if task is None or task.due != due:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                return None, due
+            heapq.heappop(self._heap)
+            # 执行期间不在堆中，其他协程不会重复刷新
+            task.due = math.inf
+            return task, None
+        return None, None
+    
+    def schedule(self) -> pd.DataFrame:
+        """
+        当前调度表
+        
+        Returns:
+            DataFrame（类型 / 键 / 下次刷新 / 间隔(分钟) / 增速 / 关注度 / 刷新次数 / 失败次数），按下次刷新升序
+        """
+        now = self._clock()
+        rows = [{
+            '类型': task.kind,
+            '键': task.key,
+            '下次刷新': datetime.fromtimestamp(task.due) if math.isfinite(task.due) else None,
+            '间隔(分钟)': round(self.interval(task, now) / 60, 1),
+            '增速': round(task.velocity, 2),
+            '关注度': round(self.effective_interest(task, now), 2),
+            '刷新次数': task.refreshes,
+            '失败次数': task.failures,
+        } for task in self._tasks.values()]
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values('下次刷新', na_position='first', kind='stable').reset_index(drop=True)
+    
+    async def run(self, stop: Optional[asyncio.Event] = None, poll: float = 30):
+        """
+        运行调度器直到 stop 被设置
+        
+        Args:
+            stop: 停止信号（默认一直运行）
+            poll: 没有到期任务时的最长等待（秒）
+        """
+        stop = stop or asyncio.Event()
+        self._changed = asyncio.Event()
+        try:
+            await asyncio.gather(*(self._worker(budget, stop, poll) for budget in self.budgets))
+        finally:
+            self._changed = None
+    
+    async def _worker(self, budget: CookieBudget, stop: asyncio.Event, poll: float):
+        while not stop.is_set():
+            # 先等到有令牌再取任务：预算用完的 Cookie 不会占住最早到期的任务，其他 Cookie 照常处理
+            if not await budget.ready(stop):
+                break
+            task = await self._next_task(stop, poll)
+            if task is None:
+                continue
+            budget.take()
+            await self._refresh(task, budget)
+    
+    async def _next_task(self, stop: asyncio.Event, poll: float) -> Optional[RefreshTask]:
+        """等待下一个到期任务（新关注 / 排期变化时提前唤醒）"""
+        task, due = self._pop_due(self._clock())
+        if task is not None:
+            return task
+        
+        timeout = poll if due is None else min(max(due - self._clock(), 0), poll)
+        self._changed.clear()
+        waiters = [asyncio.ensure_future(self._changed.wait()), asyncio.ensure_future(stop.wait())]
+        _, pending = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            waiter.cancel()
+        return None
+    
+    async def _refresh(self, task: RefreshTask, budget: CookieBudget):
+        crawler = budget.crawler
+        try:
+            if task.kind == BLOGGER:
+                data = await asyncio.to_thread(crawler.get_blogger_videos, task.key, self.days)
+                self._apply_videos(task, data, crawler.data_mode)
+            else:
+                data = await asyncio.to_thread(crawler.get_video_detail, task.key)
+                if data is None:
+                    raise ValueError("视频不存在或已删除")
+                self._apply_videos(task, [{**data, 'video_id': task.key}], crawler.data_mode)
+            task.failures = 0
+            task.refreshes += 1
+        except Exception as e:
+            data = None
+            task.failures += 1
+            print(f"❌ 刷新失败 [{task.kind}:{task.key} @ {budget.name}]: {e}")
+        
+        task.last_refreshed = self._clock()
+        if (task.kind, task.key) in self._tasks:
+            self._schedule(task, self._next_due(task))
+        if data is not None and self.on_refresh is not None:
+            self.on_refresh(task, data)
+    
+    def _apply_videos(self, task: RefreshTask, videos: List[Dict], data_mode: str):
+        """刷新结果写入增速跟踪器，更新任务的新近度 / 增速，并为新视频建立单独的刷新任务"""
+        if not videos:
+            return
+        now = self._clock()
+        df = pd.DataFrame(videos)
+        scores = self.tracker.update(df, at=datetime.fromtimestamp(now))
+        velocity = dict(zip(scores['video_id'], scores['likes_velocity'].fillna(0.0)))
+        created = pd.to_datetime(df['create_time'], errors='coerce') if 'create_time' in df.columns else None
+        
+        if task.kind == VIDEO:
+            task.velocity = float(velocity.get(task.key, 0.0))
+            if created is not None and pd.notna(created.iloc[0]):
+                task.last_post = created.iloc[0].timestamp()
+            # 超过单独跟踪时长后交给博主列表刷新
+            if task.last_post is not None and now - task.last_post > self.track_video_hours * SECONDS_PER_HOUR:
+                del self._tasks[(VIDEO, task.key)]
+            return
+        
+        if self.cache is not None:
+            self.cache.put_videos(f"{data_mode}:{task.key}:{self.days}", videos)
+        if created is not None and created.notna().any():
+            task.last_post = created.max().timestamp()
+        task.velocity = float(max(velocity.values(), default=0.0))
+        
+        if created is None:
+            return
+        fresh = (now - created.map(lambda value: value.timestamp() if pd.notna(value) else -math.inf)
+                 <= self.track_video_hours * SECONDS_PER_HOUR)
+        for video_id, create_time in zip(df.loc[fresh.to_numpy(), 'video_id'].astype(str), created[fresh]):
+            video = self._tasks.get((VIDEO, video_id))
+            if video is None:
+                video = self._tasks[(VIDEO, video_id)] = RefreshTask(VIDEO, video_id, task.interest, owner=task.key)
+                video.last_post = create_time.timestamp()
+                # 刚随博主列表刷新过，按间隔排期即可
+                video.last_refreshed = now
+            video.velocity = float(velocity.get(video_id, 0.0))
+            self._reschedule(video)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关注列表自动刷新")
+    parser.add_argument('sec_uids', nargs='+', help="要关注的博主 sec_uid")
+    parser.add_argument('--cookie', action='append', default=[], help="抖音Cookie（可重复，每个一份预算）")
+    parser.add_argument('--rate', type=float, default=20, help="每个 Cookie 每分钟的请求数")
+    parser.add_argument('--cache-dir', default=None, help="共享缓存的本地落盘目录")
+    args = parser.parse_args()
+    
+    budgets = [CookieBudget(cookie, args.rate) for cookie in args.cookie] or [CookieBudget(rate_per_minute=args.rate)]
+    scheduler = RefreshScheduler(
+        budgets, SharedCache(store_dir=args.cache_dir),
+        on_refresh=lambda task, data: print(f"🔄 {task.kind}:{task.key} 已刷新（间隔 {scheduler.interval(task) / 60:.0f} 分钟）")
+    )
+    for sec_uid in args.sec_uids:
+        scheduler.watch(sec_uid)
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        print("\n已停止刷新")
+
+
+if __name__ == "__main__":
+    main()
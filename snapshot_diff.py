@@ -0,0 +1,182 @@
+"""
+快照对比模块
+
+功能：
+1. 同一博主两次采集之间的差异：新增视频、消失（删除 / 下架）视频、计数变化
+2. 按 video_id 排序后归并匹配，不做整表 outer join；只有新增 / 删除的行才还原成完整记录
+3. 变化结果为列式（每个指标 旧值 / 新值 / 增量 各一列），可直接写入存储或交给提醒规则
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Union
+
+
+METRICS = ['likes', 'comments', 'shares', 'collects', 'play_count']
+
+Snapshot = Union[pd.DataFrame, List[Dict]]
+
+
+class _Side:
+    """一次快照按 video_id 排序后的列式视图（同一 video_id 重复时以最后一次为准）"""
+    
+    def __init__(self, data: Snapshot, metrics: Sequence[str], fields: Sequence[str]):
+        self.data = data
+        if isinstance(data, pd.DataFrame):
+            ids = data['video_id'].astype(str).to_numpy(dtype=str) if 'video_id' in data.columns else np.empty(0, dtype=str)
+        else:
+            ids = np.array([str(video.get('video_id')) for video in data], dtype=str)
+        
+        # 已按 video_id 升序时跳过排序（重复采集的结果通常顺序一致）
+        if len(ids) > 1 and not (ids[1:] >= ids[:-1]).all():
+            order = np.argsort(ids, kind='stable')
+        else:
+            order = np.arange(len(ids))
+        ordered = ids[order]
+        last = np.r_[ordered[1:] != ordered[:-1], True] if len(ordered) else np.empty(0, dtype=bool)
+        self.rows = order[last]
+        self.ids = ordered[last]
+        
+        self.metrics = {metric: self._numeric(metric) for metric in metrics}
+        self.fields = {field: self._values(field) for field in fields}
+    
+    def _values(self, column: str) -> np.ndarray:
+        if isinstance(self.data, pd.DataFrame):
+            if column not in self.data.columns:
+                return np.full(len(self.rows), None, dtype=object)
+            return self.data[column].to_numpy(dtype=object)[self.rows]
+        values = np.empty(len(self.rows), dtype=object)
+        values[:] = [self.data[row].get(column) for row in self.rows]
+        return values
+    
+    def _numeric(self, column: str) -> np.ndarray:
+        if isinstance(self.data, pd.DataFrame) and column in self.data.columns:
+            return pd.to_numeric(self.data[column], errors='coerce').to_numpy(dtype=np.float64)[self.rows]
+        return pd.to_numeric(pd.Series(self._values(column)), errors='coerce').to_numpy(dtype=np.float64)
+    
+    def frame(self, positions: np.ndarray) -> pd.DataFrame:
+        """还原部分行为完整记录"""
+        rows = self.rows[positions]
+        if isinstance(self.data, pd.DataFrame):
+            return self.data.iloc[rows].reset_index(drop=True)
+        return pd.DataFrame([self.data[row] for row in rows])
+
+
+class SnapshotDiff:
+    """
+    两次快照的差异
+    
+    Attributes:
+        added: 新增视频（新快照中的完整记录）
+        removed: 消失的视频（旧快照中的完整记录）
+        changed: 计数或字段有变化的视频（列式：video_id / {指标}_old / {指标}_new / {指标}_delta / changed_fields）
+        unchanged: 没有变化的视频数
+    """
+    
+    def __init__(self, added: pd.DataFrame, removed: pd.DataFrame, changed: pd.DataFrame,
+                 unchanged: int, metrics: Sequence[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+        self.metrics = list(metrics)
+    
+    def __bool__(self) -> bool:
+        return bool(len(self.added) or len(self.removed) or len(self.changed))
+    
+    def summary(self) -> Dict:
+        """
+        差异概要
+        
+        Returns:
+            {'added', 'removed', 'changed', 'unchanged', '{指标}_delta'（变化视频的增量合计）}
+        """
+        summary = {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'changed': len(self.changed),
+            'unchanged': self.unchanged,
+        }
+        for metric in self.metrics:
+            column = f'{metric}_delta'
+            summary[column] = int(np.nansum(self.changed[column])) if column in self.changed.columns else 0
+        return summary
+    
+    def top(self, n: int = 10, metric: str = 'likes') -> pd.DataFrame:
+        """增量最大的 n 个视频"""
+        column = f'{metric}_delta'
+        if self.changed.empty or column not in self.changed.columns:
+            return self.changed.head(0)
+        return self.changed.nlargest(n, column)
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot, metrics: Optional[Sequence[str]] = None,
+                   fields: Sequence[str] = ('title',)) -> SnapshotDiff:
+    """
+    对比两次采集
+    
+    两侧各按 video_id 排序（已有序时跳过），新快照的每个 ID 在旧快照中二分查找位置，
+    匹配上的行只比较指标与字段数组，不构造合并后的整表。
+    
+    Args:
+        old: 上一次采集（视频列表或DataFrame，需包含 video_id）
+        new: 本次采集
+        metrics: 比较增量的数值列（默认 METRICS 中任一侧存在的列）
+        fields: 只判断是否变化的其他字段（如标题）
+    
+    Returns:
+        SnapshotDiff
+    """
+    if metrics is None:
+        present = set()
+        for data in (old, new):
+            if isinstance(data, pd.DataFrame):
+                present.update(data.columns)
+            elif len(data):
+                present.update(data[0].keys())
+        metrics = [metric for metric in METRICS if metric in present]
+    
+    before = _Side(old, metrics, fields)
+    after = _Side(new, metrics, fields)
+    
+    if len(before.ids):
+        position = np.minimum(np.searchsorted(before.ids, after.ids), len(before.ids) - 1)
+        matched = before.ids[position] == after.ids
+    else:
+        position = np.zeros(len(after.ids), dtype=np.int64)
+        matched = np.zeros(len(after.ids), dtype=bool)
+    kept = np.zeros(len(before.ids), dtype=bool)
+    kept[position[matched]] = True
+    
+    old_rows, new_rows = position[matched], np.flatnonzero(matched)
+    changed = np.zeros(len(new_rows), dtype=bool)
+    columns = {'video_id': after.ids[new_rows]}
+    for metric in metrics:
+        previous, current = before.metrics[metric][old_rows], after.metrics[metric][new_rows]
+        # 两侧都缺失视为未变化
+        changed |= (previous != current) & ~(np.isnan(previous) & np.isnan(current))
+        columns[f'{metric}_old'] = previous
+        columns[f'{metric}_new'] = current
+        columns[f'{metric}_delta'] = current - previous
+    
+    changed_fields = np.zeros(len(new_rows), dtype=object)
+    changed_fields[:] = ''
+    for field in fields:
+        previous, current = before.fields[field][old_rows], after.fields[field][new_rows]
+        # 与指标一致：两侧都缺失视为未变化；只在两侧都有值时比较（pd.NA 不能直接参与 !=）
+        missing_before, missing_after = pd.isna(previous), pd.isna(current)
+        differs = missing_before != missing_after
+        present = ~missing_before & ~missing_after
+        differs[present] = np.asarray(previous[present] != current[present], dtype=bool)
+        changed |= differs
+        changed_fields[differs] = np.where(changed_fields[differs] == '', field, changed_fields[differs] + ',' + field)
+    columns['changed_fields'] = changed_fields
+    
+    changes = pd.DataFrame({name: values[changed] for name, values in columns.items()})
+    return SnapshotDiff(
+        added=after.frame(np.flatnonzero(~matched)),
+        removed=before.frame(np.flatnonzero(~kept)),
+        changed=changes,
+        unchanged=int((~changed).sum()),
+        metrics=metrics,
+    )
@@ -0,0 +1,336 @@
+"""
+流式统计模块
+
+功能：
+1. Welford 在线均值/方差
+2. 精确求和与极值
+3. KLL 分位数草图（中位数）
+4. 多批次、多进程结果合并
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Iterable, Union
+
+
+Batch = Union[pd.DataFrame, List[Dict], Dict[str, Iterable]]
+
+
+def batch_column(batch: Batch, name: str) -> np.ndarray:
+    """
+    从任意批次中取出数值列（与 process_videos 的清洗规则一致）
+    
+    Args:
+        batch: DataFrame / 记录列表 / 列字典
+        name: 列名
+        
+    Returns:
+        int64 数组，缺失或非法值记为0
+    """
+    if isinstance(batch, pd.DataFrame):
+        if name not in batch.columns:
+            return np.zeros(len(batch), dtype=np.int64)
+        values = batch[name]
+    elif isinstance(batch, dict):
+        if name not in batch:
+            lengths = [len(v) for v in batch.values()]
+            return np.zeros(lengths[0] if lengths else 0, dtype=np.int64)
+        values = batch[name]
+    else:
+        values = [record.get(name, 0) for record in batch]
+    
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'iub':
+        return arr.astype(np.int64, copy=False)
+    
+    return pd.to_numeric(pd.Series(arr), errors='coerce').fillna(0).astype(np.int64).to_numpy()
+
+
+def batch_length(batch: Batch) -> int:
+    """批次行数"""
+    if isinstance(batch, dict):
+        lengths = [len(v) for v in batch.values()]
+        return lengths[0] if lengths else 0
+    return len(batch)
+
+
+class RunningMoments:
+    """Welford 在线均值/方差累加器（批量更新使用 Chan 合并公式）"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def update(self, values: np.ndarray) -> 'RunningMoments':
+        """
+        合并一批数值
+        
+        Args:
+            values: 数值数组
+            
+        Returns:
+            self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+        
+        batch = RunningMoments()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        
+        return self.merge(batch)
+    
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """合并另一个累加器"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+        
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        
+        return self
+    
+    @property
+    def variance(self) -> float:
+        """样本方差（ddof=1，与 pandas 一致）"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std(self) -> float:
+        """样本标准差"""
+        return math.sqrt(self.variance)
+
+
+class KLLSketch:
+    """
+    KLL 分位数草图
+    
+    内存占用约为 O(k)，可合并；k=200 时中位数的秩误差约1%。
+    """
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+    
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+    
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                
+                items = np.sort(items)
+                # 奇数个时留下一个在本层，其余两两取一提升到上一层
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                offset = int(self._rng.integers(2))
+                
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+                self.levels[level] = keep
+                # 层数变化后各层容量随之变化，从头检查
+                level = 0
+                continue
+            level += 1
+    
+    def update(self, values: np.ndarray) -> 'KLLSketch':
+        """
+        插入一批数值
+        
+        Args:
+            values: 数值数组
+            
+        Returns:
+            self
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        
+        self.count += int(values.size)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        
+        return self
+    
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """合并另一个草图"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        
+        self.count += other.count
+        self._compress()
+        
+        return self
+    
+    def quantile(self, q: float) -> float:
+        """
+        估计分位数
+        
+        Args:
+            q: 分位点（0~1）
+            
+        Returns:
+            分位数估计值，空草图返回0
+        """
+        if self.count == 0:
+            return 0.0
+        
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(items_at), 2 ** level, dtype=np.float64)
+            for level, items_at in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        
+        cumulative = np.cumsum(weights)
+        position = min(max(q, 0.0), 1.0) * (cumulative[-1] - 1)
+        index = int(np.searchsorted(cumulative, position, side='right'))
+        
+        return float(items[min(index, len(items) - 1)])
+    
+    def median(self) -> float:
+        """估计中位数"""
+        return self.quantile(0.5)
+
+
+class StreamingStatistics:
+    """
+    可合并的流式统计累加器
+    
+    逐批消费视频记录，结果与 DataProcessor.get_statistics 的字段一致，
+    但内存占用与数据总量无关；各工作进程的累加器可通过 merge 汇总。
+    """
+    
+    METRICS = ('likes', 'comments', 'shares')
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.total_videos = 0
+        self.sums = {metric: 0 for metric in self.METRICS}
+        self.likes_moments = RunningMoments()
+        self.likes_sketch = KLLSketch(k=k, seed=seed)
+        self.max_likes: Optional[int] = None
+        self.min_likes: Optional[int] = None
+    
+    def update(self, batch: Batch) -> 'StreamingStatistics':
+        """
+        消费一批视频记录
+        
+        Args:
+            batch: DataFrame / 记录列表 / 列字典
+            
+        Returns:
+            self
+        """
+        rows = batch_length(batch)
+        if rows == 0:
+            return self
+        
+        self.total_videos += rows
+        for metric in self.METRICS:
+            # 逐批求和后转为 Python int，总和不会溢出
+            self.sums[metric] += int(batch_column(batch, metric).sum())
+        
+        likes = batch_column(batch, 'likes')
+        self.likes_moments.update(likes)
+        self.likes_sketch.update(likes)
+        
+        batch_max, batch_min = int(likes.max()), int(likes.min())
+        self.max_likes = batch_max if self.max_likes is None else max(self.max_likes, batch_max)
+        self.min_likes = batch_min if self.min_likes is None else min(self.min_likes, batch_min)
+        
+        return self
+    
+    def consume(self, batches: Iterable[Batch]) -> 'StreamingStatistics':
+        """依次消费多个批次"""
+        for batch in batches:
+            self.update(batch)
+        return self
+    
+    def merge(self, other: 'StreamingStatistics') -> 'StreamingStatistics':
+        """合并另一个累加器（例如来自其他工作进程）"""
+        self.total_videos += other.total_videos
+        for metric in self.METRICS:
+            self.sums[metric] += other.sums[metric]
+        
+        self.likes_moments.merge(other.likes_moments)
+        self.likes_sketch.merge(other.likes_sketch)
+        
+        if other.max_likes is not None:
+            self.max_likes = other.max_likes if self.max_likes is None else max(self.max_likes, other.max_likes)
+        if other.min_likes is not None:
+            self.min_likes = other.min_likes if self.min_likes is None else min(self.min_likes, other.min_likes)
+        
+        return self
+    
+    def result(self) -> Dict:
+        """
+        生成统计字典
+        
+        Returns:
+            与 get_statistics 相同字段的统计字典
+        """
+        n = self.total_videos
+        if n == 0:
+            return {
+                'total_videos': 0,
+                'total_likes': 0,
+                'total_comments': 0,
+                'total_shares': 0,
+                'avg_likes': 0,
+                'avg_comments': 0,
+                'avg_shares': 0,
+                'max_likes': 0,
+                'min_likes': 0,
+                'median_likes': 0,
+                'std_likes': 0
+            }
+        
+        return {
+            'total_videos': n,
+            'total_likes': self.sums['likes'],
+            'total_comments': self.sums['comments'],
+            'total_shares': self.sums['shares'],
+            'avg_likes': int(self.sums['likes'] / n),
+            'avg_comments': int(self.sums['comments'] / n),
+            'avg_shares': int(self.sums['shares'] / n),
+            'max_likes': self.max_likes,
+            'min_likes': self.min_likes,
+            'median_likes': int(self.likes_sketch.median()),
+            'std_likes': int(self.likes_moments.std) if n > 1 else 0
+        }
+
+
+def merge_statistics(parts: Iterable[StreamingStatistics]) -> StreamingStatistics:
+    """
+    合并多个流式统计累加器
+    
+    Args:
+        parts: 累加器列表
+        
+    Returns:
+        合并后的新累加器
+    """
+    merged = StreamingStatistics()
+    for part in parts:
+        merged.merge(part)
+    return merged
@@ -0,0 +1,184 @@
+"""
+合成数据生成模块
+
+功能：
+1. 固定随机种子、可复现的博主与视频数据
+2. 重尾分布的点赞/评论/分享，带作息规律的发布时间，Zipf 分布的话题标签
+3. 以列式批次输出，可生成百万级数据用于压测
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import List, Dict, Iterator, Optional
+
+
+# 各小时的相对发布热度（午间和晚间高峰）
+HOUR_WEIGHTS = np.array([
+    2, 1, 0.5, 0.3, 0.3, 0.5, 1, 2, 3, 3, 3, 4,
+    6, 5, 3, 3, 4, 5, 8, 10, 10, 9, 7, 4
+], dtype=np.float64)
+
+# 星期一~星期日的相对发布热度
+WEEKDAY_WEIGHTS = np.array([0.9, 0.9, 0.95, 1.0, 1.1, 1.3, 1.25])
+
+TITLE_PREFIXES = np.array(['【干货】', '【教程】', '【测评】', '【开箱】', '【日常】', '姐妹们！', '盘点', '关于'])
+TITLE_TOPICS = np.array(['生活', '工作', '学习', '恋爱', '美食', '旅行', '穿搭', '数码', '健身', '宠物'])
+TITLE_SUFFIXES = np.array(['的那些事', '合集', 'TOP10', '小技巧', '攻略', '一定要看！', '，我想说几句', '必看'])
+
+
+class SyntheticDataGenerator:
+    """
+    可复现的合成数据生成器
+    
+    相同的 seed 和 batch_size 总是生成完全相同的数据；
+    每个批次使用独立的随机流，批次之间可以并行生成。
+    """
+    
+    def __init__(self, seed: int = 0, start: Optional[datetime] = None, days: int = 365,
+                 tag_vocabulary: int = 100000):
+        self.seed = seed
+        self.start = np.datetime64(start or datetime(2024, 1, 1), 's')
+        self.days = days
+        self.tag_vocabulary = tag_vocabulary
+    
+    def _rng(self, *stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, *stream])
+    
+    def bloggers(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        生成博主
+        
+        Args:
+            n: 博主数量
+            
+        Returns:
+            列字典（sec_uid / nickname / follower_count / popularity 等）
+        """
+        rng = self._rng(0)
+        ids = np.arange(n)
+        
+        # 博主人气呈对数正态分布：少数头部博主，大量长尾博主
+        popularity = rng.lognormal(mean=0.0, sigma=1.5, size=n)
+        follower_count = np.round(popularity * 50000 * rng.lognormal(0.0, 0.3, size=n)).astype(np.int64)
+        
+        return {
+            'sec_uid': np.char.add('MS4wLjABsyn', ids.astype(str)),
+            'nickname': np.char.add('博主', ids.astype(str)),
+            'unique_id': np.char.add('syn', ids.astype(str)),
+            'follower_count': follower_count,
+            'following_count': rng.integers(10, 2000, size=n),
+            'video_count': np.maximum(1, (popularity * 100).astype(np.int64)),
+            'verified': rng.random(n) < np.clip(popularity / 10, 0.02, 0.9),
+            'popularity': popularity,
+        }
+    
+    def _video_batch(self, index: int, offset: int, size: int, bloggers: Dict[str, np.ndarray],
+                     blogger_weights: np.ndarray) -> Dict[str, np.ndarray]:
+        rng = self._rng(1, index)
+        
+        owner = rng.choice(len(blogger_weights), size=size, p=blogger_weights)
+        
+        # 互动数据：博主人气 × 单条视频的帕累托爆款系数
+        virality = rng.pareto(1.5, size=size) + 0.05
+        likes = np.round(bloggers['popularity'][owner] * virality * 2000).astype(np.int64)
+        comments = rng.binomial(likes, rng.beta(2, 80, size=size))
+        shares = rng.binomial(likes, rng.beta(1.5, 120, size=size))
+        collects = rng.binomial(likes, rng.beta(2, 60, size=size))
+        play_count = np.round((likes + 1) / rng.beta(2, 40, size=size)).astype(np.int64)
+        duration = np.clip(rng.lognormal(np.log(30), 0.7, size=size), 5, 600).astype(np.int64)
+        
+        # 发布时间：日期先按星期权重接受-拒绝，小时按作息分布
+        day = rng.integers(0, self.days, size=size)
+        weekday = (day + (self.start.astype('datetime64[D]').view(np.int64) + 3)) % 7
+        accept = rng.random(size) < WEEKDAY_WEIGHTS[weekday] / WEEKDAY_WEIGHTS.max()
+        day = np.where(accept, day, rng.integers(0, self.days, size=size))
+        hour = rng.choice(24, size=size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, size=size)
+        create_time = self.start + seconds.astype('timedelta64[s]')
+        
+        video_ids = (7200000000000000000 + offset + np.arange(size)).astype(str)
+        
+        # 标题：前缀 + 主题 + 后缀的组合
+        title = np.char.add(np.char.add(
+            TITLE_PREFIXES[rng.integers(0, len(TITLE_PREFIXES), size=size)],
+            TITLE_TOPICS[rng.integers(0, len(TITLE_TOPICS), size=size)]),
+            TITLE_SUFFIXES[rng.integers(0, len(TITLE_SUFFIXES), size=size)])
+        
+        # 话题：每条 1~5 个，编号服从 Zipf 分布（少数热门话题 + 长尾）
+        tag_counts = rng.integers(1, 6, size=size)
+        tag_ids = np.minimum(rng.zipf(1.3, size=int(tag_counts.sum())), self.tag_vocabulary)
+        tag_names = np.char.add('话题', tag_ids.astype(str)).tolist()
+        ends = np.cumsum(tag_counts).tolist()
+        tags = np.empty(size, dtype=object)
+        tags[:] = [tag_names[end - count:end] for end, count in zip(ends, tag_counts.tolist())]
+        
+        return {
+            'video_id': video_ids,
+            'sec_uid': bloggers['sec_uid'][owner],
+            'title': title,
+            'desc': title,
+            'likes': likes,
+            'comments': comments.astype(np.int64),
+            'shares': shares.astype(np.int64),
+            'collects': collects.astype(np.int64),
+            'play_count': play_count,
+            'duration': duration,
+            'create_time': create_time,
+            'video_url': np.char.add('https://www.douyin.com/video/', video_ids),
+            'tags': tags,
+        }
+    
+    def video_batches(self, n_videos: int, n_bloggers: int = 1000,
+                      batch_size: int = 1000000) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        分批生成视频
+        
+        Args:
+            n_videos: 视频总数
+            n_bloggers: 博主数量
+            batch_size: 每批数量
+            
+        Returns:
+            列字典迭代器，每批字段与采集到的视频字段一致（外加 sec_uid）
+        """
+        bloggers = self.bloggers(n_bloggers)
+        # 人气越高的博主发布越多
+        weights = np.sqrt(bloggers['popularity'])
+        weights = weights / weights.sum()
+        
+        for index, offset in enumerate(range(0, n_videos, batch_size)):
+            size = min(batch_size, n_videos - offset)
+            yield self._video_batch(index, offset, size, bloggers, weights)
+    
+    def video_frame(self, n_videos: int, n_bloggers: int = 1000, batch_size: int = 1000000) -> pd.DataFrame:
+        """
+        生成视频DataFrame（原始字段，可直接交给 DataProcessor）
+        
+        Args:
+            n_videos: 视频总数
+            n_bloggers: 博主数量
+            batch_size: 每批数量
+            
+        Returns:
+            视频DataFrame
+        """
+        frames = [pd.DataFrame(batch) for batch in self.video_batches(n_videos, n_bloggers, batch_size)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def video_records(self, n_videos: int, n_bloggers: int = 10) -> List[Dict]:
+        """
+        生成视频记录列表（与 DouyinCrawler.get_blogger_videos 的格式一致）
+        
+        Args:
+            n_videos: 视频总数
+            n_bloggers: 博主数量
+            
+        Returns:
+            视频字典列表
+        """
+        df = self.video_frame(n_videos, n_bloggers)
+        if df.empty:
+            return []
+        df['create_time'] = df['create_time'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return df.to_dict('records')
@@ -0,0 +1,417 @@
+"""
+话题趋势模块
+
+功能：
+1. 稀疏的 话题 × 话题 共现矩阵（COO 键值 + 计数，不构造稠密矩阵）
+2. 每个话题每天的视频数，识别上升最快的话题
+3. 话题互动提升度（话题视频平均互动 / 全体平均互动）
+4. 按批次增量更新，分片结果可合并
+"""
+
+import numpy as np
+import pandas as pd
+from itertools import chain
+from typing import List, Dict, Optional, Iterable
+
+
+# 共现键 = 话题A << 32 | 话题B；日计数键 = 话题 << 32 | 日期（距 1970-01-01 的天数）
+KEY_SHIFT = 32
+KEY_MASK = (1 << KEY_SHIFT) - 1
+NS_PER_DAY = 86400 * 10 ** 9
+MEASURES = ['likes', 'comments', 'shares']
+
+
+def _grow(values: np.ndarray, size: int) -> np.ndarray:
+    """按需扩容（容量翻倍），新位置补 0"""
+    if len(values) >= size:
+        return values
+    grown = np.zeros((max(size, 2 * len(values)),) + values.shape[1:], dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+def _accumulate(keys: np.ndarray, counts: np.ndarray, pending: List[np.ndarray]):
+    """把待合并的键并入有序键值表，相同键的计数相加"""
+    if not pending:
+        return keys, counts
+    all_keys = np.concatenate([keys] + [part for part, _ in pending])
+    all_counts = np.concatenate([counts] + [part for _, part in pending])
+    unique_keys, inverse = np.unique(all_keys, return_inverse=True)
+    return unique_keys, np.bincount(inverse, weights=all_counts, minlength=len(unique_keys)).astype(np.int64)
+
+
+class TagTrendEngine:
+    """
+    增量话题趋势引擎
+    
+    话题名映射为连续编号；共现以有序的 (键, 计数) 数组保存，两个方向各存一份，
+    查询某个话题的共现话题只需一次二分查找。新批次先暂存，查询前统一合并。
+    同一视频再次导入时只把互动数据的差值计入，不重复计数共现和日计数。
+    """
+    
+    def __init__(self, max_tags: int = 30, flush_pairs: int = 5000000):
+        self.max_tags = max_tags
+        self.flush_pairs = flush_pairs
+        
+        self.vocab: Dict[str, int] = {}
+        self.tags: List[str] = []
+        
+        self._pair_keys = np.empty(0, dtype=np.int64)
+        self._pair_counts = np.empty(0, dtype=np.int64)
+        self._daily_keys = np.empty(0, dtype=np.int64)
+        self._daily_counts = np.empty(0, dtype=np.int64)
+        self._pending_pairs: List = []
+        self._pending_daily: List = []
+        self._pending_size = 0
+        
+        # 每个话题的视频数和互动总和
+        self._tag_videos = np.zeros(0, dtype=np.int64)
+        self._tag_sums = np.zeros((0, len(MEASURES)), dtype=np.int64)
+        
+        # 每个视频最近一次计入的互动数据（用于快照差分）
+        self._video_index: Dict[str, int] = {}
+        self._video_values = np.zeros((0, len(MEASURES)), dtype=np.int64)
+        self.total_videos = 0
+        self._total_sums = np.zeros(len(MEASURES), dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.tags)
+    
+    def _tag_ids(self, names: List[str]) -> np.ndarray:
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for position, name in enumerate(uniques):
+            tag_id = self.vocab.get(name)
+            if tag_id is None:
+                tag_id = self.vocab[name] = len(self.tags)
+                self.tags.append(name)
+            ids[position] = tag_id
+        
+        self._tag_videos = _grow(self._tag_videos, len(self.tags))
+        self._tag_sums = _grow(self._tag_sums, len(self.tags))
+        return ids[codes]
+    
+    def _tag_matrix(self, lists: pd.Series):
+        """
+        把每个视频的话题列表展开为 (视频行, 话题编号) 矩阵组
+        
+        相同长度的视频放在一个矩阵里，行内排序并去重（重复位置置为 -1）。
+        """
+        lists = lists.map(lambda tags: list(dict.fromkeys(tags))[:self.max_tags]
+                          if isinstance(tags, (list, tuple, np.ndarray)) else [])
+        lengths = lists.map(len).to_numpy(dtype=np.int64)
+        flat = list(chain.from_iterable(lists))
+        if not flat:
+            return []
+        
+        ids = self._tag_ids([str(tag) for tag in flat])
+        offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+        
+        groups = []
+        for length in np.unique(lengths[lengths > 0]):
+            rows = np.flatnonzero(lengths == length)
+            matrix = np.sort(ids[offsets[rows, None] + np.arange(length)], axis=1)
+            # 不同名称可能映射到同一编号（例如数字与字符串），去重
+            matrix[:, 1:][matrix[:, 1:] == matrix[:, :-1]] = -1
+            groups.append((rows, matrix))
+        return groups
+    
+    def _register(self, video_ids: np.ndarray, values: np.ndarray):
+        """登记视频，返回 是否新视频 与 互动差值"""
+        is_new = np.ones(len(video_ids), dtype=bool)
+        delta = values.copy()
+        positions = np.empty(len(video_ids), dtype=np.int64)
+        
+        for row, video_id in enumerate(video_ids):
+            position = self._video_index.get(video_id)
+            if position is None:
+                position = self._video_index[video_id] = len(self._video_index)
+            else:
+                is_new[row] = False
+            positions[row] = position
+        
+        self._video_values = _grow(self._video_values, len(self._video_index))
+        delta[~is_new] -= self._video_values[positions[~is_new]]
+        self._video_values[positions] = values
+        return is_new, delta
+    
+    def update(self, df: pd.DataFrame) -> 'TagTrendEngine':
+        """
+        导入一批视频或快照
+        
+        Args:
+            df: 视频数据DataFrame（需包含 tags；video_id / create_time / likes 等可选）
+        
+        Returns:
+            self
+        """
+        if df.empty or 'tags' not in df.columns:
+            return self
+        
+        if 'video_id' in df.columns:
+            # 同一批次里重复出现的视频以最后一次为准
+            df = df[~df['video_id'].astype(str).duplicated(keep='last')]
+        
+        values = np.column_stack([
+            pd.to_numeric(df[measure], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+            if measure in df.columns else np.zeros(len(df), dtype=np.int64)
+            for measure in MEASURES
+        ])
+        
+        if 'video_id' in df.columns:
+            is_new, delta = self._register(df['video_id'].astype(str).to_numpy(), values)
+        else:
+            is_new, delta = np.ones(len(df), dtype=bool), values
+        
+        if 'create_time' in df.columns:
+            create_time = pd.to_datetime(df['create_time'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+            days = np.where(np.isnat(create_time), -1, create_time.view(np.int64) // NS_PER_DAY)
+        else:
+            days = np.full(len(df), -1, dtype=np.int64)
+        
+        self.total_videos += int(is_new.sum())
+        self._total_sums += delta.sum(axis=0)
+        
+        for rows, matrix in self._tag_matrix(df['tags']):
+            valid = matrix >= 0
+            tag_ids = matrix[valid]
+            video_rows = np.broadcast_to(rows[:, None], matrix.shape)[valid]
+            new = is_new[video_rows]
+            
+            self._tag_videos += np.bincount(tag_ids[new], minlength=len(self._tag_videos))
+            for column in range(len(MEASURES)):
+                self._tag_sums[:, column] += np.bincount(
+                    tag_ids, weights=delta[video_rows, column], minlength=len(self._tag_sums)
+                ).astype(np.int64)
+            
+            dated = new & (days[video_rows] >= 0)
+            if dated.any():
+                self._pending_daily.append(((tag_ids[dated] << KEY_SHIFT) | days[video_rows[dated]],
+                                            np.ones(int(dated.sum()), dtype=np.int64)))
+            
+            # 行内已排序，上三角位置即所有 A < B 的话题对
+            first, second = np.triu_indices(matrix.shape[1], 1)
+            fresh = matrix[is_new[rows]]
+            a, b = fresh[:, first].ravel(), fresh[:, second].ravel()
+            keep = (a >= 0) & (b >= 0)
+            a, b = a[keep], b[keep]
+            if len(a):
+                keys = np.concatenate([(a << KEY_SHIFT) | b, (b << KEY_SHIFT) | a])
+                self._pending_pairs.append((keys, np.ones(len(keys), dtype=np.int64)))
+                self._pending_size += len(keys)
+        
+        if self._pending_size >= self.flush_pairs:
+            self._flush()
+        
+        return self
+    
+    def consume(self, batches: Iterable[pd.DataFrame]) -> 'TagTrendEngine':
+        """依次导入多个批次"""
+        for batch in batches:
+            self.update(batch)
+        return self
+    
+    def _flush(self):
+        self._pair_keys, self._pair_counts = _accumulate(self._pair_keys, self._pair_counts, self._pending_pairs)
+        self._daily_keys, self._daily_counts = _accumulate(self._daily_keys, self._daily_counts, self._pending_daily)
+        self._pending_pairs, self._pending_daily = [], []
+        self._pending_size = 0
+    
+    def merge(self, other: 'TagTrendEngine') -> 'TagTrendEngine':
+        """
+        合并另一个引擎（不同分片的视频集合应互不重叠）
+        
+        Args:
+            other: 另一个引擎
+        
+        Returns:
+            self
+        """
+        other._flush()
+        remap = self._tag_ids(other.tags) if other.tags else np.empty(0, dtype=np.int64)
+        
+        def translate(keys: np.ndarray, high_only: bool) -> np.ndarray:
+            high = remap[keys >> KEY_SHIFT]
+            low = keys & KEY_MASK if high_only else remap[keys & KEY_MASK]
+            return (high << KEY_SHIFT) | low
+        
+        self._pending_pairs.append((translate(other._pair_keys, False), other._pair_counts))
+        self._pending_daily.append((translate(other._daily_keys, True), other._daily_counts))
+        self._flush()
+        
+        self._tag_videos[remap] += other._tag_videos[:len(remap)]
+        self._tag_sums[remap] += other._tag_sums[:len(remap)]
+        self.total_videos += other.total_videos
+        self._total_sums += other._total_sums
+        
+        for video_id, position in other._video_index.items():
+            if video_id not in self._video_index:
+                self._video_index[video_id] = len(self._video_index)
+                self._video_values = _grow(self._video_values, len(self._video_index))
+                self._video_values[self._video_index[video_id]] = other._video_values[position]
+        
+        return self
+    
+    def tag_videos(self, tag: str) -> int:
+        """话题下的视频数"""
+        tag_id = self.vocab.get(tag)
+        return int(self._tag_videos[tag_id]) if tag_id is not None else 0
+    
+    def related(self, tag: str, n: int = 10) -> pd.DataFrame:
+        """
+        与指定话题共现最多的话题
+        
+        Args:
+            tag: 话题名
+            n: 返回数量
+        
+        Returns:
+            DataFrame（话题 / 共现视频数 / 提升度）
+            提升度 = 共现视频数 × 总视频数 / (两个话题各自的视频数之积)，大于 1 表示比随机更常一起出现
+        """
+        columns = ['话题', '共现视频数', '提升度']
+        tag_id = self.vocab.get(tag)
+        if tag_id is None:
+            return pd.DataFrame(columns=columns)
+        
+        self._flush()
+        lo, hi = np.searchsorted(self._pair_keys, [tag_id << KEY_SHIFT, (tag_id + 1) << KEY_SHIFT])
+        partners = self._pair_keys[lo:hi] & KEY_MASK
+        counts = self._pair_counts[lo:hi]
+        
+        top = np.lexsort((partners, -counts))[:n]
+        partners, counts = partners[top], counts[top]
+        expected = self._tag_videos[tag_id] * self._tag_videos[partners] / max(self.total_videos, 1)
+        
+        return pd.DataFrame({
+            '话题': [self.tags[partner] for partner in partners],
+            '共现视频数': counts,
+            '提升度': np.round(counts / np.maximum(expected, 1e-12), 2),
+        }, columns=columns)
+    
+    def top_pairs(self, n: int = 20) -> pd.DataFrame:
+        """
+        共现最多的话题对
+        
+        Args:
+            n: 返回数量
+        
+        Returns:
+            DataFrame（话题A / 话题B / 共现视频数）
+        """
+        self._flush()
+        a, b = self._pair_keys >> KEY_SHIFT, self._pair_keys & KEY_MASK
+        half = np.flatnonzero(a < b)
+        top = half[np.lexsort((half, -self._pair_counts[half]))[:n]]
+        
+        return pd.DataFrame({
+            '话题A': [self.tags[tag_id] for tag_id in a[top]],
+            '话题B': [self.tags[tag_id] for tag_id in b[top]],
+            '共现视频数': self._pair_counts[top],
+        })
+    
+    def daily(self, tag: str) -> pd.DataFrame:
+        """
+        话题每天的视频数
+        
+        Args:
+            tag: 话题名
+        
+        Returns:
+            DataFrame（日期 / 视频数量）
+        """
+        tag_id = self.vocab.get(tag)
+        if tag_id is None:
+            return pd.DataFrame(columns=['日期', '视频数量'])
+        
+        self._flush()
+        lo, hi = np.searchsorted(self._daily_keys, [tag_id << KEY_SHIFT, (tag_id + 1) << KEY_SHIFT])
+        return pd.DataFrame({
+            '日期': pd.to_datetime(self._daily_keys[lo:hi] & KEY_MASK, unit='D').date,
+            '视频数量': self._daily_counts[lo:hi],
+        })
+    
+    def rising(self, window: int = 7, end=None, min_videos: int = 5, n: int = 20) -> pd.DataFrame:
+        """
+        上升最快的话题
+        
+        比较最近 window 天与之前 window 天的视频数。
+        
+        Args:
+            window: 窗口天数
+            end: 窗口结束日期（含），默认为数据中最新的发布日期
+            min_videos: 最近窗口内至少的视频数
+            n: 返回数量
+        
+        Returns:
+            DataFrame（话题 / 近期视频数 / 前期视频数 / 增长率，按增长倍数降序）
+        """
+        columns = ['话题', '近期视频数', '前期视频数', '增长率']
+        self._flush()
+        if len(self._daily_keys) == 0:
+            return pd.DataFrame(columns=columns)
+        
+        tag_ids = self._daily_keys >> KEY_SHIFT
+        days = self._daily_keys & KEY_MASK
+        last = days.max() if end is None else pd.Timestamp(end).value // NS_PER_DAY
+        
+        recent_mask = (days > last - window) & (days <= last)
+        previous_mask = (days > last - 2 * window) & (days <= last - window)
+        recent = np.bincount(tag_ids[recent_mask], weights=self._daily_counts[recent_mask], minlength=len(self.tags))
+        previous = np.bincount(tag_ids[previous_mask], weights=self._daily_counts[previous_mask], minlength=len(self.tags))
+        
+        candidates = np.flatnonzero(recent >= min_videos)
+        # 加一平滑：前期为 0 的新话题不会得到无穷大的增长倍数
+        score = (recent[candidates] + 1) / (previous[candidates] + 1)
+        top = candidates[np.lexsort((candidates, -score))[:n]]
+        
+        return pd.DataFrame({
+            '话题': [self.tags[tag_id] for tag_id in top],
+            '近期视频数': recent[top].astype(np.int64),
+            '前期视频数': previous[top].astype(np.int64),
+            '增长率': np.round(np.where(previous[top] > 0,
+                                        (recent[top] - previous[top]) / np.maximum(previous[top], 1) * 100,
+                                        np.nan), 2),
+        }, columns=columns)
+    
+    def engagement_lift(self, min_videos: int = 10, n: int = 20, metric: str = 'interactions') -> pd.DataFrame:
+        """
+        话题互动提升度
+        
+        Args:
+            min_videos: 话题至少的视频数
+            n: 返回数量
+            metric: likes / comments / shares / interactions（三者之和）
+        
+        Returns:
+            DataFrame（话题 / 视频数量 / 平均点赞 / 平均互动 / 提升度，按提升度降序）
+        """
+        columns = ['话题', '视频数量', '平均点赞', '平均互动', '提升度']
+        if self.total_videos == 0:
+            return pd.DataFrame(columns=columns)
+        
+        if metric == 'interactions':
+            tag_values, total_value = self._tag_sums.sum(axis=1), self._total_sums.sum()
+        else:
+            column = MEASURES.index(metric)
+            tag_values, total_value = self._tag_sums[:, column], self._total_sums[column]
+        
+        videos = self._tag_videos[:len(self.tags)]
+        tag_values = tag_values[:len(self.tags)]
+        candidates = np.flatnonzero(videos >= min_videos)
+        baseline = total_value / self.total_videos
+        lift = tag_values[candidates] / videos[candidates] / baseline if baseline > 0 else np.zeros(len(candidates))
+        top = candidates[np.lexsort((candidates, -lift))[:n]]
+        
+        return pd.DataFrame({
+            '话题': [self.tags[tag_id] for tag_id in top],
+            '视频数量': videos[top],
+            '平均点赞': (self._tag_sums[top, 0] / videos[top]).astype(np.int64),
+            '平均互动': (self._tag_sums[top].sum(axis=1) / videos[top]).astype(np.int64),
+            '提升度': np.round(tag_values[top] / videos[top] / baseline, 2) if baseline > 0 else 0.0,
+        }, columns=columns)
+    
+    @property
+    def nbytes(self) -> int:
+        """共现矩阵与日计数占用的内存"""
+        return self._pair_keys.nbytes + self._pair_counts.nbytes + self._daily_keys.nbytes + self._daily_counts.nbytes
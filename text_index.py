@@ -0,0 +1,284 @@
+"""
+全文索引模块
+
+功能：
+1. 对 title / desc / tags 建立字符 n-gram 倒排索引（中文无需分词）
+2. 按批次增量写入，每批一个只读段，可随时合并
+3. 关键词查询返回行号（对应视频存储中的位置），支持按发布时间过滤
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+
+# 码位最大 0x10FFFF（21 位），二元组编码为 (c1 << 21) | c2，一定大于任何单字编码
+CODE_BITS = 21
+# int64 能容纳的最长元组（3 × 21 = 63 位）
+MAX_GRAM = 63 // CODE_BITS
+SEPARATOR = '\n'
+NAT = np.iinfo(np.int64).min
+
+
+def _gram_codes(texts: np.ndarray, n: int) -> List[np.ndarray]:
+    """
+    把定长 unicode 数组转为每个位置的 1..n 元组编码
+    
+    Returns:
+        [一元组编码矩阵, 二元组编码矩阵, ...]，无效位置为 -1
+    """
+    width = texts.dtype.itemsize // 4
+    chars = texts.view(np.uint32).reshape(len(texts), width).astype(np.int64)
+    invalid = (chars == 0) | (chars == ord(SEPARATOR))
+    
+    grams = [np.where(invalid, -1, chars)]
+    for size in range(2, n + 1):
+        if width < size:
+            break
+        code = chars[:, :width - size + 1].copy()
+        bad = invalid[:, :width - size + 1].copy()
+        for offset in range(1, size):
+            code = (code << CODE_BITS) | chars[:, offset:width - size + 1 + offset]
+            bad |= invalid[:, offset:width - size + 1 + offset]
+        grams.append(np.where(bad, -1, code))
+    return grams
+
+
+def _encode_query(keyword: str, n: int) -> np.ndarray:
+    """关键词的 n 元组编码（不足 n 个字时用更短的元组）"""
+    size = min(n, len(keyword))
+    codes = []
+    for start in range(len(keyword) - size + 1):
+        code = 0
+        for char in keyword[start:start + size]:
+            code = (code << CODE_BITS) | ord(char)
+        codes.append(code)
+    return np.unique(np.array(codes, dtype=np.int64))
+
+
+class IndexSegment:
+    """
+    只读索引段（CSR 结构）
+    
+    grams 为升序的元组编码，rows[offsets[i]:offsets[i+1]] 为包含第 i 个元组的行号。
+    """
+    
+    def __init__(self, grams: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        self.grams = grams
+        self.offsets = offsets
+        self.rows = rows
+    
+    @classmethod
+    def build(cls, gram_codes: np.ndarray, row_ids: np.ndarray) -> 'IndexSegment':
+        """由 (元组, 行号) 对构建，重复对只保留一次"""
+        order = np.lexsort((row_ids, gram_codes))
+        gram_codes, row_ids = gram_codes[order], row_ids[order]
+        keep = np.r_[True, (gram_codes[1:] != gram_codes[:-1]) | (row_ids[1:] != row_ids[:-1])]
+        gram_codes, row_ids = gram_codes[keep], row_ids[keep]
+        
+        starts = np.flatnonzero(np.r_[True, gram_codes[1:] != gram_codes[:-1]])
+        offsets = np.r_[starts, len(gram_codes)].astype(np.int64)
+        return cls(gram_codes[starts], offsets, row_ids)
+    
+    def postings(self, code: int) -> np.ndarray:
+        position = int(np.searchsorted(self.grams, code))
+        if position == len(self.grams) or self.grams[position] != code:
+            return self.rows[:0]
+        return self.rows[self.offsets[position]:self.offsets[position + 1]]
+    
+    def pairs(self):
+        """展开为 (元组, 行号) 对，用于段合并"""
+        counts = np.diff(self.offsets)
+        return np.repeat(self.grams, counts), self.rows
+    
+    @property
+    def nbytes(self) -> int:
+        return self.grams.nbytes + self.offsets.nbytes + self.rows.nbytes
+
+
+class TextIndex:
+    """
+    增量倒排索引
+    
+    每次 add 写入一个新段；段数过多时自动合并。
+    查询时各段的倒排表求交集，再用原文校验去掉 n-gram 拼接产生的误命中。
+    """
+    
+    FIELDS = ('title', 'desc', 'tags')
+    
+    def __init__(self, n: int = 2, max_chars: int = 256, chunk_rows: int = 20000,
+                 max_segments: int = 8, fields: Sequence[str] = FIELDS):
+        if not 1 <= n <= MAX_GRAM:
+            raise ValueError(f"n 必须在 1~{MAX_GRAM} 之间（元组编码为 int64）")
+        self.n = n
+        self.max_chars = max_chars
+        self.chunk_rows = chunk_rows
+        self.max_segments = max_segments
+        self.fields = tuple(fields)
+        self.segments: List[IndexSegment] = []
+        self.size = 0
+        self._texts: List[np.ndarray] = []
+        self._times: List[np.ndarray] = []
+        self._deleted = set()
+    
+    def __len__(self) -> int:
+        return self.size - len(self._deleted)
+    
+    def _documents(self, df: pd.DataFrame) -> np.ndarray:
+        parts = []
+        for field in self.fields:
+            if field not in df.columns:
+                continue
+            values = df[field]
+            if field == 'tags':
+                values = values.map(lambda tags: ' '.join(map(str, tags)) if isinstance(tags, (list, tuple)) else tags)
+            # 每个字段单独截断：描述再长也不会把后面的话题挤出索引
+            parts.append(values.fillna('').astype(str).str.slice(0, self.max_chars))
+        if not parts:
+            return np.full(len(df), '', dtype='<U1')
+        
+        text = parts[0]
+        for part in parts[1:]:
+            text = text + SEPARATOR + part
+        return np.char.lower(text.to_numpy(dtype=str))
+    
+    def add(self, df: pd.DataFrame, start_row: Optional[int] = None) -> np.ndarray:
+        """
+        写入一批视频
+        
+        Args:
+            df: 视频数据DataFrame
+            start_row: 第一行的行号（默认接在已有数据之后，不能小于已有行数）
+        
+        Returns:
+            本批视频的行号
+        """
+        start_row = self.size if start_row is None else start_row
+        if start_row < self.size:
+            # 原文与发布时间按行号顺序追加，旧段里也仍有这些行的倒排，不支持覆盖写入
+            raise ValueError(f"start_row={start_row} 小于已有行数 {self.size}，只能追加写入")
+        row_ids = np.arange(start_row, start_row + len(df), dtype=np.int64)
+        if df.empty:
+            return row_ids
+        
+        documents = self._documents(df)
+        gram_parts, row_parts = [], []
+        for lo in range(0, len(documents), self.chunk_rows):
+            chunk = documents[lo:lo + self.chunk_rows]
+            for codes in _gram_codes(chunk, self.n):
+                rows = np.broadcast_to(row_ids[lo:lo + len(chunk), None], codes.shape)
+                valid = codes >= 0
+                gram_parts.append(codes[valid])
+                row_parts.append(rows[valid])
+        
+        self.segments.append(IndexSegment.build(np.concatenate(gram_parts), np.concatenate(row_parts)))
+        
+        # 行号与原文、发布时间一一对应，用于校验和时间过滤
+        if start_row > self.size:
+            padding = start_row - self.size
+            self._texts.append(np.full(padding, '', dtype='<U1'))
+            self._times.append(np.full(padding, NAT, dtype=np.int64))
+        self._texts.append(documents)
+        if 'create_time' in df.columns:
+            times = pd.to_datetime(df['create_time'], errors='coerce').to_numpy(dtype='datetime64[ns]').view(np.int64)
+        else:
+            times = np.full(len(df), NAT, dtype=np.int64)
+        self._times.append(times)
+        self.size = max(self.size, start_row + len(df))
+        
+        if len(self.segments) > self.max_segments:
+            self.compact()
+        
+        return row_ids
+    
+    def remove(self, row_ids: Sequence[int]):
+        """删除行（标记删除，查询时过滤）"""
+        self._deleted.update(int(row) for row in row_ids)
+    
+    def compact(self):
+        """把所有段合并成一个"""
+        if len(self.segments) <= 1:
+            return
+        pairs = [segment.pairs() for segment in self.segments]
+        self.segments = [IndexSegment.build(
+            np.concatenate([grams for grams, _ in pairs]),
+            np.concatenate([rows for _, rows in pairs])
+        )]
+    
+    def _column(self, chunks: List[np.ndarray]) -> np.ndarray:
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0)
+    
+    def _candidates(self, keyword: str) -> np.ndarray:
+        codes = _encode_query(keyword, self.n)
+        per_segment = []
+        for segment in self.segments:
+            lists = sorted((segment.postings(int(code)) for code in codes), key=len)
+            rows = lists[0]
+            for other in lists[1:]:
+                if len(rows) == 0:
+                    break
+                rows = np.intersect1d(rows, other, assume_unique=True)
+            per_segment.append(rows)
+        return np.unique(np.concatenate(per_segment)) if per_segment else np.empty(0, dtype=np.int64)
+    
+    def search(self, keyword: str, days: Optional[int] = None, since=None, until=None,
+               verify: bool = True) -> np.ndarray:
+        """
+        关键词查询
+        
+        Args:
+            keyword: 关键词（不区分大小写）
+            days: 只看近N天发布的视频
+            since: 发布时间下限（含）
+            until: 发布时间上限（不含）
+            verify: 是否用原文校验（关闭后可能包含 n-gram 拼接的误命中）
+        
+        Returns:
+            升序的行号数组
+        """
+        keyword = keyword.strip().lower()
+        if not keyword or not self.segments:
+            return np.empty(0, dtype=np.int64)
+        
+        rows = self._candidates(keyword)
+        
+        if days is not None:
+            since = datetime.now() - timedelta(days=days)
+        if since is not None or until is not None:
+            times = self._column(self._times)[rows]
+            mask = times != NAT
+            if since is not None:
+                mask &= times >= pd.Timestamp(since).value
+            if until is not None:
+                mask &= times < pd.Timestamp(until).value
+            rows = rows[mask]
+        
+        if verify and len(keyword) > self.n and len(rows):
+            texts = self._column(self._texts)[rows]
+            rows = rows[np.char.find(texts, keyword) >= 0]
+        
+        if self._deleted and len(rows):
+            rows = rows[~np.isin(rows, np.fromiter(self._deleted, dtype=np.int64))]
+        
+        return rows
+    
+    def search_all(self, keywords: Sequence[str], **filters) -> np.ndarray:
+        """多个关键词同时出现（AND）"""
+        result = None
+        for keyword in keywords:
+            rows = self.search(keyword, **filters)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result if result is not None else np.empty(0, dtype=np.int64)
+    
+    def search_any(self, keywords: Sequence[str], **filters) -> np.ndarray:
+        """任一关键词出现（OR）"""
+        parts = [self.search(keyword, **filters) for keyword in keywords]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    
+    @property
+    def nbytes(self) -> int:
+        """索引占用的内存（不含原文）"""
+        return sum(segment.nbytes for segment in self.segments)
@@ -0,0 +1,154 @@
+"""
+时间索引模块
+
+功能：
+1. 按 create_time 排序的时间索引
+2. searchsorted 二分切片（O(log n) 日期筛选，无布尔掩码）
+3. 一次扫描完成 N 个时间段的聚合对比
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Union
+
+
+class TimeIndex:
+    """
+    按发布时间排序的视频索引
+    
+    构建时排序一次（O(n log n)），之后的日期筛选只需二分查找并返回切片；
+    多时间段对比基于前缀和，所有时间段一起计算。
+    """
+    
+    METRICS = ('likes', 'comments', 'shares')
+    
+    def __init__(self, df: pd.DataFrame, time_col: str = 'create_time'):
+        self.time_col = time_col
+        times = pd.to_datetime(df[time_col], errors='coerce')
+        
+        if times.is_monotonic_increasing and not times.isna().any():
+            self.frame = df
+        else:
+            # 无效时间排在最后，不参与切片
+            order = np.argsort(times.to_numpy(), kind='stable')
+            self.frame = df.iloc[order]
+            times = times.iloc[order]
+        
+        self._times = times.to_numpy(dtype='datetime64[ns]')
+        self._valid = int(times.notna().sum())
+        self._prefix = {}
+    
+    def __len__(self) -> int:
+        return self._valid
+    
+    def _position(self, moment, side: str = 'left') -> int:
+        value = np.datetime64(pd.Timestamp(moment), 'ns')
+        return int(np.searchsorted(self._times[:self._valid], value, side=side))
+    
+    def slice(self, start=None, end=None) -> pd.DataFrame:
+        """
+        取出 [start, end) 时间范围内的视频
+        
+        Args:
+            start: 起始时间（含），为空表示不限
+            end: 结束时间（不含），为空表示不限
+            
+        Returns:
+            按时间排序的DataFrame切片
+        """
+        lo = 0 if start is None else self._position(start)
+        hi = self._valid if end is None else self._position(end)
+        return self.frame.iloc[lo:max(lo, hi)]
+    
+    def last_days(self, days: int = 30, now: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        近N天的视频
+        
+        Args:
+            days: 天数
+            now: 当前时间（默认 datetime.now()）
+            
+        Returns:
+            筛选后的DataFrame
+        """
+        now = now or datetime.now()
+        return self.slice(start=now - timedelta(days=days))
+    
+    def _cumulative(self, metric: str) -> np.ndarray:
+        if metric not in self._prefix:
+            values = pd.to_numeric(self.frame[metric].iloc[:self._valid], errors='coerce').fillna(0)
+            self._prefix[metric] = np.concatenate([[0.0], np.cumsum(values.to_numpy(dtype=np.float64))])
+        return self._prefix[metric]
+    
+    def period_boundaries(self, freq: Union[str, Sequence] = 'W') -> pd.DatetimeIndex:
+        """
+        生成时间段边界
+        
+        Args:
+            freq: pandas 频率字符串（'D' / 'W' / 'MS' 等），或自定义边界日期列表
+            
+        Returns:
+            升序的边界时间，相邻两个边界构成一个时间段
+        """
+        if not isinstance(freq, str):
+            return pd.DatetimeIndex(pd.to_datetime(list(freq))).sort_values()
+        
+        if self._valid == 0:
+            return pd.DatetimeIndex([])
+        
+        first = pd.Timestamp(self._times[0])
+        last = pd.Timestamp(self._times[self._valid - 1])
+        offset = pd.tseries.frequencies.to_offset(freq)
+        
+        start = offset.rollback(first.normalize())
+        boundaries = pd.date_range(start=start, end=last, freq=offset)
+        # 最后一个边界必须严格大于最晚的视频时间
+        return boundaries.append(pd.DatetimeIndex([boundaries[-1] + offset]))
+    
+    def compare_periods(self, freq: Union[str, Sequence] = 'W',
+                        metrics: Sequence[str] = METRICS) -> pd.DataFrame:
+        """
+        多时间段对比
+        
+        Args:
+            freq: 时间段频率或自定义边界日期列表（N+1 个边界得到 N 个时间段）
+            metrics: 参与聚合的指标
+            
+        Returns:
+            每个时间段一行：起止时间、视频数、各指标总数/平均值，以及平均点赞相对上一时间段的增长率(%)
+        """
+        boundaries = self.period_boundaries(freq)
+        if len(boundaries) < 2:
+            return pd.DataFrame()
+        
+        positions = np.searchsorted(
+            self._times[:self._valid],
+            boundaries.to_numpy(dtype='datetime64[ns]'),
+            side='left'
+        )
+        lo, hi = positions[:-1], positions[1:]
+        counts = hi - lo
+        
+        result = pd.DataFrame({
+            'period_start': boundaries[:-1],
+            'period_end': boundaries[1:],
+            'videos': counts
+        })
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for metric in metrics:
+                if metric not in self.frame.columns:
+                    continue
+                cumulative = self._cumulative(metric)
+                totals = cumulative[hi] - cumulative[lo]
+                result[f'total_{metric}'] = totals
+                result[f'avg_{metric}'] = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+            
+            if 'avg_likes' in result.columns:
+                avg = result['avg_likes'].to_numpy()
+                previous = np.concatenate([[np.nan], avg[:-1]])
+                growth = np.where(previous > 0, (avg - previous) / previous * 100, 0.0)
+                result['growth_rate'] = growth
+        
+        return result
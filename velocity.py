@@ -0,0 +1,248 @@
+"""
+增长速度与爆款检测模块
+
+功能：
+1. 按视频保存最近若干次刷新的快照（环形缓冲，所有视频一个数组）
+2. 向量化计算 likes / comments / shares 的每小时增速与加速度
+3. 与同龄视频比较的 z-score，增速异常高的视频触发爆款提醒
+4. 流式模式：每次刷新到达时只更新相关视频的分数
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import List, Optional
+
+
+MEASURES = ['likes', 'comments', 'shares']
+SECONDS_PER_HOUR = 3600.0
+# 同龄分组：按视频年龄（小时）的 log2 分桶，最多约 1 年
+AGE_BUCKETS = 14
+
+
+def _grow(values: np.ndarray, size: int, fill) -> np.ndarray:
+    """按需扩容（容量翻倍）"""
+    if len(values) >= size:
+        return values
+    grown = np.full((max(size, 2 * len(values)),) + values.shape[1:], fill, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class VelocityTracker:
+    """
+    快照增速跟踪器
+    
+    每个视频在 history 个槽位中循环写入快照；
+    增速 = 最近两次快照之间的差值 / 间隔小时数（只有一次快照时用 总量 / 发布至今小时数），
+    加速度 = 最近两段增速之差 / 两段中点的间隔小时数。
+    """
+    
+    def __init__(self, history: int = 8, z_threshold: float = 3.0, min_velocity: float = 10.0):
+        """
+        Args:
+            history: 每个视频保留的快照数
+            z_threshold: 触发爆款提醒的 z-score
+            min_velocity: 触发提醒的最低点赞增速（每小时）
+        """
+        self.history = history
+        self.z_threshold = z_threshold
+        self.min_velocity = min_velocity
+        
+        self.video_ids: List[str] = []
+        self._slots = {}
+        self._create_time = np.zeros(0, dtype=np.float64)
+        self._times = np.zeros((0, history), dtype=np.float64)
+        self._values = np.zeros((0, history, len(MEASURES)), dtype=np.float64)
+        self._count = np.zeros(0, dtype=np.int64)
+        
+        # 最近一次计算的结果（用于同龄分组统计和提醒去重）
+        self._age = np.zeros(0, dtype=np.float64)
+        self._likes_velocity = np.zeros(0, dtype=np.float64)
+        self._alerted = np.zeros(0, dtype=bool)
+    
+    def __len__(self) -> int:
+        return len(self.video_ids)
+    
+    def _slot_ids(self, video_ids: List[str]) -> np.ndarray:
+        slots = np.empty(len(video_ids), dtype=np.int64)
+        for row, video_id in enumerate(video_ids):
+            slot = self._slots.get(video_id)
+            if slot is None:
+                slot = self._slots[video_id] = len(self.video_ids)
+                self.video_ids.append(video_id)
+            slots[row] = slot
+        
+        size = len(self.video_ids)
+        self._create_time = _grow(self._create_time, size, np.nan)
+        self._times = _grow(self._times, size, np.nan)
+        self._values = _grow(self._values, size, np.nan)
+        self._count = _grow(self._count, size, 0)
+        self._age = _grow(self._age, size, np.nan)
+        self._likes_velocity = _grow(self._likes_velocity, size, np.nan)
+        self._alerted = _grow(self._alerted, size, False)
+        return slots
+    
+    def update(self, df: pd.DataFrame, at: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        写入一次刷新的快照，并返回这些视频的最新分数
+        
+        Args:
+            df: 视频数据DataFrame（需包含 video_id / create_time 与 likes 等）
+            at: 快照时间；为空时使用 df 的 snapshot_time 列，没有则为当前时间
+        
+        Returns:
+            本次更新视频的分数（列同 scores()），new_alert 标记本次新触发的提醒
+        """
+        if df.empty or 'video_id' not in df.columns:
+            return self._frame(np.empty(0, dtype=np.int64))
+        
+        # 同一批次里重复出现的视频以最后一次为准
+        df = df[~df['video_id'].astype(str).duplicated(keep='last').to_numpy()]
+        slots = self._slot_ids(df['video_id'].astype(str).tolist())
+        
+        if at is None and 'snapshot_time' in df.columns:
+            times = pd.to_datetime(df['snapshot_time'], errors='coerce')
+        else:
+            times = pd.Series(pd.Timestamp(at or datetime.now()), index=df.index)
+        times = times.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+        
+        if 'create_time' in df.columns:
+            create_time = pd.to_datetime(df['create_time'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+            known = ~np.isnat(create_time)
+            self._create_time[slots[known]] = create_time[known].astype(np.int64) / 1e9
+        
+        values = np.column_stack([
+            pd.to_numeric(df[measure], errors='coerce').to_numpy(dtype=np.float64)
+            if measure in df.columns else np.full(len(df), np.nan)
+            for measure in MEASURES
+        ])
+        
+        position = self._count[slots] % self.history
+        self._times[slots, position] = times
+        self._values[slots, position] = values
+        self._count[slots] += 1
+        
+        return self._frame(slots, alert=True)
+    
+    def consume(self, snapshots) -> 'VelocityTracker':
+        """依次写入多次刷新（DataFrame 迭代器，每个需带 snapshot_time 列）"""
+        for snapshot in snapshots:
+            self.update(snapshot)
+        return self
+    
+    def snapshot_history(self, video_ids: List[str], measure: str = 'likes'):
+        """
+        取出视频的快照历史（槽位顺序，未写入的位置为 NaN）
+        
+        Args:
+            video_ids: 视频ID列表（未跟踪的视频整行为 NaN）
+            measure: likes / comments / shares
+        
+        Returns:
+            (发布至今小时数矩阵, 指标值矩阵)，形状均为 (视频数, history)
+        """
+        slots = np.array([self._slots.get(str(video_id), -1) for video_id in video_ids], dtype=np.int64)
+        known = slots >= 0
+        ages = np.full((len(slots), self.history), np.nan)
+        values = np.full((len(slots), self.history), np.nan)
+        
+        rows = slots[known]
+        ages[known] = (self._times[rows] - self._create_time[rows, None]) / SECONDS_PER_HOUR
+        values[known] = self._values[rows, :, MEASURES.index(measure)]
+        return ages, values
+    
+    def _snapshot(self, slots: np.ndarray, back: int):
+        """倒数第 back+1 次快照的时间与数值（不存在时为 NaN）"""
+        count = self._count[slots]
+        position = (count - 1 - back) % self.history
+        exists = count > back
+        times = np.where(exists, self._times[slots, position], np.nan)
+        values = np.where(exists[:, None], self._values[slots, position], np.nan)
+        return times, values
+    
+    def _kinematics(self, slots: np.ndarray):
+        """向量化计算增速、加速度与视频年龄"""
+        t0, v0 = self._snapshot(slots, 0)
+        t1, v1 = self._snapshot(slots, 1)
+        t2, v2 = self._snapshot(slots, 2)
+        create_time = self._create_time[slots]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 发布时间未知时年龄为 NaN，不参与同龄比较
+            age = np.maximum((t0 - create_time) / SECONDS_PER_HOUR, 1 / 60)
+            lifetime = v0 / age[:, None]
+            
+            dt01 = ((t0 - t1) / SECONDS_PER_HOUR)[:, None]
+            dt12 = ((t1 - t2) / SECONDS_PER_HOUR)[:, None]
+            velocity = np.where(dt01 > 0, (v0 - v1) / dt01, lifetime)
+            
+            # 只有两次快照时，上一段增速用第一次快照时的平均增速
+            age1 = np.maximum((t1 - create_time) / SECONDS_PER_HOUR, 1 / 60)[:, None]
+            previous = np.where(dt12 > 0, (v1 - v2) / dt12, v1 / age1)
+            span = np.where(dt12 > 0, (dt01 + dt12) / 2, dt01 / 2 + age1 / 2)
+            acceleration = np.where(dt01 > 0, (velocity - previous) / span, np.nan)
+        
+        return age, lifetime, velocity, acceleration
+    
+    def _zscores(self, slots: np.ndarray) -> np.ndarray:
+        """点赞增速（取对数）相对同龄视频的 z-score"""
+        tracked = len(self.video_ids)
+        age, velocity = self._age[:tracked], self._likes_velocity[:tracked]
+        valid = ~np.isnan(age) & ~np.isnan(velocity)
+        
+        buckets = np.clip(np.floor(np.log2(np.maximum(age, 1.0))), 0, AGE_BUCKETS - 1).astype(np.int64)
+        x = np.log1p(np.maximum(velocity, 0.0))
+        counts = np.bincount(buckets[valid], minlength=AGE_BUCKETS)
+        sums = np.bincount(buckets[valid], weights=x[valid], minlength=AGE_BUCKETS)
+        squares = np.bincount(buckets[valid], weights=x[valid] ** 2, minlength=AGE_BUCKETS)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums / counts
+            std = np.sqrt(np.maximum(squares / counts - mean ** 2, 0.0))
+            z = (x[slots] - mean[buckets[slots]]) / std[buckets[slots]]
+        # 同组视频太少或没有差异时不给出分数
+        z[(counts[buckets[slots]] < 3) | ~valid[slots]] = np.nan
+        return np.where(np.isfinite(z), z, np.nan)
+    
+    def _frame(self, slots: np.ndarray, alert: bool = False) -> pd.DataFrame:
+        age, lifetime, velocity, acceleration = self._kinematics(slots)
+        self._age[slots] = age
+        self._likes_velocity[slots] = velocity[:, 0]
+        z = self._zscores(slots)
+        
+        viral = (z >= self.z_threshold) & (velocity[:, 0] >= self.min_velocity) & ~(acceleration[:, 0] < 0)
+        new_alert = viral & ~self._alerted[slots]
+        if alert:
+            self._alerted[slots] = viral
+        
+        frame = pd.DataFrame({
+            'video_id': [self.video_ids[slot] for slot in slots],
+            'age_hours': np.round(age, 2),
+            'snapshots': np.minimum(self._count[slots], self.history),
+        })
+        for column, measure in enumerate(MEASURES):
+            frame[f'{measure}_velocity'] = np.round(velocity[:, column], 2)
+        for column, measure in enumerate(MEASURES):
+            frame[f'{measure}_acceleration'] = np.round(acceleration[:, column], 4)
+        frame['lifetime_likes_velocity'] = np.round(lifetime[:, 0], 2)
+        frame['virality_z'] = np.round(z, 2)
+        frame['viral'] = viral
+        if alert:
+            frame['new_alert'] = new_alert
+        return frame
+    
+    def scores(self) -> pd.DataFrame:
+        """
+        全部跟踪视频的最新分数
+        
+        Returns:
+            DataFrame（video_id / age_hours / *_velocity / *_acceleration / virality_z / viral）
+        """
+        return self._frame(np.arange(len(self.video_ids), dtype=np.int64))
+    
+    def alerts(self, n: Optional[int] = None) -> pd.DataFrame:
+        """当前处于爆款状态的视频，按 z-score 降序"""
+        scores = self.scores()
+        alerts = scores[scores['viral']].sort_values('virality_z', ascending=False)
+        return alerts.head(n) if n is not None else alerts